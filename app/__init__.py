@@ -1,7 +1,6 @@
 print("app/__init__.py loaded")
 from flask_cors import CORS
 from flask import Flask
-from .config import db
 
 def create_app():
     app = Flask(__name__)
@@ -10,4 +9,8 @@ def create_app():
     from .routes import main
     app.register_blueprint(main)
 
+    from .mirror import sync_mirror_command, start_mirror_sync
+    app.cli.add_command(sync_mirror_command)
+    start_mirror_sync()
+
     return app
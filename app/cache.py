@@ -0,0 +1,248 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time.
+
+    Threads that ask for a key while a call for it is already running wait for
+    that call and get its result (or its exception) instead of starting their own.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> dict(event, result, error)
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = {"event": threading.Event(), "result": None, "error": None}
+                self._calls[key] = call
+
+        if not leader:
+            call["event"].wait()
+        else:
+            try:
+                call["result"] = fn()
+            except Exception as e:
+                call["error"] = e
+            finally:
+                with self._lock:
+                    self._calls.pop(key, None)
+                call["event"].set()
+
+        if call["error"] is not None:
+            raise call["error"]
+        return call["result"]
+
+    def in_flight(self, key):
+        with self._lock:
+            return key in self._calls
+
+
+NOT_MODIFIED = object()
+
+
+class RefreshingValue:
+    """
+    One upstream payload kept in memory with stale-while-revalidate semantics.
+
+    `fetch(validators)` receives the validators of the cached copy (e.g. ETag /
+    Last-Modified) and returns either (value, validators) or NOT_MODIFIED.
+    Within `ttl` the cached value is returned as is. After that the stale value
+    is still returned immediately while a single background refresh runs; only
+    when there is no value yet, or it is older than `max_stale`, callers wait for
+    the (single-flight) fetch.
+    """
+
+    def __init__(self, name, fetch, ttl, max_stale):
+        self.name = name
+        self.fetch = fetch
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._value = None
+        self._validators = {}
+        self._fetched_at = 0
+        self._flight = SingleFlight()
+        self.hits = 0
+        self.stale_hits = 0
+        self.fetches = 0
+        self.not_modified = 0
+
+    def _refresh(self):
+        self.fetches += 1
+        result = self.fetch(self._validators if self._value is not None else {})
+        if result is NOT_MODIFIED:
+            self.not_modified += 1
+        else:
+            self._value, self._validators = result
+        self._fetched_at = time.time()
+        return self._value
+
+    def _refresh_in_background(self):
+        def run():
+            try:
+                self._flight.do(self.name, self._refresh)
+            except Exception as e:
+                print(f"Error refreshing {self.name}: {e}")
+
+        if not self._flight.in_flight(self.name):
+            threading.Thread(target=run, name=f"refresh-{self.name}", daemon=True).start()
+
+    def get(self):
+        age = time.time() - self._fetched_at
+        if self._value is not None and age < self.ttl:
+            self.hits += 1
+            return self._value
+        if self._value is not None and age < self.max_stale:
+            self.stale_hits += 1
+            self._refresh_in_background()
+            return self._value
+        return self._flight.do(self.name, self._refresh)
+
+    def prime(self, value, validators=None):
+        """Store a value fetched elsewhere as if this instance had just fetched it."""
+        self._value = value
+        self._validators = validators or {}
+        self._fetched_at = time.time()
+
+    def clear(self):
+        self._value = None
+        self._validators = {}
+        self._fetched_at = 0
+
+    def stats(self):
+        return {
+            "age": round(time.time() - self._fetched_at, 1) if self._value is not None else None,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "fetches": self.fetches,
+            "not_modified": self.not_modified,
+        }
+
+
+def json_size(value):
+    """Rough size in bytes of a JSON-like value (its serialised length)."""
+    return len(json.dumps(value, default=str))
+
+
+class LRUCache:
+    """
+    Thread-safe key/value store bounded by entry count and bytes, with a TTL.
+
+    Least recently used entries are evicted first when either bound is exceeded.
+    Expired entries are dropped on access and by a background sweeper thread.
+    get_or_load() loads a missing key at most once at a time (single-flight), so
+    concurrent requests for the same cold key trigger a single upstream call.
+    """
+
+    def __init__(self, name, max_entries, max_bytes, ttl, sizeof=json_size, sweep_interval=60):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self.sweep_interval = sweep_interval
+        self._entries = OrderedDict()  # key -> (stored_at, value, size)
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._sweeper = None
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _remove(self, key):
+        _, _, size = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def get(self, key):
+        """Return the cached value or None when it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if time.time() - entry[0] < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                self._remove(key)
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (time.time(), value, size)
+            self.current_bytes += size
+            while len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+            if self._sweeper is None and self.sweep_interval:
+                self._sweeper = threading.Thread(target=self._sweep_loop, name=f"sweep-{self.name}", daemon=True)
+                self._sweeper.start()
+
+    def get_or_load(self, key, loader):
+        """Return the cached value, or load it once (loader returning None is not cached)."""
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        def load():
+            # Morda ga je medtem naložila druga nit
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and time.time() - entry[0] < self.ttl:
+                    return entry[1]
+            loaded = loader()
+            if loaded is not None:
+                self.set(key, loaded)
+            return loaded
+
+        return self._flight.do(key, load)
+
+    def expire(self):
+        """Drop every expired entry. Returns how many were removed."""
+        now = time.time()
+        with self._lock:
+            expired = [key for key, (stored_at, _, _) in self._entries.items() if now - stored_at >= self.ttl]
+            for key in expired:
+                self._remove(key)
+            self.expirations += len(expired)
+        return len(expired)
+
+    def _sweep_loop(self):
+        while True:
+            time.sleep(self.sweep_interval)
+            self.expire()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
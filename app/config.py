@@ -1,46 +1,156 @@
-import firebase_admin
-from firebase_admin import credentials, firestore
+import time
+
+_import_started = time.perf_counter()
+
 from dotenv import load_dotenv
 import os
-import duckdb
-import boto3
 import json
+import threading
 
 # Nalaganje okolijskih spremenljivk iz .env datoteke
 load_dotenv()
 
-# Inicializacija Firebase
-key_path = os.getenv("FIREBASE_KEY_PATH")  # Pot do JSON ključa
-cred = credentials.Certificate(key_path)
-firebase_admin.initialize_app(cred)
+# Časi zagona (ms): uvoz config-a in inicializacija posameznih odjemalcev
+startup_timings = {}
+
+
+class LazyClient:
+    """
+    Creates a client on first use instead of at import time.
+
+    The factory runs once, under a lock, the first time an attribute is accessed
+    (or get() is called); afterwards every attribute access is forwarded to the
+    created client, so `s3.get_object(...)` keeps working unchanged.
+    """
+
+    def __init__(self, name, factory):
+        self._name = name
+        self._factory = factory
+        self._client = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    start = time.perf_counter()
+                    self._client = self._factory()
+                    startup_timings[self._name] = round((time.perf_counter() - start) * 1000, 1)
+                    print(f"{self._name} client initialised in {startup_timings[self._name]} ms")
+        return self._client
+
+    def __getattr__(self, attr):
+        # Introspekcija (mock.patch, copy, ...) ne sme sprožiti inicializacije
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self.get(), attr)
+
+
+_aws_creds = None
+
+
+def aws_credentials():
+    """AWS credentials from AWS_CREDENTIALS_PATH, or {} to fall back to the default boto3 chain."""
+    global _aws_creds
+    if _aws_creds is None:
+        path = os.getenv("AWS_CREDENTIALS_PATH")
+        if path:
+            # Load AWS credentials from JSON
+            with open(path) as f:
+                _aws_creds = json.load(f)
+        else:
+            _aws_creds = {}
+    return _aws_creds
 
-# Firestore baza
-db = firestore.client()
 
-# Load AWS credentials from JSON
-with open(os.getenv("AWS_CREDENTIALS_PATH")) as f:
-    creds = json.load(f)
+def _create_firestore():
+    import firebase_admin
+    from firebase_admin import credentials, firestore
 
-s3 = boto3.client(
-    's3',
-    aws_access_key_id=creds['aws_access_key_id'],
-    aws_secret_access_key=creds['aws_secret_access_key'],
-    region_name=creds['region_name']
-)
+    # Inicializacija Firebase
+    key_path = os.getenv("FIREBASE_KEY_PATH")  # Pot do JSON ključa
+    cred = credentials.Certificate(key_path)
+    firebase_admin.initialize_app(cred)
+    return firestore.client()
 
-# === Initialize DuckDB Connection Once ===
-con = duckdb.connect()
-con.execute("INSTALL httpfs; LOAD httpfs;")
-con.execute(f"SET s3_region='{creds['region_name']}';")
-# Optional if you need explicit creds (already set in env vars)
-con.execute(f"SET s3_access_key_id='{creds['aws_access_key_id']}';")
-con.execute(f"SET s3_secret_access_key='{creds['aws_secret_access_key']}';")
+
+def _create_s3():
+    import boto3
+
+    creds = aws_credentials()
+    return boto3.client(
+        's3',
+        aws_access_key_id=creds.get('aws_access_key_id'),
+        aws_secret_access_key=creds.get('aws_secret_access_key'),
+        region_name=creds.get('region_name')
+    )
+
+
+def _create_duckdb_pool():
+    import duckdb
+    from .duckdb_pool import DuckDBPool
+
+    con = duckdb.connect()
+    # Vendored extension avoids downloading httpfs on every cold start (and works offline)
+    httpfs_path = os.getenv("DUCKDB_HTTPFS_EXTENSION_PATH")
+    try:
+        if httpfs_path:
+            con.execute(f"LOAD '{httpfs_path}';")
+        else:
+            con.execute("INSTALL httpfs; LOAD httpfs;")
+    except Exception as e:
+        # Lokalne datoteke še vedno beremo, S3 poizvedbe pa bodo javile napako
+        print(f"Could not load DuckDB httpfs extension: {e}")
+
+    creds = aws_credentials()
+    duckdb_settings = []
+    if creds:
+        duckdb_settings = [
+            f"SET s3_region='{creds['region_name']}';",
+            # Optional if you need explicit creds (already set in env vars)
+            f"SET s3_access_key_id='{creds['aws_access_key_id']}';",
+            f"SET s3_secret_access_key='{creds['aws_secret_access_key']}';",
+        ]
+    # Vsaka nit dobi svoj kurzor iz bazena, sama povezava ni varna za hkratno uporabo
+    return DuckDBPool(con, size=DUCKDB_POOL_SIZE, setup=duckdb_settings)
+
+
+DUCKDB_POOL_SIZE = int(os.getenv("DUCKDB_POOL_SIZE", 4))
+
+# Firestore baza
+db = LazyClient("firestore", _create_firestore)
+s3 = LazyClient("s3", _create_s3)
+duckdb_pool = LazyClient("duckdb", _create_duckdb_pool)
 
 
 # BETTING
 MICROSERVICE_URL = os.getenv("BETTING_SERVICE_URL", "http://localhost:3001")
+# /odds: kratek TTL, skupen za workerje preko sqlite:///pot/do/odds.sqlite ali redis://
+ODDS_CACHE_URL = os.getenv("ODDS_CACHE_URL")
+ODDS_TTL = int(os.getenv("ODDS_TTL", 30))
 
 #RESULTS
 RESULTS_URL = os.getenv("RESULTS_SERVICE_URL", "http://localhost:3000/api")
+# /matches: pretekli datumi se hranijo trajno (sqlite:///pot/do/matches.sqlite ali redis://), danes/prihodnost kratek TTL
+MATCHES_CACHE_URL = os.getenv("MATCHES_CACHE_URL")
+MATCHES_TTL = int(os.getenv("MATCHES_TTL", 60))
+
+FPL_PROXY_URL = os.getenv("FPL_PROXY_URL", "http://86.58.6.122:5050/api/fpl")
+# Skupni predpomnilnik FPL odgovorov za vse workerje: sqlite:///pot/do/fpl.sqlite ali redis://host:6379/0
+FPL_CACHE_URL = os.getenv("FPL_CACHE_URL")
+# Live točke: en poziv event/{gw}/live na interval za cel proces
+LIVE_POLL_SECONDS = int(os.getenv("LIVE_POLL_SECONDS", 60))
+# Projekcije za vse igralce se preračunajo v ozadju, 0 = izklopljeno
+PROJECTIONS_REFRESH_SECONDS = int(os.getenv("PROJECTIONS_REFRESH_SECONDS", 60 * 30))
+
+# ANALYSIS HUB - predpomnilnik za gold parquet datoteke
+DATASET_CACHE_MAX_BYTES = int(os.getenv("DATASET_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+DATASET_CACHE_TTL = int(os.getenv("DATASET_CACHE_TTL", 300))  # sekunde med ETag preverjanji
+TEAM_INDEX_REFRESH_SECONDS = int(os.getenv("TEAM_INDEX_REFRESH_SECONDS", 600))
+
+# Lokalna kopija gold sloja (Arrow IPC), prazno = izklopljeno
+GOLD_MIRROR_DIR = os.getenv("GOLD_MIRROR_DIR")
+GOLD_MIRROR_SYNC_SECONDS = int(os.getenv("GOLD_MIRROR_SYNC_SECONDS", 300))
 
-FPL_PROXY_URL = os.getenv("FPL_PROXY_URL", "http://86.58.6.122:5050/api/fpl")
\ No newline at end of file
+startup_timings["config_import"] = round((time.perf_counter() - _import_started) * 1000, 1)
+print(f"app.config imported in {startup_timings['config_import']} ms")
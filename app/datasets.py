@@ -0,0 +1,181 @@
+import io
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from .config import s3, DATASET_CACHE_MAX_BYTES, DATASET_CACHE_TTL
+from .mirror import read_mirror, mirror_etag
+
+
+class DatasetCache:
+    """
+    In-process LRU cache for parquet datasets read from S3.
+
+    Entries are keyed by (bucket, key) and bounded by a memory budget in bytes.
+    After `ttl` seconds an entry is revalidated with a HEAD request: if the ETag
+    did not change, the cached DataFrame is reused without downloading or decoding
+    the object again. Cached DataFrames are shared between requests and must be
+    treated as read-only.
+    """
+
+    def __init__(self, max_bytes, ttl):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # (bucket, key) -> dict(df, etag, size, checked_at)
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.revalidations = 0
+
+    def _key_lock(self, cache_key):
+        with self._lock:
+            return self._key_locks.setdefault(cache_key, threading.Lock())
+
+    def _lookup(self, cache_key):
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None:
+                self._entries.move_to_end(cache_key)
+            return entry
+
+    def _store(self, cache_key, df, etag):
+        size = int(df.memory_usage(index=True, deep=True).sum())
+        with self._lock:
+            old = self._entries.pop(cache_key, None)
+            if old is not None:
+                self.current_bytes -= old["size"]
+            if size > self.max_bytes:
+                # Prevelik za proračun - vrnemo ga, a ga ne hranimo
+                return
+            self._entries[cache_key] = {"df": df, "etag": etag, "size": size, "checked_at": time.time()}
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= evicted["size"]
+                self.evictions += 1
+
+    def get(self, client, bucket, key):
+        """Return (DataFrame, etag) for the object, downloading it only when needed."""
+        cache_key = (bucket, key)
+        entry = self._lookup(cache_key)
+        if entry is not None and time.time() - entry["checked_at"] < self.ttl:
+            with self._lock:
+                self.hits += 1
+            return entry["df"], entry["etag"]
+
+        # Only one thread per object downloads or revalidates, the rest wait for it
+        with self._key_lock(cache_key):
+            entry = self._lookup(cache_key)
+            if entry is not None:
+                if time.time() - entry["checked_at"] < self.ttl:
+                    with self._lock:
+                        self.hits += 1
+                    return entry["df"], entry["etag"]
+                head = client.head_object(Bucket=bucket, Key=key)
+                with self._lock:
+                    self.revalidations += 1
+                    if head.get("ETag") == entry["etag"]:
+                        entry["checked_at"] = time.time()
+                        self.hits += 1
+                        return entry["df"], entry["etag"]
+
+            with self._lock:
+                self.misses += 1
+            response = client.get_object(Bucket=bucket, Key=key)
+            df = pd.read_parquet(io.BytesIO(response["Body"].read()))
+            etag = response.get("ETag")
+            self._store(cache_key, df, etag)
+            return df, etag
+
+    def current_etag(self, client, bucket, key):
+        """Return the object's current ETag, using the cached one while it is still fresh."""
+        entry = self._lookup((bucket, key))
+        if entry is not None and time.time() - entry["checked_at"] < self.ttl:
+            return entry["etag"]
+        return client.head_object(Bucket=bucket, Key=key).get("ETag")
+
+    def invalidate(self, bucket=None, key=None):
+        """Drop one object (or everything when called without arguments)."""
+        with self._lock:
+            if bucket is None:
+                self._entries.clear()
+                self.current_bytes = 0
+                return
+            entry = self._entries.pop((bucket, key), None)
+            if entry is not None:
+                self.current_bytes -= entry["size"]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "revalidations": self.revalidations,
+            }
+
+
+dataset_cache = DatasetCache(DATASET_CACHE_MAX_BYTES, DATASET_CACHE_TTL)
+
+
+def load_parquet_from_s3(bucket: str, key: str) -> pd.DataFrame:
+    """Load a parquet file from S3 and return it as a DataFrame (local mirror first, then the dataset cache)."""
+    df, _ = load_parquet_with_etag(bucket, key)
+    return df
+
+
+def load_parquet_with_etag(bucket: str, key: str):
+    """Same as load_parquet_from_s3, but also return the ETag of the loaded version."""
+    mirrored = read_mirror(bucket, key)
+    if mirrored is not None:
+        return mirrored
+    return dataset_cache.get(s3, bucket, key)
+
+
+def current_etag(bucket: str, key: str):
+    """ETag of the version load_parquet_with_etag would return right now."""
+    etag = mirror_etag(bucket, key)
+    if etag is not None:
+        return etag
+    return dataset_cache.current_etag(s3, bucket, key)
+
+
+class DatasetView:
+    """
+    Value derived from one S3 dataset (a grid, an index, ...) that stays resident.
+
+    `build(df)` runs only when the dataset's ETag changes; in between the view
+    re-checks the ETag at most once per `ttl` seconds, so the raw DataFrame may be
+    evicted from the dataset cache without forcing a rebuild.
+    """
+
+    def __init__(self, bucket, key, build, ttl=DATASET_CACHE_TTL):
+        self.bucket = bucket
+        self.key = key
+        self.build = build
+        self.ttl = ttl
+        self.etag = None
+        self._value = None
+        self._checked_at = 0
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self._value is not None and time.time() - self._checked_at < self.ttl:
+            return self._value
+        with self._lock:
+            if self._value is not None and time.time() - self._checked_at < self.ttl:
+                return self._value
+            if self._value is None or current_etag(self.bucket, self.key) != self.etag:
+                df, etag = load_parquet_with_etag(self.bucket, self.key)
+                self._value = self.build(df)
+                self.etag = etag
+            self._checked_at = time.time()
+            return self._value
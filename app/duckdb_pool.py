@@ -0,0 +1,61 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+
+class DuckDBPool:
+    """
+    Fixed-size pool of DuckDB cursors over one shared database.
+
+    A DuckDB connection must not be used from several threads at once, but cursors
+    created with `connection.cursor()` are independent connections to the same
+    database, so loaded extensions (httpfs) are shared. `setup` statements (S3
+    region and credentials) are run on every cursor when it is created.
+    """
+
+    def __init__(self, connection, size=4, setup=(), timeout=30):
+        self.size = size
+        self.timeout = timeout
+        self._cursors = queue.Queue(maxsize=size)
+        for _ in range(size):
+            cursor = connection.cursor()
+            for statement in setup:
+                cursor.execute(statement)
+            self._cursors.put(cursor)
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.waits = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @contextmanager
+    def connection(self):
+        """Check out a cursor for the duration of the with-block."""
+        start = time.perf_counter()
+        try:
+            cursor = self._cursors.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No DuckDB connection available after {self.timeout}s")
+        waited = time.perf_counter() - start
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+            if waited > 0.001:
+                self.waits += 1
+        try:
+            yield cursor
+        finally:
+            self._cursors.put(cursor)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": self.size,
+                "available": self._cursors.qsize(),
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+            }
@@ -0,0 +1,81 @@
+import io
+import json
+
+import pyarrow as pa
+from flask import Response, jsonify, request
+
+ARROW_MIMETYPE = "application/vnd.apache.arrow.stream"
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+# format= vrednost -> mimetype odgovora
+FORMATS = {
+    "records": "application/json",
+    "columns": "application/json",
+    "ndjson": NDJSON_MIMETYPE,
+    "arrow": ARROW_MIMETYPE,
+}
+ACCEPT_FORMATS = {
+    "application/json": "records",
+    NDJSON_MIMETYPE: "ndjson",
+    ARROW_MIMETYPE: "arrow",
+}
+STREAM_CHUNK_ROWS = 5000
+
+
+def negotiate_format():
+    """Pick the response format from ?format= or the Accept header (records JSON by default)."""
+    fmt = request.args.get("format")
+    if fmt:
+        return fmt if fmt in FORMATS else None
+    best = request.accept_mimetypes.best_match(list(ACCEPT_FORMATS), default="application/json")
+    return ACCEPT_FORMATS[best]
+
+
+def _columns_json(df):
+    # Vsak stolpec serializira pandas (C koda), brez Python objekta za vsako vrstico
+    parts = [
+        f"{json.dumps(str(col))}:{df[col].to_json(orient='values', date_format='iso')}"
+        for col in df.columns
+    ]
+    return "{" + ",".join(parts) + "}"
+
+
+def _ndjson_chunks(df):
+    for start in range(0, len(df), STREAM_CHUNK_ROWS):
+        chunk = df.iloc[start:start + STREAM_CHUNK_ROWS]
+        text = chunk.to_json(orient="records", lines=True, date_format="iso")
+        # Starejše verzije pandas ne dodajo zadnjega preloma vrstice
+        yield text if text.endswith("\n") else text + "\n"
+
+
+def _arrow_chunks(table):
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=STREAM_CHUNK_ROWS):
+            writer.write_batch(batch)
+            # Pošljemo, kar je zapisano do zdaj, in izpraznimo buffer
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    yield sink.getvalue()  # schema for empty tables + end-of-stream marker
+
+
+def dataframe_response(df):
+    """
+    Serialise a DataFrame in the negotiated format.
+
+    records (default) keeps the existing jsonify(df.to_dict(orient="records")) output,
+    columns returns {column: [values]}, ndjson and arrow are streamed in chunks.
+    """
+    fmt = negotiate_format()
+    if fmt is None:
+        return jsonify({"error": f"format must be one of: {', '.join(FORMATS)}"}), 400
+
+    if fmt == "records":
+        return jsonify(df.to_dict(orient="records"))
+    if fmt == "columns":
+        return Response(_columns_json(df), mimetype=FORMATS[fmt])
+    if fmt == "ndjson":
+        return Response(_ndjson_chunks(df), mimetype=FORMATS[fmt])
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    return Response(_arrow_chunks(table), mimetype=FORMATS[fmt])
@@ -0,0 +1,140 @@
+import queue
+import threading
+import time
+
+from .cache import SingleFlight
+from .config import FPL_PROXY_URL, LIVE_POLL_SECONDS
+from .shared_cache import fpl_get
+
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class LiveSubscription:
+    """One SSE client: the players of its squad and a queue of {player_id: points} changes."""
+
+    def __init__(self, gw, player_ids):
+        self.gw = gw
+        self.player_ids = set(player_ids)
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+
+class LiveEngine:
+    """
+    Live gameweek points shared by the whole process.
+
+    `event/{gw}/live` is fetched at most once per `interval` per gameweek: on
+    demand by points_map(), and by a poller thread while there are SSE
+    subscribers. Each new snapshot is diffed against the previous one and only
+    the changed players are pushed to the subscriptions that own them.
+    """
+
+    def __init__(self, interval=LIVE_POLL_SECONDS):
+        self.interval = interval
+        self._snapshots = {}  # gw -> (fetched_at, {player_id: total_points})
+        self._subscribers = {}  # gw -> {player_id: set(LiveSubscription)}
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._poller = None
+        self.polls = 0
+        self.changes = 0
+        self.pushed = 0
+
+    def _fetch(self, gw):
+        res = fpl_get(f"{FPL_PROXY_URL}/event/{gw}/live/")
+        res.raise_for_status()
+        return {player["id"]: player["stats"]["total_points"] for player in res.json()["elements"]}
+
+    def refresh(self, gw):
+        """Fetch a new snapshot of the gameweek, publish the diff and return the points map."""
+        def run():
+            points = self._fetch(gw)
+            self.polls += 1
+            with self._lock:
+                previous = self._snapshots.get(gw, (0, None))[1]
+                self._snapshots[gw] = (time.time(), points)
+            if previous is not None:
+                changed = {pid: pts for pid, pts in points.items() if previous.get(pid) != pts}
+                if changed:
+                    self.changes += len(changed)
+                    self._publish(gw, changed)
+            return points
+
+        return self._flight.do(gw, run)
+
+    def points_map(self, gw):
+        """{player_id: live total_points} for the gameweek, at most `interval` seconds old."""
+        with self._lock:
+            snapshot = self._snapshots.get(gw)
+        if snapshot is not None and time.time() - snapshot[0] < self.interval:
+            return snapshot[1]
+        return self.refresh(gw)
+
+    def _publish(self, gw, changed):
+        with self._lock:
+            by_player = self._subscribers.get(gw, {})
+            # Spremembe zberemo po naročnikih, vsak dobi samo svoje igralce
+            updates = {}
+            for pid, pts in changed.items():
+                for sub in by_player.get(pid, ()):
+                    updates.setdefault(sub, {})[pid] = pts
+        for sub, players in updates.items():
+            try:
+                sub.queue.put_nowait(players)
+                self.pushed += 1
+            except queue.Full:
+                pass  # počasen odjemalec; naslednji dogodek bo prinesel svež seštevek
+
+    def subscribe(self, gw, player_ids):
+        sub = LiveSubscription(gw, player_ids)
+        with self._lock:
+            by_player = self._subscribers.setdefault(gw, {})
+            for pid in sub.player_ids:
+                by_player.setdefault(pid, set()).add(sub)
+            if self._poller is None or not self._poller.is_alive():
+                self._poller = threading.Thread(target=self._poll_loop, name="fpl-live-poller", daemon=True)
+                self._poller.start()
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            by_player = self._subscribers.get(sub.gw, {})
+            for pid in sub.player_ids:
+                subs = by_player.get(pid)
+                if subs is not None:
+                    subs.discard(sub)
+                    if not subs:
+                        del by_player[pid]
+            if not by_player:
+                self._subscribers.pop(sub.gw, None)
+
+    def _poll_loop(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                gws = list(self._subscribers)
+                if not gws:
+                    self._poller = None
+                    return  # nihče ne posluša, nit se konča
+            for gw in gws:
+                try:
+                    self.refresh(gw)
+                except Exception as e:
+                    print(f"Error polling live gameweek {gw}: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._snapshots.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "gameweeks": sorted(self._snapshots),
+                "subscribers": len({sub for by_player in self._subscribers.values()
+                                    for subs in by_player.values() for sub in subs}),
+                "polls": self.polls,
+                "changed_players": self.changes,
+                "pushed": self.pushed,
+            }
+
+
+live_engine = LiveEngine()
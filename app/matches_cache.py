@@ -0,0 +1,210 @@
+import json
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+from .cache import LRUCache, RefreshingValue
+from .config import MATCHES_CACHE_URL, MATCHES_TTL
+from .shared_cache import create_backend
+
+MATCHES_MAX_STALE = 60 * 60 * 24  # a warm date is served stale (while refreshing) for up to a day
+PAST_DATE_MARGIN_DAYS = 1  # "yesterday" can still change in other time zones
+PAST_MAX_ENTRIES = 1000
+PAST_MAX_BYTES = 64 * 1024 * 1024
+PAST_KEEP_SECONDS = 60 * 60 * 24 * 365
+MAX_LIVE_DATES = 64
+MAX_COUNTED_DATES = 256  # match_counts keeps only the most recently fetched dates
+
+
+def count_matches(data):
+    """Number of matches in a /matches payload (countries -> leagues -> matches), None if it has another shape."""
+    try:
+        return sum(len(league["matches"]) for country in data for league in country["leagues"])
+    except (TypeError, KeyError):
+        return None
+
+
+class MatchesFetchError(Exception):
+    """The upstream returned an error payload; it is passed through but never cached."""
+
+    def __init__(self, data):
+        super().__init__(data.get("error"))
+        self.data = data
+
+
+class _Provisional(Exception):
+    """A past date's payload that is not final yet (no matches); it is served but never persisted."""
+
+    def __init__(self, data):
+        super().__init__("provisional matches payload")
+        self.data = data
+
+
+def is_final(data):
+    """A past date is kept for good only when its payload has at least one match."""
+    return (count_matches(data) or 0) > 0
+
+
+class MatchesCache:
+    """
+    Date-aware cache in front of the results service /matches endpoint.
+
+    Dates older than yesterday never change: they are kept in memory and, when
+    MATCHES_CACHE_URL is set, in a SQLite file or Redis so they survive
+    restarts and are shared by workers. Today, future dates and the default
+    (no date) use a short TTL with stale-while-revalidate, so once a date is
+    warm nobody waits for the upstream. A past date whose payload has no
+    matches (the service may not have loaded that day yet) also goes through
+    the short TTL until a payload with matches arrives. Error payloads are
+    never cached.
+    """
+
+    def __init__(self, fetch, backend_url=MATCHES_CACHE_URL, ttl=MATCHES_TTL, max_stale=MATCHES_MAX_STALE):
+        self.fetch = fetch
+        self.backend_url = backend_url
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._backend = None
+        self._lock = threading.Lock()
+        self._past = LRUCache("matches-past", PAST_MAX_ENTRIES, PAST_MAX_BYTES, float("inf"), sweep_interval=0)
+        self._live = OrderedDict()  # date -> RefreshingValue
+        self.match_counts = OrderedDict()  # date -> number of matches in the last fetched payload
+        self.persisted_hits = 0
+        self.matches_served = 0
+
+    @property
+    def backend(self):
+        if self._backend is None and self.backend_url:
+            with self._lock:
+                if self._backend is None:
+                    self._backend = create_backend(self.backend_url)
+        return self._backend
+
+    @staticmethod
+    def parse_date(date):
+        """The date of a YYYY-MM-DD string, None if it is not one."""
+        try:
+            return datetime.strptime(date, "%Y-%m-%d").date()
+        except (TypeError, ValueError):
+            return None
+
+    @classmethod
+    def is_past(cls, date):
+        day = cls.parse_date(date)
+        return day is not None and day < datetime.now(timezone.utc).date() - timedelta(days=PAST_DATE_MARGIN_DAYS)
+
+    def _count(self, date, data):
+        # Ključ je vhod uporabnika, zato beležimo le veljavne datume in le zadnjih MAX_COUNTED_DATES
+        if date is not None and self.parse_date(date) is None:
+            return
+        key = date or "default"
+        with self._lock:
+            self.match_counts[key] = count_matches(data)
+            self.match_counts.move_to_end(key)
+            while len(self.match_counts) > MAX_COUNTED_DATES:
+                self.match_counts.popitem(last=False)
+
+    def _load(self, date):
+        data = self.fetch(date)
+        if isinstance(data, dict) and "error" in data:
+            raise MatchesFetchError(data)
+        self._count(date, data)
+        return data
+
+    def _persist(self, date, data):
+        if not self.backend:
+            return
+        try:
+            self.backend.set(f"matches:{date}", {
+                "expires_at": float("inf"), "etag": None, "last_modified": None,
+                "body": zlib.compress(json.dumps(data).encode()),
+            }, time.time() + PAST_KEEP_SECONDS)
+        except Exception as e:
+            print(f"Matches cache write failed for {date}: {e}")
+
+    def _load_past(self, date):
+        def load():
+            entry = None
+            try:
+                entry = self.backend.get(f"matches:{date}") if self.backend else None
+            except Exception as e:
+                print(f"Matches cache read failed for {date}: {e}")
+            if entry is not None:
+                data = json.loads(zlib.decompress(entry["body"]))
+                if is_final(data):
+                    self.persisted_hits += 1
+                    self._count(date, data)
+                    return data
+            data = self._load(date)
+            if not is_final(data):
+                raise _Provisional(data)
+            self._persist(date, data)
+            return data
+
+        return self._past.get_or_load(date, load)
+
+    def _live_value(self, date):
+        key = date or "default"
+        with self._lock:
+            value = self._live.get(key)
+            if value is None:
+                value = RefreshingValue(f"matches-{key}", lambda _: (self._load(date), {}), self.ttl, self.max_stale)
+                self._live[key] = value
+                if len(self._live) > MAX_LIVE_DATES:
+                    self._live.popitem(last=False)
+            self._live.move_to_end(key)
+        return value
+
+    def _get_past(self, date):
+        """A past date without a final payload: short TTL until one with matches arrives, then kept for good."""
+        with self._lock:
+            known = date in self._live
+        if not known:
+            try:
+                return self._load_past(date)
+            except _Provisional as e:
+                self._live_value(date).prime(e.data)
+                return e.data
+        data = self._live_value(date).get()
+        if is_final(data):
+            self._persist(date, data)
+            self._past.set(date, data)
+            with self._lock:
+                self._live.pop(date, None)
+        return data
+
+    def get(self, date=None):
+        """Matches for a date (None = the service's default date), or the upstream's error payload."""
+        try:
+            data = self._get_past(date) if self.is_past(date) else self._live_value(date).get()
+        except MatchesFetchError as e:
+            return e.data
+        self.matches_served += self.match_counts.get(date or "default") or 0
+        return data
+
+    def clear(self):
+        """Drop the in-memory entries (persisted past dates stay in the backend)."""
+        with self._lock:
+            self._live.clear()
+            self.match_counts.clear()
+        self._past.clear()
+
+    def stats(self):
+        with self._lock:
+            live = [value.stats() for value in self._live.values()]
+            match_counts = dict(self.match_counts)
+        past = self._past.stats()
+        return {
+            "past_dates": past["entries"],
+            "past_hits": past["hits"],
+            "past_misses": past["misses"],
+            "persisted_hits": self.persisted_hits,
+            "live_dates": len(live),
+            "live_hits": sum(s["hits"] for s in live),
+            "live_stale_hits": sum(s["stale_hits"] for s in live),
+            "live_fetches": sum(s["fetches"] for s in live),
+            "matches_served": self.matches_served,
+            "match_counts": match_counts,
+        }
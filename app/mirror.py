@@ -0,0 +1,136 @@
+import io
+import os
+import threading
+import time
+
+import click
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .config import s3, GOLD_MIRROR_DIR, GOLD_MIRROR_SYNC_SECONDS
+
+# Objekti, ki jih routes berejo iz S3 in jih zrcalimo na lokalni disk
+MIRRORED_OBJECTS = [
+    ("footlyiq-data", "bronze/teams.parquet"),
+    ("footlyiq-data", "gold/pass_clustering/parquet/teams.parquet"),
+    ("footlyiq-data", "gold/pass_clustering/parquet/ALL_clustered_passes_1_colab.parquet"),
+    ("footlyiq-data", "gold/pass_clustering/parquet/FINAL-3rd_clustered_passes_1.parquet"),
+    ("footlyiq-data", "gold/xG/parquet/xG_done_filtered.parquet"),
+    ("footlyiq-data", "gold/xT/parquet/moving_small.parquet"),
+    ("footlyiq-data", "gold/xT/parquet/shots_small.parquet"),
+]
+
+ETAG_METADATA_KEY = b"footlyiq.s3_etag"
+
+_open_mirrors = {}  # path -> (mtime_ns, DataFrame, etag)
+_open_mirrors_lock = threading.Lock()
+_sync_thread = None
+
+
+def mirror_path(bucket, key):
+    return os.path.join(GOLD_MIRROR_DIR, bucket, key + ".arrow")
+
+
+def _read_etag(path):
+    with pa.memory_map(path) as source:
+        metadata = pa.ipc.open_file(source).schema.metadata or {}
+    etag = metadata.get(ETAG_METADATA_KEY)
+    return etag.decode() if etag else None
+
+
+def mirror_etag(bucket, key):
+    """ETag of the mirrored copy, or None when the object is not mirrored."""
+    if not GOLD_MIRROR_DIR:
+        return None
+    path = mirror_path(bucket, key)
+    if not os.path.exists(path):
+        return None
+    return _read_etag(path)
+
+
+def read_mirror(bucket, key):
+    """
+    Return (DataFrame, etag) read from the local Arrow IPC mirror, or None if there is none.
+
+    The file is memory-mapped and converted with split_blocks, so numeric columns
+    point straight into the page cache that all worker processes on the host share.
+    """
+    if not GOLD_MIRROR_DIR:
+        return None
+    path = mirror_path(bucket, key)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    with _open_mirrors_lock:
+        cached = _open_mirrors.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1], cached[2]
+
+    table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+    etag = (table.schema.metadata or {}).get(ETAG_METADATA_KEY, b"").decode() or None
+    df = table.to_pandas(split_blocks=True)
+    with _open_mirrors_lock:
+        _open_mirrors[path] = (mtime, df, etag)
+    return df, etag
+
+
+def sync_object(bucket, key):
+    """Download the object into the mirror if its ETag changed. Returns True when it was updated."""
+    path = mirror_path(bucket, key)
+    etag = s3.head_object(Bucket=bucket, Key=key).get("ETag")
+    if os.path.exists(path) and _read_etag(path) == etag:
+        return False
+
+    response = s3.get_object(Bucket=bucket, Key=key)
+    table = pq.read_table(io.BytesIO(response["Body"].read()))
+    metadata = dict(table.schema.metadata or {})
+    metadata[ETAG_METADATA_KEY] = (response.get("ETag") or etag).encode()
+    table = table.replace_schema_metadata(metadata)
+
+    # Zapišemo v začasno datoteko in jo atomarno zamenjamo, bralci vedno vidijo celo datoteko
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+    return True
+
+
+def sync_all():
+    """Bring every mirrored object up to date. Returns the number of updated objects."""
+    updated = 0
+    for bucket, key in MIRRORED_OBJECTS:
+        try:
+            if sync_object(bucket, key):
+                updated += 1
+                print(f"Mirrored s3://{bucket}/{key}")
+        except Exception as e:
+            print(f"Error mirroring s3://{bucket}/{key}: {e}")
+    return updated
+
+
+def _sync_loop():
+    while True:
+        sync_all()
+        time.sleep(GOLD_MIRROR_SYNC_SECONDS)
+
+
+def start_mirror_sync():
+    """Start the background mirror job (once per process) when GOLD_MIRROR_DIR is configured."""
+    global _sync_thread
+    if not GOLD_MIRROR_DIR or _sync_thread is not None:
+        return
+    _sync_thread = threading.Thread(target=_sync_loop, name="gold-mirror-sync", daemon=True)
+    _sync_thread.start()
+
+
+@click.command("sync-mirror")
+def sync_mirror_command():
+    """Mirror the S3 gold layer to GOLD_MIRROR_DIR as Arrow IPC files."""
+    if not GOLD_MIRROR_DIR:
+        raise click.ClickException("GOLD_MIRROR_DIR is not set")
+    updated = sync_all()
+    click.echo(f"{updated} of {len(MIRRORED_OBJECTS)} objects updated in {GOLD_MIRROR_DIR}")
@@ -0,0 +1,210 @@
+import gzip
+import threading
+import time
+import zlib
+
+from .config import MICROSERVICE_URL, ODDS_CACHE_URL, ODDS_TTL
+from .shared_cache import create_backend
+from .upstream import betting
+
+CHUNK_SIZE = 64 * 1024
+CACHE_KEY = "odds"
+CACHEABLE_ENCODINGS = ("identity", "gzip", "deflate")
+
+
+def _decoder(encoding):
+    """Streaming decompressor for gzip or deflate bodies, None for anything else."""
+    if encoding in ("gzip", "deflate"):
+        return zlib.decompressobj(zlib.MAX_WBITS | 32)  # zazna gzip ali zlib glavo
+    return None
+
+
+class _Flight:
+    """One upstream fetch; every request that joins it reads the same chunks as they arrive."""
+
+    def __init__(self):
+        self.ready = threading.Event()  # status and encoding are known
+        self.cond = threading.Condition()
+        self.status = None
+        self.encoding = None
+        self.chunks = []
+        self.done = False
+        self.error = None
+
+    def read(self):
+        i = 0
+        while True:
+            with self.cond:
+                while i == len(self.chunks) and not self.done:
+                    self.cond.wait()
+                chunks = self.chunks[i:]
+                i += len(chunks)
+                finished = self.done and i == len(self.chunks)
+            yield from chunks
+            if finished:
+                if self.error is not None:
+                    # Odziv 200 je že poslan: napaka prekine povezavo, da odjemalec ne dobi okrnjenega telesa
+                    raise self.error
+                return
+
+
+class OddsProxy:
+    """
+    Streaming pass-through for the betting service /odds endpoint.
+
+    The upstream body is forwarded chunk by chunk in its original encoding
+    (gzip stays gzip; it is only decompressed for clients that do not accept
+    it). A background thread reads the upstream, so concurrent requests join
+    the running fetch instead of starting their own. Successful bodies are
+    kept gzip-compressed for `ttl` seconds in memory and, when ODDS_CACHE_URL
+    is set, in SQLite or Redis shared by all workers. If the upstream fails
+    mid-body, readers get the error (the connection is aborted) and nothing is
+    cached.
+    """
+
+    def __init__(self, url=f"{MICROSERVICE_URL}/odds", ttl=ODDS_TTL, backend_url=ODDS_CACHE_URL):
+        self.url = url
+        self.ttl = ttl
+        self.backend_url = backend_url
+        self._backend = None
+        self._lock = threading.Lock()
+        self._entry = None  # (expires_at, gzip body)
+        self._flight = None
+        self.hits = 0
+        self.shared_hits = 0
+        self.fetches = 0
+        self.coalesced = 0
+
+    @property
+    def backend(self):
+        if self._backend is None and self.backend_url:
+            with self._lock:
+                if self._backend is None:
+                    self._backend = create_backend(self.backend_url)
+        return self._backend
+
+    def _fresh(self):
+        entry = self._entry
+        return entry[1] if entry and entry[0] > time.time() else None
+
+    def _cached(self):
+        body = self._fresh()
+        if body is None and self.backend:
+            try:
+                stored = self.backend.get(CACHE_KEY)
+            except Exception as e:
+                print(f"Odds cache read failed: {e}")
+                stored = None
+            if stored and stored["expires_at"] > time.time():
+                self._entry = (stored["expires_at"], stored["body"])
+                self.shared_hits += 1
+                body = stored["body"]
+        return body
+
+    def _store(self, body, encoding):
+        if encoding == "identity":
+            body = gzip.compress(body, 5)
+        elif encoding == "deflate":
+            body = gzip.compress(_decoder(encoding).decompress(body), 5)
+        expires_at = time.time() + self.ttl
+        self._entry = (expires_at, body)
+        if self.backend:
+            try:
+                self.backend.set(CACHE_KEY, {"expires_at": expires_at, "etag": None, "last_modified": None,
+                                             "body": body}, expires_at)
+            except Exception as e:
+                print(f"Odds cache write failed: {e}")
+
+    def _pump(self, flight):
+        response = None
+        try:
+            response = betting.get(self.url, stream=True)
+            flight.status = response.status_code
+            flight.encoding = response.headers.get("Content-Encoding", "identity").lower()
+            flight.ready.set()
+            for chunk in response.raw.stream(CHUNK_SIZE, decode_content=False):
+                with flight.cond:
+                    flight.chunks.append(chunk)
+                    flight.cond.notify_all()
+        except Exception as e:
+            flight.error = e
+            print(f"Error fetching odds: {e}")
+        else:
+            if flight.status == 200 and flight.encoding in CACHEABLE_ENCODINGS:
+                try:
+                    self._store(b"".join(flight.chunks), flight.encoding)
+                except Exception as e:
+                    print(f"Odds cache write failed: {e}")
+        finally:
+            if response is not None:
+                response.close()
+            with self._lock:
+                self._flight = None
+            with flight.cond:
+                flight.done = True
+                flight.cond.notify_all()
+            flight.ready.set()
+
+    @staticmethod
+    def _respond(chunks, encoding, accepts_gzip, length=None):
+        headers = {"Content-Type": "application/json", "Vary": "Accept-Encoding"}
+        decoder = None if encoding == "identity" or (encoding == "gzip" and accepts_gzip) else _decoder(encoding)
+        if decoder is None:
+            if encoding != "identity":
+                headers["Content-Encoding"] = encoding
+            if length is not None:
+                headers["Content-Length"] = str(length)
+            return headers, chunks
+
+        def decoded():
+            for chunk in chunks:
+                yield decoder.decompress(chunk)
+            yield decoder.flush()
+
+        return headers, decoded()
+
+    def open(self, accept_encoding=""):
+        """Status, headers and a chunk iterator for one /odds response."""
+        accepts_gzip = "gzip" in (accept_encoding or "").lower()
+        body = self._cached()
+        flight = None
+        if body is None:
+            with self._lock:
+                body = self._fresh()
+                if body is None:
+                    flight = self._flight
+                    if flight is None:
+                        flight = self._flight = _Flight()
+                        self.fetches += 1
+                        threading.Thread(target=self._pump, args=(flight,), name="odds-fetch", daemon=True).start()
+                    else:
+                        self.coalesced += 1
+
+        if flight is None:
+            self.hits += 1
+            chunks = (body[i:i + CHUNK_SIZE] for i in range(0, len(body), CHUNK_SIZE))
+            headers, chunks = self._respond(chunks, "gzip", accepts_gzip, len(body))
+            return 200, headers, chunks
+
+        flight.ready.wait()
+        if flight.status is None:
+            raise flight.error
+        headers, chunks = self._respond(flight.read(), flight.encoding, accepts_gzip)
+        return flight.status, headers, chunks
+
+    def clear(self):
+        self._entry = None
+
+    def stats(self):
+        entry = self._entry
+        return {
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "fetches": self.fetches,
+            "coalesced": self.coalesced,
+            "cached_bytes": len(entry[1]) if entry else 0,
+            "expires_in": round(entry[0] - time.time(), 1) if entry else None,
+        }
+
+
+odds_proxy = OddsProxy()
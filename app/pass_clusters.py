@@ -0,0 +1,50 @@
+from .config import duckdb_pool
+
+PASS_CLUSTERS_PATH = "s3://footlyiq-data/gold/pass_clustering/parquet/ALL_clustered_passes_1_colab.parquet"
+LAST_THIRD_PATH = "s3://footlyiq-data/gold/pass_clustering/parquet/FINAL-3rd_clustered_passes_1.parquet"
+
+# Stolpci, po katerih lahko filtriramo, in primerjava, ki jo uporabimo
+FILTER_OPERATORS = {
+    "successful": "=",
+    "pass_high": "=",
+    "long_pass": "=",
+    "pass_length": ">=",
+}
+
+
+def top_pass_clusters(s3_path, team_id, filters=None, top_labels=6, limit=100):
+    """
+    Returns the passes of the team's `top_labels` most frequent clusters (at most `limit` rows).
+
+    team_id and the optional filters are pushed into the parquet scan, so DuckDB only
+    fetches the row groups and columns it needs from S3 instead of the whole file.
+    Rows keep the file order, like df.head(limit) did on the full DataFrame.
+    """
+    conditions = ["team_id = ?"]
+    params = [s3_path, team_id]
+    for field, value in (filters or {}).items():
+        conditions.append(f"{field} {FILTER_OPERATORS[field]} ?")
+        params.append(value)
+    params += [top_labels, limit]
+
+    query = f"""
+        WITH team_passes AS (
+            SELECT *
+            FROM read_parquet(?, file_row_number = true)
+            WHERE {" AND ".join(conditions)}
+        ),
+        top_labels AS (
+            SELECT label
+            FROM team_passes
+            GROUP BY label
+            ORDER BY count(*) DESC, min(file_row_number)
+            LIMIT ?
+        )
+        SELECT * EXCLUDE (file_row_number)
+        FROM team_passes
+        WHERE label IN (SELECT label FROM top_labels)
+        ORDER BY file_row_number
+        LIMIT ?
+    """
+    with duckdb_pool.connection() as cursor:
+        return cursor.execute(query, params).fetchdf()
@@ -0,0 +1,128 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .datasets import DatasetView
+
+PITCH_WIDTH = 105
+PITCH_HEIGHT = 68
+XT_X_BINS = 16
+XT_Y_BINS = 12
+XG_DEFAULT_BINS = 10
+XG_MAX_BINS = 50
+
+
+def bin_index(values, edges, include_last_edge=True):
+    """
+    Vectorised equivalent of the binning np.histogram2d does: returns the bin of every
+    value and a mask of values inside [edges[0], edges[-1]]. With include_last_edge=False
+    the last edge is exclusive, which matches np.digitize(value, edges) - 1.
+    """
+    values = np.asarray(values, dtype=float)
+    idx = np.searchsorted(edges, values, side="right") - 1
+    if include_last_edge:
+        idx[values == edges[-1]] = len(edges) - 2
+        valid = (values >= edges[0]) & (values <= edges[-1])
+    else:
+        valid = (values >= edges[0]) & (values < edges[-1])
+    return idx, valid
+
+
+def index_teams(teams):
+    """Map factorised team ids (numpy scalars) to their row in a team cube."""
+    return {team.item() if hasattr(team, "item") else team: row for row, team in enumerate(teams)}
+
+
+class TeamGrid:
+    """Dense team × x_bins × y_bins array with a team_id -> row lookup."""
+
+    def __init__(self, team_rows, grid):
+        self.team_rows = team_rows
+        self.grid = grid
+
+    def for_team(self, team_id):
+        row = self.team_rows.get(team_id)
+        if row is None:
+            return np.zeros(self.grid.shape[1:], dtype=self.grid.dtype)
+        return self.grid[row]
+
+
+def build_count_cube(df, x_col="start_x", y_col="start_y", x_bins=XT_X_BINS, y_bins=XT_Y_BINS):
+    """Count events per (team, x bin, y bin) for every team in one pass."""
+    codes, teams = pd.factorize(df["team_id"])
+    x_edges = np.linspace(0, PITCH_WIDTH, x_bins + 1)
+    y_edges = np.linspace(0, PITCH_HEIGHT, y_bins + 1)
+    xi, x_ok = bin_index(df[x_col], x_edges)
+    yi, y_ok = bin_index(df[y_col], y_edges)
+    valid = x_ok & y_ok & (codes >= 0)
+
+    flat = (codes[valid] * x_bins + xi[valid]) * y_bins + yi[valid]
+    counts = np.bincount(flat, minlength=len(teams) * x_bins * y_bins)
+    grid = counts.reshape(len(teams), x_bins, y_bins).astype(np.int32)
+    return TeamGrid(index_teams(teams), grid)
+
+
+class XGHeatmap(TeamGrid):
+    """Average xG per pitch cell for every team, plus memoised JSON payloads per team."""
+
+    def __init__(self, team_rows, grid, x_edges, y_edges):
+        super().__init__(team_rows, grid)
+        x_centers = (x_edges[:-1] + x_edges[1:]) / 2
+        y_centers = (y_edges[:-1] + y_edges[1:]) / 2
+        # Celice v enakem vrstnem redu kot prej: najprej po x, nato po y
+        self._xs = np.repeat(x_centers, len(y_centers)).tolist()
+        self._ys = np.tile(y_centers, len(x_centers)).tolist()
+        self._payloads = {}
+
+    def payload(self, team_id):
+        cached = self._payloads.get(team_id)
+        if cached is None:
+            values = self.for_team(team_id).ravel().tolist()
+            cached = [{"x": x, "y": y, "xG": v} for x, y, v in zip(self._xs, self._ys, values)]
+            self._payloads[team_id] = cached
+        return cached
+
+
+def build_xg_heatmap(df, bins):
+    """Shot counts and summed xG per (team, x bin, y bin) in one weighted pass, then averaged."""
+    codes, teams = pd.factorize(df["team_id"])
+    x_edges = np.linspace(0, PITCH_WIDTH, bins + 1)
+    y_edges = np.linspace(0, PITCH_HEIGHT, bins + 1)
+    xi, x_ok = bin_index(df["X"], x_edges, include_last_edge=False)
+    yi, y_ok = bin_index(df["Y"], y_edges, include_last_edge=False)
+    valid = x_ok & y_ok & (codes >= 0)
+
+    flat = (codes[valid] * bins + xi[valid]) * bins + yi[valid]
+    size = len(teams) * bins * bins
+    shot_grid = np.bincount(flat, minlength=size).reshape(len(teams), bins, bins)
+    xg_grid = np.bincount(
+        flat, weights=df["xG"].to_numpy(dtype=float)[valid], minlength=size
+    ).reshape(len(teams), bins, bins)
+
+    avg_xg_grid = np.zeros_like(xg_grid)
+    np.divide(xg_grid, shot_grid, out=avg_xg_grid, where=shot_grid != 0)
+    avg_xg_grid = np.nan_to_num(avg_xg_grid)
+
+    return XGHeatmap(index_teams(teams), avg_xg_grid, x_edges, y_edges)
+
+
+_xg_heatmaps = {}
+_xg_heatmaps_lock = threading.Lock()
+
+
+def xg_heatmap(bins=XG_DEFAULT_BINS):
+    """Return the all-teams xG heatmap for a resolution, built once per resolution and dataset version."""
+    with _xg_heatmaps_lock:
+        view = _xg_heatmaps.get(bins)
+        if view is None:
+            view = DatasetView(
+                "footlyiq-data", "gold/xG/parquet/xG_done_filtered.parquet",
+                lambda df: build_xg_heatmap(df, bins),
+            )
+            _xg_heatmaps[bins] = view
+    return view.get()
+
+
+moving_cube = DatasetView("footlyiq-data", "gold/xT/parquet/moving_small.parquet", build_count_cube)
+shots_cube = DatasetView("footlyiq-data", "gold/xT/parquet/shots_small.parquet", build_count_cube)
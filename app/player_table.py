@@ -0,0 +1,88 @@
+import threading
+
+import numpy as np
+
+from .utils import get_bootstrap_static
+
+
+class PlayerTable:
+    """
+    Columnar view of bootstrap-static `elements`.
+
+    id, team, position (element_type), now_cost, form and status are NumPy arrays
+    with one row per player, plus an id -> row index. Candidate searches are mask
+    and partition operations over these arrays instead of loops over ~700 dicts.
+    """
+
+    def __init__(self, elements):
+        self.elements = elements
+        self.ids = np.array([el["id"] for el in elements], dtype=np.int64)
+        self.team = np.array([el["team"] for el in elements], dtype=np.int64)
+        self.position = np.array([el["element_type"] for el in elements], dtype=np.int64)
+        self.now_cost = np.array([el["now_cost"] for el in elements], dtype=np.int64)
+        self.form = np.array([float(el.get("form", 0) or 0) for el in elements], dtype=float)
+        self.status = np.array([el.get("status") or "" for el in elements], dtype="U1")
+        self.row = {pid: i for i, pid in enumerate(self.ids.tolist())}
+
+    def __len__(self):
+        return len(self.elements)
+
+    def player(self, player_id):
+        """Element dict of a player, or None."""
+        row = self.row.get(player_id)
+        return None if row is None else self.elements[row]
+
+    def rows(self, player_ids):
+        return np.array([self.row[pid] for pid in player_ids if pid in self.row], dtype=np.int64)
+
+    def by_form(self, rows, k=None, lowest=False):
+        """
+        Rows sorted by form (highest first, or lowest first), at most k of them.
+        Ties keep the input order, exactly like a stable sorted(...)[:k].
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        if k is not None and k <= 0:
+            return rows[:0]
+        key = self.form[rows] if lowest else -self.form[rows]
+        if k is not None and k < len(rows):
+            # k-ta vrednost; vse manjše vzamemo, enake pa po vrstnem redu do k
+            kth = np.partition(key, k - 1)[k - 1]
+            take = key < kth
+            ties = np.flatnonzero(key == kth)[:k - int(take.sum())]
+            take[ties] = True
+            rows, key = rows[take], key[take]
+        order = np.lexsort((np.arange(len(rows)), key))
+        return rows[order]
+
+    def candidates(self, position=None, max_cost=None, exclude_ids=(), k=None):
+        """
+        Element dicts of players matching position, costing at most max_cost (in
+        millions, like now_cost / 10) and not in exclude_ids, top k by form.
+        """
+        mask = np.ones(len(self.ids), dtype=bool)
+        if position is not None:
+            mask &= self.position == position
+        if max_cost is not None:
+            mask &= self.now_cost / 10 <= max_cost
+        if len(exclude_ids):
+            mask &= ~np.isin(self.ids, np.fromiter(exclude_ids, dtype=np.int64))
+        rows = self.by_form(np.flatnonzero(mask), k)
+        return [self.elements[i] for i in rows.tolist()]
+
+
+_table = None
+_table_source = None
+_table_lock = threading.Lock()
+
+
+def get_player_table(bootstrap=None):
+    """PlayerTable for the current bootstrap-static payload, rebuilt only when it is refreshed."""
+    global _table, _table_source
+    if bootstrap is None:
+        bootstrap = get_bootstrap_static()
+    if bootstrap is not _table_source:
+        with _table_lock:
+            if bootstrap is not _table_source:
+                _table = PlayerTable(bootstrap["elements"])
+                _table_source = bootstrap
+    return _table
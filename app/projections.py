@@ -0,0 +1,309 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .cache import SingleFlight
+from .config import PROJECTIONS_REFRESH_SECONDS
+from .player_table import get_player_table
+from .utils import (HISTORY_FETCH_TIMEOUT, get_bootstrap_static, get_upcoming_fixtures, load_player_history,
+                    get_next_fixture, predict_points)
+
+PROJECTION_HORIZON = 8  # gameweeks projected ahead of the base gameweek
+CAPTAIN_POSITION_BIAS = {3: 1.20, 4: 1.15}  # MID, FWD
+SORT_COLUMNS = ["predicted_points", "captaincy_score", "transfer_score", "horizon_points", "form", "now_cost"]
+BUILD_FETCH_WORKERS = 4  # lasten bazen, da gradnja ne zamuja zgodovin, ki jih čakajo zahteve
+
+_build_executor = ThreadPoolExecutor(max_workers=BUILD_FETCH_WORKERS, thread_name_prefix="fpl-projections-fetch")
+
+
+def fetch_build_histories(player_ids, timeout=HISTORY_FETCH_TIMEOUT):
+    """
+    Histories of every player for a projection build, fetched on the build's own pool.
+
+    Each fetch has its own `timeout`; there is no deadline for the whole batch.
+    Raises when any history could not be fetched, so an incomplete table is never built.
+    """
+    futures = {pid: _build_executor.submit(load_player_history, pid, timeout) for pid in player_ids}
+    histories, failed = {}, []
+    for pid, future in futures.items():
+        try:
+            histories[pid] = future.result()
+        except Exception as e:
+            print(f"Error fetching history for player {pid}: {e}")
+            failed.append(pid)
+    if failed:
+        raise RuntimeError(f"History missing for {len(failed)} of {len(futures)} players")
+    return histories
+
+
+def captaincy_projection(player, history, fixtures, selected_gw):
+    """Captaincy numbers of one player computed on request (what ProjectionTable.captaincy precomputes)."""
+    recent_history = [gw for gw in history if selected_gw - 3 <= gw["round"] <= selected_gw]
+    return _projection(player, recent_history, fixtures, selected_gw, CAPTAIN_POSITION_BIAS.get(player["element_type"], 1.0))
+
+
+def transfer_projection(player, history, fixtures, selected_gw):
+    """Transfer numbers of one player computed on request (what ProjectionTable.transfer precomputes)."""
+    recent_history = [gw for gw in history if gw["round"] < selected_gw][-3:]
+    return _projection(player, recent_history, fixtures, selected_gw, 1.0)
+
+
+def _projection(player, recent_history, fixtures, selected_gw, bias):
+    if not recent_history:
+        return None
+    next_fixture = get_next_fixture(player, fixtures, selected_gw)
+    if not next_fixture:
+        return None
+    avg_points = sum(gw["total_points"] for gw in recent_history) / len(recent_history)
+    fdr = next_fixture["fdr"]
+    is_home = next_fixture["is_home"]
+    return {
+        "avg_points": avg_points,
+        "score": avg_points * (6 - fdr) * bias + (1 if is_home else 0),
+        "predicted_points": predict_points(player, recent_history, next_fixture),
+        "next_fixture": {"opponent_team": next_fixture["opponent_team"], "is_home": is_home, "fdr": fdr},
+    }
+
+
+class ProjectionTable:
+    """
+    Projections for every element for the gameweeks after `base_gw`.
+
+    All columns are NumPy arrays aligned with the rows of the PlayerTable:
+    recent averages (the captaincy window and the transfers window), the next
+    fixture, predicted points, captaincy and transfer scores, and predicted
+    points per gameweek for the next `horizon` gameweeks. The numbers match
+    what captaincy_projection / transfer_projection compute for one player.
+    """
+
+    def __init__(self, players, fixtures, histories, base_gw, horizon=PROJECTION_HORIZON):
+        self.players = players
+        self.base_gw = base_gw
+        self.horizon = horizon
+        self.built_at = time.time()
+        n = len(players)
+
+        # Zgodovine sploščimo v tri stolpce (vrstica igralca, krog, točke)
+        rows, rounds, points = [], [], []
+        for row, pid in enumerate(players.ids.tolist()):
+            for gw in histories.get(pid) or []:
+                rows.append(row)
+                rounds.append(gw["round"])
+                points.append(gw["total_points"])
+        rows = np.array(rows, dtype=np.int64)
+        rounds = np.array(rounds, dtype=np.int64)
+        points = np.array(points, dtype=float)
+
+        # Kapetan: vsi nastopi v krogih base_gw - 3 .. base_gw
+        in_window = (rounds >= base_gw - 3) & (rounds <= base_gw)
+        captain_count = np.bincount(rows[in_window], minlength=n)
+        captain_total = np.bincount(rows[in_window], weights=points[in_window], minlength=n)
+
+        # Prestopi: zadnji trije nastopi pred base_gw
+        before = rounds < base_gw
+        r, p = rows[before], points[before]
+        per_row = np.bincount(r, minlength=n)
+        starts = np.cumsum(per_row) - per_row
+        from_end = per_row[r] - (np.arange(len(r)) - starts[r])
+        last3 = from_end <= 3
+        transfer_count = np.bincount(r[last3], minlength=n)
+        transfer_total = np.bincount(r[last3], weights=p[last3], minlength=n)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.captain_avg = np.where(captain_count > 0, captain_total / captain_count, 0.0)
+            self.transfer_avg = np.where(transfer_count > 0, transfer_total / transfer_count, 0.0)
+        self.has_captain_history = captain_count > 0
+        self.has_transfer_history = transfer_count > 0
+
+        # Naslednja tekma in tekme v obzorju, najprej po ekipah, nato po igralcih
+        n_teams = int(players.team.max()) + 1 if n else 1
+        next_opponent = np.zeros(n_teams, dtype=np.int64)
+        next_home = np.zeros(n_teams, dtype=bool)
+        next_fdr = np.full(n_teams, 3, dtype=np.int64)
+        has_next = np.zeros(n_teams, dtype=bool)
+        gw_count = np.zeros((n_teams, horizon), dtype=np.int64)
+        gw_factor = np.zeros((n_teams, horizon), dtype=float)
+        for team in range(n_teams):
+            upcoming = fixtures.next_fixtures(team, base_gw - 1)
+            following = [f for f in upcoming if f["event"] > base_gw]
+            if following:
+                has_next[team] = True
+                next_opponent[team] = following[0]["opponent_team"]
+                next_home[team] = following[0]["is_home"]
+                next_fdr[team] = following[0]["fdr"]
+            for f in upcoming:
+                offset = f["event"] - base_gw
+                if offset >= horizon:
+                    break
+                gw_count[team, offset] += 1
+                gw_factor[team, offset] += max(0.5, 6 - f["fdr"]) / 5
+
+        team = players.team
+        self.has_next = has_next[team]
+        self.next_opponent = next_opponent[team]
+        self.next_home = next_home[team]
+        self.next_fdr = next_fdr[team]
+        form = players.form
+        fixture_factor = np.maximum(0.5, 6 - self.next_fdr) / 5
+        home_bonus = self.next_home.astype(float)
+
+        bias = np.ones(n)
+        for position, value in CAPTAIN_POSITION_BIAS.items():
+            bias[players.position == position] = value
+        self.captain_score = self.captain_avg * (6 - self.next_fdr) * bias + home_bonus
+        self.captain_predicted = 0.5 * self.captain_avg + 0.3 * form + 0.2 * fixture_factor * self.captain_avg
+        self.transfer_score = self.transfer_avg * (6 - self.next_fdr) + home_bonus
+        self.transfer_predicted = 0.5 * self.transfer_avg + 0.3 * form + 0.2 * fixture_factor * self.transfer_avg
+
+        # predict_points za vsako tekmo v krogu, seštejemo po krogih
+        a = self.transfer_avg[:, None]
+        self.gameweek_points = (
+            gw_count[team] * (0.5 * a + 0.3 * form[:, None]) + 0.2 * a * gw_factor[team]
+        ).astype(np.float32)
+
+    def __len__(self):
+        return len(self.players)
+
+    @property
+    def nbytes(self):
+        return sum(value.nbytes for value in vars(self).values() if isinstance(value, np.ndarray))
+
+    def _entry(self, row, avg, score, predicted, has_history):
+        if not has_history[row] or not self.has_next[row]:
+            return None
+        return {
+            "avg_points": float(avg[row]),
+            "score": float(score[row]),
+            "predicted_points": round(float(predicted[row]), 2),
+            "next_fixture": {
+                "opponent_team": int(self.next_opponent[row]),
+                "is_home": bool(self.next_home[row]),
+                "fdr": int(self.next_fdr[row]),
+            },
+        }
+
+    def captaincy(self, player_id):
+        row = self.players.row.get(player_id)
+        if row is None:
+            return None
+        return self._entry(row, self.captain_avg, self.captain_score, self.captain_predicted, self.has_captain_history)
+
+    def transfer(self, player_id):
+        row = self.players.row.get(player_id)
+        if row is None:
+            return None
+        return self._entry(row, self.transfer_avg, self.transfer_score, self.transfer_predicted, self.has_transfer_history)
+
+    def horizon_points(self, horizon):
+        """Predicted points of every row summed over the first `horizon` gameweeks."""
+        return self.gameweek_points[:, :horizon].sum(axis=1, dtype=float)
+
+    def query(self, sort="predicted_points", descending=True, position=None, team=None, max_cost=None,
+              horizon=3, limit=50):
+        """Rows matching the filters, sorted by one of SORT_COLUMNS, at most `limit` of them."""
+        players = self.players
+        mask = np.ones(len(players), dtype=bool)
+        if position is not None:
+            mask &= players.position == position
+        if team is not None:
+            mask &= players.team == team
+        if max_cost is not None:
+            mask &= players.now_cost / 10 <= max_cost
+        columns = {
+            "predicted_points": self.transfer_predicted,
+            "captaincy_score": self.captain_score,
+            "transfer_score": self.transfer_score,
+            "horizon_points": self.horizon_points(horizon),
+            "form": players.form,
+            "now_cost": players.now_cost,
+        }
+        values = columns[sort]
+        rows = np.flatnonzero(mask)
+        key = -values[rows] if descending else values[rows]
+        return rows[np.lexsort((rows, key))][:limit]
+
+
+class ProjectionStore:
+    """
+    Holds the current ProjectionTable and rebuilds it in a background thread.
+
+    The first get() starts the thread; until the first build finishes get()
+    returns None and callers compute on request. Each rebuild reuses the
+    cached bootstrap, fixtures and player histories, so only histories that
+    expired are fetched again. A build with missing histories fails and the
+    previous table stays in place.
+    """
+
+    def __init__(self, refresh_seconds=PROJECTIONS_REFRESH_SECONDS, horizon=PROJECTION_HORIZON):
+        self.refresh_seconds = refresh_seconds
+        self.horizon = horizon
+        self.table = None
+        self.build_seconds = None
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def refresh(self):
+        def build():
+            started = time.perf_counter()
+            bootstrap = get_bootstrap_static()
+            players = get_player_table(bootstrap)
+            current = next((e for e in bootstrap["events"] if e["is_current"]), None)
+            base_gw = (current["id"] + 1) if current else 38
+            fixtures = get_upcoming_fixtures()
+            histories = fetch_build_histories(players.ids.tolist())
+            table = ProjectionTable(players, fixtures, histories, base_gw, self.horizon)
+            self.table = table
+            self.build_seconds = round(time.perf_counter() - started, 2)
+            print(f"Projections for GW {base_gw} built for {len(table)} players in {self.build_seconds} s "
+                  f"({table.nbytes / 1024:.0f} KiB)")
+            return table
+
+        return self._flight.do("projections", build)
+
+    def _refresh_loop(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error building projections: {e}")
+            time.sleep(self.refresh_seconds)
+
+    def start(self):
+        if self._thread is not None or not self.refresh_seconds:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._refresh_loop, name="fpl-projections", daemon=True)
+                self._thread.start()
+
+    def get(self, base_gw=None):
+        """The current table (None while it is being built or when it is for another base gameweek)."""
+        self.start()
+        table = self.table
+        if table is None or (base_gw is not None and table.base_gw != base_gw):
+            return None
+        return table
+
+    def get_or_build(self):
+        """The current table, building it synchronously if there is none yet."""
+        self.start()
+        return self.table if self.table is not None else self.refresh()
+
+    def clear(self):
+        self.table = None
+
+    def stats(self):
+        table = self.table
+        return {
+            "base_gw": table.base_gw if table else None,
+            "players": len(table) if table else 0,
+            "bytes": table.nbytes if table else 0,
+            "build_seconds": self.build_seconds,
+            "age": round(time.time() - table.built_at, 1) if table else None,
+        }
+
+
+projection_store = ProjectionStore()
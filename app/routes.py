@@ -1,11 +1,23 @@
 from flask import Blueprint, Response, jsonify, request
-from .utils import get_team_matches, get_team_squad,get_match_statistics, get_matches_from_api, get_player_details, get_player_matches, get_team_filters, get_competition_details, get_player_history, get_upcoming_fixtures,get_next_fixture, predict_points, search_players_from_microservice, search_teams_from_microservice
+from .utils import get_team_matches, get_team_squad,get_match_statistics, get_matches, get_player_details, get_player_matches, get_team_filters, get_competition_details, get_player_histories, get_entry_picks, get_entries_picks, get_upcoming_fixtures, predict_horizon_points, get_bootstrap_static, search_players as search_player_names, search_teams as search_team_names, matches_cache, name_search
 import json
-import requests
-from .config import db, s3, con, MICROSERVICE_URL, FPL_PROXY_URL
+import queue
+from .config import db, FPL_PROXY_URL
+from .datasets import load_parquet_from_s3
+from .team_index import team_index
+from .formats import dataframe_response
+from .shared_cache import fpl_get
+from .player_table import get_player_table
+from .live import live_engine
+from .upstream import upstream_stats
+from .odds_proxy import odds_proxy
+from .projections import projection_store, captaincy_projection, transfer_projection, SORT_COLUMNS
+from .scoring import get_player_breakdown, get_player_breakdowns, STAT_LABELS
+from .transfer_solver import optimal_transfers, MAX_TRANSFERS, DEFAULT_HORIZON, MAX_HORIZON, POOL_PER_POSITION
+from .pass_clusters import top_pass_clusters, PASS_CLUSTERS_PATH, LAST_THIRD_PATH
+from .pitch_grids import moving_cube, shots_cube, xg_heatmap, XT_X_BINS, XT_Y_BINS, XG_DEFAULT_BINS, XG_MAX_BINS, PITCH_WIDTH, PITCH_HEIGHT
 import pandas as pd
 import numpy as np
-import io
 
 
 
@@ -18,7 +30,7 @@ def fetch_matches():
         # Get date from query parameters, but don't provide a default
         # Let the microservice handle the default case
         date = request.args.get('date')
-        data = get_matches_from_api(date)
+        data = get_matches(date)
         
         if "error" in data:
             return jsonify(data), 500
@@ -27,6 +39,11 @@ def fetch_matches():
     except Exception as e:
         return jsonify({'error': str(e)}), 500 
 
+@main.route('/matches/stats', methods=['GET'])
+def fetch_matches_stats():
+    """Hit/miss counters and match counts of the /matches cache."""
+    return jsonify(matches_cache.stats())
+
 @main.route('/team-matches/<int:team_id>', methods=['GET'])
 def fetch_team_matches(team_id):
     season = request.args.get('season')
@@ -114,73 +131,153 @@ def get_fpl_team(team_id):
 
         # API-ji
         picks_url = f"{FPL_PROXY_URL}/entry/{team_id}/event/{gw}/picks/"
-        elements_url = f"{FPL_PROXY_URL}/bootstrap-static/"
-        live_url = f"{FPL_PROXY_URL}/event/{gw}/live/"
 
         # Fetch podatkov
-        picks_res = requests.get(picks_url)
+        picks_res = fpl_get(picks_url)
         if picks_res.status_code != 200:
             return jsonify({"error": "Team not found"}), 404
         picks_data = picks_res.json()
 
-        elements = requests.get(elements_url).json()["elements"]
-        live_stats = requests.get(live_url).json()["elements"]
+        elements = get_bootstrap_static()["elements"]
 
-        # Mape za lookup
+        # Mape za lookup; live točke so skupne za cel proces (live_engine)
         player_map = {player["id"]: player for player in elements}
-        live_points_map = {player["id"]: player["stats"]["total_points"] for player in live_stats}
+        live_points_map = live_engine.points_map(gw)
 
-        starting_players = []
-        bench_players = []
-        total_points = 0
+        return jsonify(build_fpl_squad(picks_data, player_map, live_points_map)), 200
 
-        for pick in picks_data["picks"]:
-            player_id = pick["element"]
-            player = player_map[player_id]
+    except Exception as e:
+        print(f"Error: {e}")
+        return jsonify({"error": "Internal Server Error"}), 500
 
-            # Določi osnovne točke
-            base_points = live_points_map.get(player_id, 0)
-            # Če je kapetan, podvoji točke
-            points = base_points * 2 if pick["is_captain"] else base_points
+def build_fpl_squad(picks_data, player_map, live_points_map):
+    """Starting XI, bench and total points of one entry from its picks and the live points."""
+    starting_players = []
+    bench_players = []
+    total_points = 0
+
+    for pick in picks_data["picks"]:
+        player_id = pick["element"]
+        player = player_map[player_id]
+
+        # Določi osnovne točke
+        base_points = live_points_map.get(player_id, 0)
+        # Če je kapetan, podvoji točke
+        points = base_points * 2 if pick["is_captain"] else base_points
+
+        player_data = {
+            "id": player_id,
+            "first_name": player["first_name"],
+            "second_name": player["second_name"],
+            "position": player["element_type"],
+            "team": player["team"],
+            "multiplier": pick["multiplier"],
+            "is_captain": pick["is_captain"],
+            "is_vice_captain": pick["is_vice_captain"],
+            "points": points,
+            "status": player["status"],
+            "news": player["news"],
+            "news_added": player["news_added"],
+            "chance_of_playing_next_round": player["chance_of_playing_next_round"],
+        }
 
-            player_data = {
-                "id": player_id,
-                "first_name": player["first_name"],
-                "second_name": player["second_name"],
-                "position": player["element_type"],
-                "team": player["team"],
-                "multiplier": pick["multiplier"],
-                "is_captain": pick["is_captain"],
-                "is_vice_captain": pick["is_vice_captain"],
-                "points": points,
-                "status": player["status"],
-                "news": player["news"],
-                "news_added": player["news_added"],
-                "chance_of_playing_next_round": player["chance_of_playing_next_round"],
-            }
-
-            if pick["position"] <= 11:
-                starting_players.append(player_data)
-                total_points += points
-            else:
-                bench_players.append(player_data)
+        if pick["position"] <= 11:
+            starting_players.append(player_data)
+            total_points += points
+        else:
+            bench_players.append(player_data)
 
-        return jsonify({
-            "starting_players": starting_players,
-            "bench_players": bench_players,
-            "total_points": total_points
-        }), 200
+    return {
+        "starting_players": starting_players,
+        "bench_players": bench_players,
+        "total_points": total_points
+    }
 
+MAX_BATCH_TEAMS = 50
+
+@main.route('/api/fpl/teams', methods=['GET'])
+def get_fpl_teams():
+    try:
+        gw = request.args.get("gameweek", type=int)
+        if not gw:
+            return jsonify({"error": "Missing gameweek parameter"}), 400
+        try:
+            team_ids = list(dict.fromkeys(int(tid) for tid in request.args.get("ids", "").split(",") if tid.strip()))
+        except ValueError:
+            return jsonify({"error": "ids must be a comma-separated list of team ids"}), 400
+        if not team_ids or len(team_ids) > MAX_BATCH_TEAMS:
+            return jsonify({"error": f"Provide between 1 and {MAX_BATCH_TEAMS} team ids"}), 400
+
+        # Bootstrap in live točke enkrat za vse ekipe, picks vzporedno
+        picks_by_team = get_entries_picks(team_ids, gw)
+        player_map = {player["id"]: player for player in get_bootstrap_static()["elements"]}
+        live_points_map = live_engine.points_map(gw)
+
+        teams = []
+        for team_id in team_ids:
+            picks_data = picks_by_team[team_id]
+            if "error" in picks_data:
+                teams.append({"team_id": team_id, "error": picks_data["error"]})
+                continue
+            try:
+                teams.append({"team_id": team_id, **build_fpl_squad(picks_data, player_map, live_points_map)})
+            except Exception as e:
+                print(f"Error building team {team_id}: {e}")
+                teams.append({"team_id": team_id, "error": "Failed to build team"})
+
+        return jsonify({"gameweek": gw, "teams": teams}), 200
     except Exception as e:
         print(f"Error: {e}")
         return jsonify({"error": "Internal Server Error"}), 500
 
+SSE_KEEPALIVE_SECONDS = 15
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@main.route('/api/fpl/team/<int:team_id>/live', methods=['GET'])
+def stream_fpl_team_live(team_id):
+    """Server-sent events: the full squad first, then only the players whose live points changed."""
+    try:
+        gw = request.args.get("gameweek", type=int)
+        if not gw:
+            return jsonify({"error": "Missing gameweek parameter"}), 400
+        picks_data = get_entry_picks(team_id, gw)
+        if "error" in picks_data:
+            return jsonify(picks_data), 404
+        player_map = {player["id"]: player for player in get_bootstrap_static()["elements"]}
+        squad = build_fpl_squad(picks_data, player_map, live_engine.points_map(gw))
+    except Exception as e:
+        print(f"Error: {e}")
+        return jsonify({"error": "Internal Server Error"}), 500
+
+    def stream():
+        sub = live_engine.subscribe(gw, [pick["element"] for pick in picks_data["picks"]])
+        try:
+            yield sse_event("squad", squad)
+            while True:
+                try:
+                    changed = sub.queue.get(timeout=SSE_KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                current = build_fpl_squad(picks_data, player_map, live_engine.points_map(gw))
+                players = current["starting_players"] + current["bench_players"]
+                yield sse_event("points", {
+                    "players": [player for player in players if player["id"] in changed],
+                    "total_points": current["total_points"]
+                })
+        finally:
+            # Odjemalec se je odklopil
+            live_engine.unsubscribe(sub)
+
+    return Response(stream(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @main.route("/api/fpl/current-gameweek", methods=["GET"])
 def get_current_gameweek():
     try:
-        res = requests.get(f"{FPL_PROXY_URL}/bootstrap-static/")
-        res.raise_for_status()
-        events = res.json()["events"]
+        events = get_bootstrap_static()["events"]
         current = next((e for e in events if e["is_current"]), None)
         if not current:
             # fallback: next event or last event
@@ -199,139 +296,56 @@ def get_fpl_player_details(player_id):
     # Preberi ali je kapetan iz query param
     is_captain = request.args.get("is_captain", "false").lower() == "true"
 
-    # Fetch player history and static info
-    player_url = f"{FPL_PROXY_URL}/element-summary/{player_id}/"
-    elements_url = f"{FPL_PROXY_URL}/bootstrap-static/"
+    # Razčlenitev cele sezone je v predpomnilniku, tu vzamemo en gameweek
     try:
-        response = requests.get(player_url)
-        response.raise_for_status()
-        data = response.json()
-        bootstrap = requests.get(elements_url).json()
-        elements = bootstrap["elements"]
+        bootstrap = get_bootstrap_static()
         teams = bootstrap["teams"]
-        player_info = next((el for el in elements if el["id"] == player_id), None)
+        player_info = get_player_table(bootstrap).player(player_id)
         if not player_info:
             return jsonify({"error": "Player info not found"}), 404
         position = player_info["element_type"]  # 1=GK, 2=DEF, 3=MID, 4=FWD
+        # Krog, ki se še igra, vedno osvežimo pri viru
+        live = any(e["id"] == gameweek and e.get("is_current") and not e.get("finished")
+                   for e in bootstrap.get("events", []))
+        breakdown = get_player_breakdown(player_id, position, fresh=live)
     except Exception as e:
         return jsonify({"error": "Failed to fetch player data", "details": str(e)}), 500
 
-    # Najdi podatke za gameweek 36
-    gameweek_data = next((gw for gw in data["history"] if gw["round"] == gameweek), None)
+    gameweek_data = next((gw for gw in (breakdown or {}).get("gameweeks", []) if gw["round"] == gameweek), None)
     if not gameweek_data:
         return jsonify({"error": f"No data for gameweek {gameweek}"}), 404
-    
-    print("gameweek_data:", gameweek_data)
-    
+
     # Determine home and away team IDs
     player_team_id = player_info["team"]
     opponent_team_id = gameweek_data["opponent_team"]
-    
+
     if gameweek_data["was_home"]:
         home_team_id = player_team_id
         away_team_id = opponent_team_id
-        home_score = gameweek_data["team_h_score"]
-        away_score = gameweek_data["team_a_score"]
     else:
         home_team_id = opponent_team_id
         away_team_id = player_team_id
-        home_score = gameweek_data["team_h_score"]
-        away_score = gameweek_data["team_a_score"]
-    
+    home_score = gameweek_data["team_h_score"]
+    away_score = gameweek_data["team_a_score"]
+
     # Get team short names
     home_team = next((t for t in teams if t["id"] == home_team_id), None)
     away_team = next((t for t in teams if t["id"] == away_team_id), None)
     home_short = home_team["short_name"] if home_team else "HOME"
     away_short = away_team["short_name"] if away_team else "AWAY"
     score = f"{home_score}–{away_score}"
-    
+
     # Fixture string with short names and score
     fixture = f"{home_short} {score} {away_short}"
 
-    # Points logic by position
-    if position == 1:  # Goalkeeper
-        points_map = {
-            "minutes": 2 if gameweek_data["minutes"] > 59 else 1 if gameweek_data["minutes"] > 0 else 0,
-            "goals_scored": gameweek_data["goals_scored"] * 6,
-            "assists": gameweek_data["assists"] * 3,
-            "clean_sheets": gameweek_data["clean_sheets"] * 4,
-            "goals_conceded": -1 * (gameweek_data["goals_conceded"] // 2),
-            "own_goals": -2 * gameweek_data["own_goals"],
-            "penalties_saved": gameweek_data["penalties_saved"] * 5,
-            "penalties_missed": -2 * gameweek_data["penalties_missed"],
-            "yellow_cards": -1 * gameweek_data["yellow_cards"],
-            "red_cards": -3 * gameweek_data["red_cards"],
-            "saves": (gameweek_data["saves"] // 3),  # 1 point for every 3 saves
-            "bonus": gameweek_data["bonus"],
-        }
-    elif position == 2:  # Defender
-        points_map = {
-            "minutes": 2 if gameweek_data["minutes"] > 59 else 1 if gameweek_data["minutes"] > 0 else 0,
-            "goals_scored": gameweek_data["goals_scored"] * 6,
-            "assists": gameweek_data["assists"] * 3,
-            "clean_sheets": gameweek_data["clean_sheets"] * 4,
-            "goals_conceded": -1 * (gameweek_data["goals_conceded"] // 2),
-            "own_goals": -2 * gameweek_data["own_goals"],
-            "penalties_saved": 0,
-            "penalties_missed": -2 * gameweek_data["penalties_missed"],
-            "yellow_cards": -1 * gameweek_data["yellow_cards"],
-            "red_cards": -3 * gameweek_data["red_cards"],
-            "saves": 0,
-            "bonus": gameweek_data["bonus"],
-        }
-    elif position == 3:  # Midfielder
-        points_map = {
-            "minutes": 2 if gameweek_data["minutes"] > 59 else 1 if gameweek_data["minutes"] > 0 else 0,
-            "goals_scored": gameweek_data["goals_scored"] * 5,
-            "assists": gameweek_data["assists"] * 3,
-            "clean_sheets": gameweek_data["clean_sheets"] * 1,
-            "goals_conceded": 0,
-            "own_goals": -2 * gameweek_data["own_goals"],
-            "penalties_saved": 0,
-            "penalties_missed": -2 * gameweek_data["penalties_missed"],
-            "yellow_cards": -1 * gameweek_data["yellow_cards"],
-            "red_cards": -3 * gameweek_data["red_cards"],
-            "saves": 0,
-            "bonus": gameweek_data["bonus"],
-        }
-    else:  # Forward
-        points_map = {
-            "minutes": 2 if gameweek_data["minutes"] > 59 else 1 if gameweek_data["minutes"] > 0 else 0,
-            "goals_scored": gameweek_data["goals_scored"] * 4,
-            "assists": gameweek_data["assists"] * 3,
-            "clean_sheets": 0,
-            "goals_conceded": 0,
-            "own_goals": -2 * gameweek_data["own_goals"],
-            "penalties_saved": 0,
-            "penalties_missed": -2 * gameweek_data["penalties_missed"],
-            "yellow_cards": -1 * gameweek_data["yellow_cards"],
-            "red_cards": -3 * gameweek_data["red_cards"],
-            "saves": 0,
-            "bonus": gameweek_data["bonus"],
-        }
-
-    label_map = {
-        "minutes": "Minutes Played",
-        "goals_scored": "Goals Scored",
-        "assists": "Assists",
-        "clean_sheets": "Clean Sheets",
-        "goals_conceded": "Goals Conceded",
-        "own_goals": "Own Goals",
-        "penalties_saved": "Penalties Saved",
-        "penalties_missed": "Penalties Missed",
-        "yellow_cards": "Yellow Cards",
-        "red_cards": "Red Cards",
-        "saves": "Saves",
-        "bonus": "Bonus",
-    }
-
+    # Points per stat come from the scoring table (app/scoring.py)
     stats = []
-    for key, points in points_map.items():
-        if points != 0:
+    for key, stat in gameweek_data["stats"].items():
+        if stat["points"] != 0:
             stats.append({
-                "label": label_map[key],
-                "value": gameweek_data[key],
-                "points": points
+                "label": STAT_LABELS[key],
+                "value": stat["value"],
+                "points": stat["points"]
             })
 
     # Only double the total points if captain
@@ -347,37 +361,71 @@ def get_fpl_player_details(player_id):
         "stats": stats
     })
 
+MAX_BREAKDOWN_PLAYERS = 50
+
+@main.route("/api/fpl/season-breakdown", methods=["GET"])
+def get_fpl_season_breakdown():
+    """Per-gameweek, per-stat points for a list of players (?ids=1,2,3), optionally limited to ?from_gw=&to_gw=."""
+    try:
+        try:
+            player_ids = list(dict.fromkeys(int(pid) for pid in request.args.get("ids", "").split(",") if pid.strip()))
+        except ValueError:
+            return jsonify({"error": "ids must be a comma-separated list of player ids"}), 400
+        if not player_ids or len(player_ids) > MAX_BREAKDOWN_PLAYERS:
+            return jsonify({"error": f"Provide between 1 and {MAX_BREAKDOWN_PLAYERS} player ids"}), 400
+        from_gw = request.args.get("from_gw", 1, type=int)
+        to_gw = request.args.get("to_gw", 38, type=int)
+
+        table = get_player_table()
+        positions = {pid: table.player(pid)["element_type"] for pid in player_ids if table.player(pid)}
+        breakdowns = get_player_breakdowns(positions)
+
+        players = []
+        for player_id in player_ids:
+            if player_id not in positions:
+                players.append({"player_id": player_id, "error": "Player not found"})
+                continue
+            breakdown = breakdowns.get(player_id)
+            if breakdown is None:
+                players.append({"player_id": player_id, "error": "No history for player"})
+                continue
+            gameweeks = [gw for gw in breakdown["gameweeks"] if from_gw <= gw["round"] <= to_gw]
+            if len(gameweeks) == len(breakdown["gameweeks"]):
+                totals = breakdown["totals"]
+            else:
+                totals = {stat: sum(gw["stats"][stat]["points"] for gw in gameweeks) for stat in breakdown["totals"]}
+            players.append({
+                "player_id": player_id,
+                "position": breakdown["position"],
+                "gameweeks": gameweeks,
+                "totals": totals,
+                "total_points": sum(gw["total_points"] or 0 for gw in gameweeks)
+            })
+        return jsonify({"players": players})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @main.route("/api/fpl/fixture-difficulty", methods=["GET"])
 def get_fixture_difficulty():
     try:
         gw = request.args.get("gameweek", type=int)
         count = request.args.get("count", type=int) or 5
+        bootstrap = get_bootstrap_static()
         if not gw:
-            res = requests.get(f"{FPL_PROXY_URL}/bootstrap-static/")
-            events = res.json()["events"]
+            events = bootstrap["events"]
             current = next((e for e in events if e["is_current"]), None)
             gw = current["id"] if current else 38
 
-        fixtures = requests.get(f"{FPL_PROXY_URL}/fixtures/").json()
-        teams = requests.get(f"{FPL_PROXY_URL}/bootstrap-static/").json()["teams"]
+        fixtures = get_upcoming_fixtures()
+        teams = bootstrap["teams"]
 
         team_fdr = {team["id"]: 0 for team in teams}
         team_names = {team["id"]: team["name"] for team in teams}
 
         for team_id in team_fdr:
-            # Next 5 fixtures after selected gw
-            next_fixtures = [
-                f for f in fixtures
-                if f["event"] and f["event"] > gw and (f["team_h"] == team_id or f["team_a"] == team_id)
-            ]
-            next_fixtures = sorted(next_fixtures, key=lambda x: x["event"])[:count]
-            total_fdr = 0
-            for f in next_fixtures:
-                if f["team_h"] == team_id:
-                    total_fdr += f["team_h_difficulty"]
-                else:
-                    total_fdr += f["team_a_difficulty"]
-            team_fdr[team_id] = total_fdr
+            # Next `count` fixtures after selected gw, FDR already from the team's side
+            next_fixtures = fixtures.next_fixtures(team_id, gw, count)
+            team_fdr[team_id] = sum(f["fdr"] for f in next_fixtures)
 
         # Sort teams by total FDR (lower = easier)
         easiest = sorted(team_fdr.items(), key=lambda x: x[1])[:5]
@@ -394,8 +442,8 @@ def get_fixture_difficulty():
 def get_fpl_captaincy(team_id):
     try:
         # Fetch static data
-        bootstrap = requests.get(f"{FPL_PROXY_URL}/bootstrap-static/").json()
-        elements = bootstrap["elements"]
+        bootstrap = get_bootstrap_static()
+        table = get_player_table(bootstrap)
         teams = {team["id"]: team for team in bootstrap["teams"]}
         events = bootstrap["events"]
 
@@ -407,43 +455,34 @@ def get_fpl_captaincy(team_id):
             selected_gw = (current_event["id"] + 1) if current_event else 38
 
         picks_url = f"{FPL_PROXY_URL}/entry/{team_id}/event/{selected_gw}/picks/"
-        picks_res = requests.get(picks_url)
+        picks_res = fpl_get(picks_url)
         if picks_res.status_code != 200:
             current = next((e for e in events if e["is_current"]), None)
             picks_url = f"{FPL_PROXY_URL}/entry/{team_id}/event/{current['id']}/picks/"
-            picks_res = requests.get(picks_url)
+            picks_res = fpl_get(picks_url)
             if picks_res.status_code != 200:
                 return jsonify({"error": "Team not found"}), 404
         picks_data = picks_res.json()
         user_player_ids = [pick["element"] for pick in picks_data["picks"]]
-        player_map = {el["id"]: el for el in elements}
-        user_players = [player_map[pid] for pid in user_player_ids if pid in player_map]
+        user_players = [table.player(pid) for pid in user_player_ids if pid in table.row]
 
         fixtures = get_upcoming_fixtures()
 
+        # Precomputed projections when they are for this gameweek, otherwise computed here
+        projections = projection_store.get(selected_gw)
+        if projections is None:
+            # All squad histories are fetched concurrently up front
+            histories = get_player_histories([player["id"] for player in user_players])
+
         captain_candidates = []
         for player in user_players:
-            history = get_player_history(player["id"])
-            recent_history = [gw for gw in history if selected_gw - 3 <= gw["round"] <= selected_gw]
-            if not recent_history:
-                continue
-            avg_points = sum(gw["total_points"] for gw in recent_history) / len(recent_history)
-            next_fixture = get_next_fixture(player, fixtures, selected_gw)
-            if not next_fixture:
-                continue
-            fdr = next_fixture["fdr"]
-            is_home = next_fixture["is_home"]
-
-            position = player["element_type"]
-            if position == 3:
-                bias = 1.20
-            elif position == 4:
-                bias = 1.15
+            if projections is not None:
+                projected = projections.captaincy(player["id"])
             else:
-                bias = 1.0
-
-            score = avg_points * (6 - fdr) * bias + (1 if is_home else 0)
-            predicted = predict_points(player,recent_history, next_fixture)
+                projected = captaincy_projection(player, histories[player["id"]], fixtures, selected_gw)
+            if projected is None:
+                continue
+            next_fixture = projected["next_fixture"]
             captain_candidates.append({
                 "id": player["id"],
                 "first_name": player["first_name"],
@@ -451,14 +490,14 @@ def get_fpl_captaincy(team_id):
                 "team": teams[player["team"]]["name"],
                 "team_id": player["team"],
                 "form": player["form"],
-                "score": score,
-                "avg_points": avg_points,
-                "predicted_points": predicted,
-                "position": position,
+                "score": projected["score"],
+                "avg_points": projected["avg_points"],
+                "predicted_points": projected["predicted_points"],
+                "position": player["element_type"],
                 "next_fixture": {
                     "opponent": teams[next_fixture["opponent_team"]]["name"],
-                    "is_home": is_home,
-                    "fdr": fdr
+                    "is_home": next_fixture["is_home"],
+                    "fdr": next_fixture["fdr"]
                 }
             })
 
@@ -473,8 +512,17 @@ def get_fpl_captaincy(team_id):
 @main.route("/api/fpl/transfers/<int:team_id>", methods=["GET"])
 def get_fpl_transfers(team_id):
     try:
-        bootstrap = requests.get(f"{FPL_PROXY_URL}/bootstrap-static/").json()
-        elements = bootstrap["elements"]
+        # mode=optimal: exact search over combinations of `transfers` transfers
+        mode = request.args.get("mode", "greedy")
+        transfers = request.args.get("transfers", 1, type=int)
+        horizon = request.args.get("horizon", DEFAULT_HORIZON, type=int)
+        if mode not in ("greedy", "optimal"):
+            return jsonify({"error": "mode must be 'greedy' or 'optimal'"}), 400
+        if mode == "optimal" and not (1 <= transfers <= MAX_TRANSFERS and 1 <= horizon <= MAX_HORIZON):
+            return jsonify({"error": f"transfers must be 1-{MAX_TRANSFERS} and horizon 1-{MAX_HORIZON}"}), 400
+
+        bootstrap = get_bootstrap_static()
+        table = get_player_table(bootstrap)
         teams = {team["id"]: team for team in bootstrap["teams"]}
         events = bootstrap["events"]
 
@@ -486,29 +534,28 @@ def get_fpl_transfers(team_id):
             selected_gw = (current_event["id"] + 1) if current_event else 38
 
         picks_url = f"{FPL_PROXY_URL}/entry/{team_id}/event/{selected_gw}/picks/"
-        picks_res = requests.get(picks_url)
+        picks_res = fpl_get(picks_url)
         if picks_res.status_code != 200:
             current = next((e for e in events if e["is_current"]), None)
             picks_url = f"{FPL_PROXY_URL}/entry/{team_id}/event/{current['id']}/picks/"
-            picks_res = requests.get(picks_url)
+            picks_res = fpl_get(picks_url)
             if picks_res.status_code != 200:
                 return jsonify({"error": "Team not found"}), 404
         picks_data = picks_res.json()
         user_player_ids = [pick["element"] for pick in picks_data["picks"]]
-        player_map = {el["id"]: el for el in elements}
-        user_players = [player_map[pid] for pid in user_player_ids if pid in player_map]
+        user_rows = table.rows(user_player_ids)
 
         fixtures = get_upcoming_fixtures()
         
         # Determine the budget using the picks endpoint for the selected gameweek
         picks_url = f"{FPL_PROXY_URL}/entry/{team_id}/event/{selected_gw}/picks/"
-        picks_res = requests.get(picks_url)
+        picks_res = fpl_get(picks_url)
         if picks_res.status_code == 200:
             picks_data = picks_res.json()
             budget = picks_data.get("entry_history", {}).get("bank", 0) / 10
         else:
             entry_history_url = f"{FPL_PROXY_URL}/entry/{team_id}/history/"
-            entry_history_res = requests.get(entry_history_url)
+            entry_history_res = fpl_get(entry_history_url)
             if entry_history_res.status_code == 200:
                 history_data = entry_history_res.json()
                 finished_gws = [gw for gw in history_data["current"] if gw.get("points") is not None]
@@ -520,39 +567,42 @@ def get_fpl_transfers(team_id):
             else:
                 budget = 0
 
+        if mode == "optimal":
+            return jsonify(optimal_transfer_suggestions(
+                table, teams, user_player_ids, budget, fixtures, selected_gw, transfers, horizon
+            ))
 
-        # Sort user players by lowest form (worst performers)
-        user_players_sorted = sorted(user_players, key=lambda x: float(x.get("form", 0)))
-        transfer_out_candidates = user_players_sorted[:3]
+        # Worst performers of the squad (lowest form)
+        transfer_out_candidates = [table.elements[row] for row in table.by_form(user_rows, 3, lowest=True).tolist()]
 
-        transfer_suggestions = []
+        candidates_by_out = []
         for out_player in transfer_out_candidates:
-            out_position = out_player["element_type"]
             out_cost = out_player["now_cost"] / 10
-            max_price = out_cost + budget
-            # Candidates for transfer in (same position, not already in team, within budget)
-            candidates = [
-                p for p in elements
-                if p["id"] not in user_player_ids
-                and p["element_type"] == out_position
-                and p["now_cost"] / 10 <= max_price
-            ]
-            # Limit to top 20 by form
-            candidates = sorted(candidates, key=lambda x: float(x.get("form", 0)), reverse=True)[:20]
+            # Candidates for transfer in (same position, not already in team, within budget), top 20 by form
+            candidates = table.candidates(
+                position=out_player["element_type"],
+                max_cost=out_cost + budget,
+                exclude_ids=user_player_ids,
+                k=20,
+            )
+            candidates_by_out.append((out_player, out_cost, candidates))
+
+        projections = projection_store.get(selected_gw)
+        if projections is None:
+            # Histories of all candidates are fetched concurrently in one batch
+            histories = get_player_histories([c["id"] for _, _, candidates in candidates_by_out for c in candidates])
+
+        transfer_suggestions = []
+        for out_player, out_cost, candidates in candidates_by_out:
             scored_candidates = []
             for candidate in candidates:
-                history = get_player_history(candidate["id"])
-                recent_history = [gw for gw in history if gw["round"] < selected_gw][-3:]
-                if not recent_history:
-                    continue
-                avg_points = sum(gw["total_points"] for gw in recent_history) / len(recent_history)
-                next_fixture = get_next_fixture(candidate, fixtures, selected_gw)
-                if not next_fixture:
+                if projections is not None:
+                    projected = projections.transfer(candidate["id"])
+                else:
+                    projected = transfer_projection(candidate, histories[candidate["id"]], fixtures, selected_gw)
+                if projected is None:
                     continue
-                fdr = next_fixture["fdr"]
-                is_home = next_fixture["is_home"]
-                score = avg_points * (6 - fdr) + (1 if is_home else 0)
-                predicted = predict_points(candidate, recent_history, next_fixture)
+                next_fixture = projected["next_fixture"]
                 scored_candidates.append({
                     "id": candidate["id"],
                     "first_name": candidate["first_name"],
@@ -561,12 +611,12 @@ def get_fpl_transfers(team_id):
                     "team_id": candidate["team"],
                     "form": candidate["form"],
                     "now_cost": candidate["now_cost"] / 10,
-                    "score": score,
-                    "predicted_points": predicted,
+                    "score": projected["score"],
+                    "predicted_points": projected["predicted_points"],
                     "next_fixture": {
                         "opponent": teams[next_fixture["opponent_team"]]["name"],
-                        "is_home": is_home,
-                        "fdr": fdr
+                        "is_home": next_fixture["is_home"],
+                        "fdr": next_fixture["fdr"]
                     }
                 })
             # Sort by score and take top 3 for this out_player
@@ -600,19 +650,123 @@ def get_fpl_transfers(team_id):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def optimal_transfer_suggestions(table, teams, user_player_ids, budget, fixtures, selected_gw, transfers, horizon):
+    projections = projection_store.get(selected_gw)
+    if projections is not None and projections.players is table and horizon <= projections.horizon:
+        # Projekcije pokrivajo vse igralce
+        points = projections.horizon_points(horizon)
+    else:
+        # Točkujemo ekipo in najboljše igralce po formi na vsaki poziciji
+        pool = list(user_player_ids)
+        for position in (1, 2, 3, 4):
+            pool += [p["id"] for p in table.candidates(position=position, exclude_ids=user_player_ids, k=POOL_PER_POSITION)]
+        histories = get_player_histories(pool)
+
+        points = np.full(len(table), np.nan)
+        for player_id in pool:
+            player = table.player(player_id)
+            if player is None:
+                continue
+            recent_history = [gw for gw in histories[player_id] if gw["round"] < selected_gw][-3:]
+            points[table.row[player_id]] = predict_horizon_points(player, recent_history, fixtures, selected_gw, horizon)
+
+    def describe(row):
+        player = table.elements[row]
+        return {
+            "id": player["id"],
+            "first_name": player["first_name"],
+            "second_name": player["second_name"],
+            "team": teams[player["team"]]["name"],
+            "team_id": player["team"],
+            "form": player["form"],
+            "now_cost": player["now_cost"] / 10,
+            "predicted_points": round(float(points[row]), 2),
+        }
+
+    results = optimal_transfers(table, user_player_ids, points, budget, transfers)
+    return {
+        "budget": budget,
+        "mode": "optimal",
+        "transfers": transfers,
+        "horizon": horizon,
+        "top_transfers": [{
+            "out": [describe(row) for row in result["out_rows"]],
+            "in": [describe(row) for row in result["in_rows"]],
+            "gain": round(result["gain"], 2),
+            "bank_after": result["bank_after"] / 10,
+        } for result in results]
+    }
+
+@main.route("/api/fpl/projections", methods=["GET"])
+def get_fpl_projections():
+    """Precomputed projections for all players, sorted and filtered (?sort=&order=&position=&team=&max_cost=&horizon=&limit=)."""
+    try:
+        sort = request.args.get("sort", "predicted_points")
+        order = request.args.get("order", "desc")
+        horizon = request.args.get("horizon", DEFAULT_HORIZON, type=int)
+        limit = request.args.get("limit", 50, type=int)
+        if sort not in SORT_COLUMNS:
+            return jsonify({"error": f"sort must be one of: {', '.join(SORT_COLUMNS)}"}), 400
+        if order not in ("asc", "desc"):
+            return jsonify({"error": "order must be 'asc' or 'desc'"}), 400
+
+        projections = projection_store.get_or_build()
+        if not 1 <= horizon <= projections.horizon:
+            return jsonify({"error": f"horizon must be between 1 and {projections.horizon}"}), 400
+
+        rows = projections.query(
+            sort=sort,
+            descending=order == "desc",
+            position=request.args.get("position", type=int),
+            team=request.args.get("team", type=int),
+            max_cost=request.args.get("max_cost", type=float),
+            horizon=horizon,
+            limit=max(0, limit),
+        )
+        teams = {team["id"]: team for team in get_bootstrap_static()["teams"]}
+        gameweek_points = projections.gameweek_points[:, :horizon]
+        horizon_points = projections.horizon_points(horizon)
+
+        players = []
+        for row in rows.tolist():
+            player = projections.players.elements[row]
+            players.append({
+                "id": player["id"],
+                "first_name": player["first_name"],
+                "second_name": player["second_name"],
+                "team": teams[player["team"]]["name"] if player["team"] in teams else None,
+                "team_id": player["team"],
+                "position": player["element_type"],
+                "now_cost": player["now_cost"] / 10,
+                "form": player["form"],
+                "predicted_points": round(float(projections.transfer_predicted[row]), 2),
+                "captaincy_score": round(float(projections.captain_score[row]), 2),
+                "transfer_score": round(float(projections.transfer_score[row]), 2),
+                "next_fixture": {
+                    "opponent": teams[int(projections.next_opponent[row])]["name"] if int(projections.next_opponent[row]) in teams else None,
+                    "is_home": bool(projections.next_home[row]),
+                    "fdr": int(projections.next_fdr[row])
+                } if projections.has_next[row] else None,
+                "gameweek_points": [round(float(points), 2) for points in gameweek_points[row]],
+                "horizon_points": round(float(horizon_points[row]), 2),
+            })
+
+        return jsonify({
+            "base_gameweek": projections.base_gw,
+            "horizon": horizon,
+            "players": players
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @main.route("/api/fpl/entry-history/<int:team_id>")
 def get_entry_history(team_id):
     url = f"{FPL_PROXY_URL}/entry/{team_id}/history/"
-    res = requests.get(url)
+    res = fpl_get(url)
     return jsonify(res.json()), res.status_code
 
 
 # GALOV DEL ZA ANALYSIS HUB
-def load_parquet_from_s3(bucket: str, key: str) -> pd.DataFrame:
-    """Load a parquet file from S3 and return it as a DataFrame."""
-    response = s3.get_object(Bucket=bucket, Key=key)
-    return pd.read_parquet(io.BytesIO(response['Body'].read()))
-
 
 @main.route("/api/teams", methods=['GET'])
 def get_pass_clusters():
@@ -621,7 +775,7 @@ def get_pass_clusters():
         df = load_parquet_from_s3("footlyiq-data", "gold/pass_clustering/parquet/teams.parquet")
         # Optional: reduce size before sending to frontend
         #limited = df.head(100)  # send only 100 rows for test
-        return jsonify(df.to_dict(orient="records"))
+        return dataframe_response(df)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -633,37 +787,25 @@ def get_team_id():
         return jsonify({"error": "team_name is required"}), 400
     
     try:
-        s3_path = "s3://footlyiq-data/bronze/teams.parquet"
-
-        result = con.execute("""
-            SELECT team_id, name, country
-            FROM read_parquet(?)
-            WHERE name = ?
-        """, [s3_path, team_name]).fetchdf()
+        records = team_index.lookup(team_name)
 
-        if result.empty:
+        if not records:
             return jsonify({"error": "Team not found"}), 404
         
-        return jsonify(result.to_dict(orient="records"))
+        return dataframe_response(pd.DataFrame(records))
     
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
 def inside_get_team_id(name):
-    """Returns team_id from teams dataframe based on the team name."""
+    """Returns team_id from the resident teams index based on the team name."""
     try:
-        s3_path = "s3://footlyiq-data/bronze/teams.parquet"
-
-        result = con.execute("""
-            SELECT team_id
-            FROM read_parquet(?)
-            WHERE name = ?
-        """, [s3_path, name]).fetchdf()
+        records = team_index.lookup(name)
 
-        if result.empty:
+        if not records:
             return None
         
-        return result.iloc[0]["team_id"] # Return the scalar team_id
+        return records[0]["team_id"] # Return the scalar team_id
     
     except Exception as e:
         print(f"Error in inside_get_team_id: {e}")
@@ -681,7 +823,6 @@ def get_most_common_pass_clusters():
         return jsonify({"error": "team_name is required"}), 400
     
     try:
-        df = load_parquet_from_s3("footlyiq-data", "gold/pass_clustering/parquet/ALL_clustered_passes_1_colab.parquet")
         team_id = inside_get_team_id(team_name)
 
         if team_id is None:
@@ -689,13 +830,10 @@ def get_most_common_pass_clusters():
         
         print(f"team_id: {team_id}")
 
-        df_passes = df[df["team_id"] == team_id]
-        top_6 = df_passes["label"].value_counts().head(6).index
-        top_6_clusters = df_passes[df_passes["label"].isin(top_6)]
-
-        df_limited = top_6_clusters.head(100)
+        # Top 6 clusters computed in DuckDB, only the team's rows are read from S3
+        df_limited = top_pass_clusters(PASS_CLUSTERS_PATH, team_id)
         
-        return jsonify(df_limited.to_dict(orient="records"))
+        return dataframe_response(df_limited)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
@@ -710,7 +848,6 @@ def get_most_common_pass_clusters_last_third():
         return jsonify({"error": "team_name is required"}), 400
     
     try:
-        df = load_parquet_from_s3("footlyiq-data", "gold/pass_clustering/parquet/FINAL-3rd_clustered_passes_1.parquet")
         team_id = inside_get_team_id(team_name)
 
         if team_id is None:
@@ -718,13 +855,9 @@ def get_most_common_pass_clusters_last_third():
         
         print(f"team_id: {team_id}")
 
-        df_passes = df[df["team_id"] == team_id]
-        top_6 = df_passes["label"].value_counts().head(6).index
-        top_6_clusters = df_passes[df_passes["label"].isin(top_6)]
-
-        df_limited = top_6_clusters.head(100)
+        df_limited = top_pass_clusters(LAST_THIRD_PATH, team_id)
         
-        return jsonify(df_limited.to_dict(orient="records"))
+        return dataframe_response(df_limited)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
@@ -741,16 +874,11 @@ def filter_pass_clusters():
         return jsonify({"error": "team_name is required"}), 400
 
     try:
-        # Load the full dataset
-        df = load_parquet_from_s3("footlyiq-data", "gold/pass_clustering/parquet/ALL_clustered_passes_1_colab.parquet")
         team_id = inside_get_team_id(team_name)
 
         if team_id is None:
             return jsonify({"error": "Team not found"}), 404
 
-        # Filter by team
-        df_passes = df[df["team_id"] == team_id]
-
         # Optional filters
         filter_fields = {
             "successful": lambda x: x.lower() in ["true", "1"],
@@ -759,26 +887,19 @@ def filter_pass_clusters():
             "pass_length": float  # This is numeric
         }
 
+        filters = {}
         for field, parser in filter_fields.items():
             if field in request.args:
                 value = request.args.get(field)
                 try:
-                    parsed_value = parser(value)
-                    if field == "pass_length":
-                        df_passes = df_passes[df_passes[field] >= parsed_value]
-                    else:
-                        df_passes = df_passes[df_passes[field] == parsed_value]
+                    filters[field] = parser(value)
                 except Exception as parse_err:
                     return jsonify({"error": f"Invalid value for {field}: {value}"}), 400
 
-        # Top 6 clusters by frequency
-        top_6 = df_passes["label"].value_counts().head(6).index
-        top_6_clusters = df_passes[df_passes["label"].isin(top_6)]
-
-        # Optional: limit result size
-        df_limited = top_6_clusters.head(100)
+        # Team, filters, top 6 clusters by frequency and the row limit are all applied in DuckDB
+        df_limited = top_pass_clusters(PASS_CLUSTERS_PATH, team_id, filters)
 
-        return jsonify(df_limited.to_dict(orient="records"))
+        return dataframe_response(df_limited)
     
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -808,7 +929,7 @@ def get_xG():
 
         df_limited = df_xG.head(50)
         
-        return jsonify(df_limited.to_dict(orient="records"))
+        return dataframe_response(df_limited)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
@@ -819,39 +940,17 @@ def get_xG_heatmap():
     if not team_name:
         return jsonify({"error": "team_name is required"}), 400
 
+    # Number of cells per side (10 -> 10x10 grid)
+    bins = request.args.get("bins", default=XG_DEFAULT_BINS, type=int)
+    if not bins or not 1 <= bins <= XG_MAX_BINS:
+        return jsonify({"error": f"bins must be between 1 and {XG_MAX_BINS}"}), 400
+
     try:
-        df = load_parquet_from_s3("footlyiq-data", "gold/xG/parquet/xG_done_filtered.parquet")
         team_id = inside_get_team_id(team_name)
         if team_id is None:
             return jsonify({"error": "Team not found"}), 404
 
-        df = df[df["team_id"] == team_id]
-
-        bins = 11  # or 17 depending on smoothness you want
-        x_bins = np.linspace(0, 105, bins)
-        y_bins = np.linspace(0, 68, bins)
-
-        heatmap_data = []
-        shot_grid = np.zeros((bins - 1, bins - 1))
-        xg_grid = np.zeros((bins - 1, bins - 1))
-
-        for _, shot in df.iterrows():
-            x_idx = np.digitize(shot['X'], x_bins) - 1
-            y_idx = np.digitize(shot['Y'], y_bins) - 1
-            if 0 <= x_idx < bins - 1 and 0 <= y_idx < bins - 1:
-                shot_grid[x_idx, y_idx] += 1
-                xg_grid[x_idx, y_idx] += shot['xG']
-
-        avg_xg_grid = np.divide(xg_grid, shot_grid, where=shot_grid != 0)
-        avg_xg_grid = np.nan_to_num(avg_xg_grid)
-
-        for i in range(bins - 1):
-            for j in range(bins - 1):
-                heatmap_data.append({
-                    "x": (x_bins[i] + x_bins[i+1]) / 2,
-                    "y": (y_bins[j] + y_bins[j+1]) / 2,
-                    "xG": float(avg_xg_grid[i][j])
-                })
+        heatmap_data = xg_heatmap(bins).payload(team_id)
 
         return jsonify(heatmap_data)
     except Exception as e:
@@ -867,31 +966,23 @@ def get_xT_moving():
     print(team_name)
 
     try:
-        df = load_parquet_from_s3("footlyiq-data", "gold/xT/parquet/moving_small.parquet")
         team_id = inside_get_team_id(team_name)
         if team_id is None:
             return jsonify({"error": "Team not found"}), 404
         
         print(f"team_id: {team_id}")
 
-        df = df[df["team_id"] == team_id]
-
-        counts, x_edges, y_edges = np.histogram2d(
-            df["start_x"],
-            df["start_y"],
-            bins=[16,12],
-            range=[[0, 105], [0, 68]]
-        )
+        counts = moving_cube.get().for_team(team_id).astype(float)
 
         # Convert to plain Python list for JSON
         counts_list = counts.T.tolist() # Transpose so it's rows by columns (y by x)
 
         return jsonify({
             "counts": counts_list,
-            "x_bins": 16,
-            "y_bins": 12,
-            "pitch_width": 105,
-            "pitch_height": 68
+            "x_bins": XT_X_BINS,
+            "y_bins": XT_Y_BINS,
+            "pitch_width": PITCH_WIDTH,
+            "pitch_height": PITCH_HEIGHT
         })
         
     except Exception as e:
@@ -906,31 +997,23 @@ def get_xT_shots():
     print(team_name)
 
     try:
-        df = load_parquet_from_s3("footlyiq-data", "gold/xT/parquet/shots_small.parquet")
         team_id = inside_get_team_id(team_name)
         if team_id is None:
             return jsonify({"error": "Team not found"}), 404
         
         print(f"team_id: {team_id}")
 
-        df = df[df["team_id"] == team_id]
-
-        counts, x_edges, y_edges = np.histogram2d(
-            df["start_x"],
-            df["start_y"],
-            bins=[16,12],
-            range=[[0, 105], [0, 68]]
-        )
+        counts = shots_cube.get().for_team(team_id).astype(float)
 
         # Convert to plain Python list for JSON
         counts_list = counts.T.tolist() # Transpose so it's rows by columns (y by x)
 
         return jsonify({
             "counts": counts_list,
-            "x_bins": 16,
-            "y_bins": 12,
-            "pitch_width": 105,
-            "pitch_height": 68
+            "x_bins": XT_X_BINS,
+            "y_bins": XT_Y_BINS,
+            "pitch_width": PITCH_WIDTH,
+            "pitch_height": PITCH_HEIGHT
         })
         
     except Exception as e:
@@ -944,33 +1027,13 @@ def get_shot_probability():
         return jsonify({"error": "team_name is required"}), 400
 
     try:
-        df_move = load_parquet_from_s3("footlyiq-data", "gold/xT/parquet/moving_small.parquet")
-        df_shots = load_parquet_from_s3("footlyiq-data", "gold/xT/parquet/shots_small.parquet")
         team_id = inside_get_team_id(team_name)
         if team_id is None:
             return jsonify({"error": "Team not found"}), 404
 
-        df_move = df_move[df_move["team_id"] == team_id]
-        df_shots = df_shots[df_shots["team_id"] == team_id]
-
-        # Define bins and range
-        bins_x, bins_y = 16, 12
-        range_x, range_y = [0, 105], [0, 68]
-
-        # Binned counts for movement
-        move_counts, _, _ = np.histogram2d(
-            df_move["start_x"], df_move["start_y"],
-            bins=[bins_x, bins_y],
-            range=[range_x, range_y]
-        )
-
-        # Binned counts for shots
-        shot_counts, _, _ = np.histogram2d(
-            df_shots["start_x"], df_shots["start_y"],
-            bins=[bins_x, bins_y],
-            range=[range_x, range_y]
-        )
-        
+        # Binned counts for movement and shots, sliced from the resident cubes
+        move_counts = moving_cube.get().for_team(team_id).astype(float)
+        shot_counts = shots_cube.get().for_team(team_id).astype(float)
 
         # Shot probability
         with np.errstate(divide='ignore', invalid='ignore'):
@@ -979,10 +1042,10 @@ def get_shot_probability():
 
         return jsonify({
             "probability": prob.T.tolist(),  # Transposed to match (y,x) layout
-            "x_bins": bins_x,
-            "y_bins": bins_y,
-            "pitch_width": 105,
-            "pitch_height": 68
+            "x_bins": XT_X_BINS,
+            "y_bins": XT_Y_BINS,
+            "pitch_width": PITCH_WIDTH,
+            "pitch_height": PITCH_HEIGHT
         })
 
     except Exception as e:
@@ -993,16 +1056,31 @@ def get_shot_probability():
 @main.route('/odds', methods=['GET'])
 def fetch_odds():
     try:
-        response = requests.get(f"{MICROSERVICE_URL}/odds")  # Call to Node.js microservice
-        return Response(response.text, status=response.status_code, mimetype='application/json')
+        # Node.js mikroservis, telo se pretaka po kosih (ali iz predpomnilnika)
+        status, headers, body = odds_proxy.open(request.headers.get('Accept-Encoding', ''))
+        return Response(body, status=status, headers=headers)
     except Exception as e:
         return Response(json.dumps({'message': str(e)}, ensure_ascii=False), status=500, mimetype='application/json')
+
+@main.route('/odds/stats', methods=['GET'])
+def fetch_odds_stats():
+    """Cache hits, upstream fetches and coalesced requests of the /odds proxy."""
+    return jsonify(odds_proxy.stats())
     
+@main.route('/api/upstream-stats', methods=['GET'])
+def get_upstream_stats():
+    """Latency, error and circuit breaker state per upstream service."""
+    return jsonify(upstream_stats())
 
 # Search endpoints
+@main.route('/api/search/stats', methods=['GET'])
+def get_search_stats():
+    """Size, build time and hit rate of the local search index."""
+    return jsonify(name_search.stats())
+
 @main.route('/api/search/teams', methods=['GET'])
 def search_teams():
-    """Search for teams by name using microservice"""
+    """Search for teams by name (local index, microservice on a miss)"""
     try:
         search_term = request.args.get('q', '').strip()
         print(f"🔍 Backend route: Teams search for '{search_term}'")
@@ -1010,8 +1088,8 @@ def search_teams():
         if not search_term:
             return jsonify({'teams': [], 'message': 'Please provide a search term'}), 400
         
-        # Use utility function to call microservice
-        data = search_teams_from_microservice(search_term)
+        # Lokalni indeks, mikroservis le ob zgrešitvi
+        data = search_team_names(search_term)
         
         if "error" in data:
             return jsonify(data), 500
@@ -1024,7 +1102,7 @@ def search_teams():
 
 @main.route('/api/search/players', methods=['GET'])
 def search_players():
-    """Search for players by name using microservice"""
+    """Search for players by name (local index, microservice on a miss)"""
     try:
         search_term = request.args.get('q', '').strip()
         team_id = request.args.get('team_id', '')
@@ -1034,8 +1112,8 @@ def search_players():
         if not search_term:
             return jsonify({'players': [], 'message': 'Please provide a search term'}), 400
         
-        # Use utility function to call microservice  
-        data = search_players_from_microservice(search_term, team_id if team_id else None)
+        # Lokalni indeks, mikroservis le ob zgrešitvi
+        data = search_player_names(search_term, team_id if team_id else None)
         
         if "error" in data:
             return jsonify(data), 500
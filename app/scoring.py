@@ -0,0 +1,120 @@
+import numpy as np
+
+from .cache import LRUCache, json_size
+from .utils import CACHE_TTL, PLAYER_HISTORY_MAX_ENTRIES, load_player_history, get_player_histories
+
+# Vrstni red statistik v razčlenitvi (enak kot v get_fpl_player_details)
+STATS = [
+    "minutes", "goals_scored", "assists", "clean_sheets", "goals_conceded", "own_goals",
+    "penalties_saved", "penalties_missed", "yellow_cards", "red_cards", "saves", "bonus",
+]
+STAT_LABELS = {
+    "minutes": "Minutes Played",
+    "goals_scored": "Goals Scored",
+    "assists": "Assists",
+    "clean_sheets": "Clean Sheets",
+    "goals_conceded": "Goals Conceded",
+    "own_goals": "Own Goals",
+    "penalties_saved": "Penalties Saved",
+    "penalties_missed": "Penalties Missed",
+    "yellow_cards": "Yellow Cards",
+    "red_cards": "Red Cards",
+    "saves": "Saves",
+    "bonus": "Bonus",
+}
+# Točke za vsakih N (2 prejeta gola = -1, 3 obrambe = +1)
+STAT_DIVISORS = {"goals_conceded": 2, "saves": 3}
+
+# Točke na enoto: vrstica = pozicija (1=GK, 2=DEF, 3=MID, 4=FWD), stolpec = STATS.
+# minutes ima koeficient 1 na stopnjo: 1 točka za nastop, še 1 za 60+ minut.
+SCORING_TABLE = np.array([
+    # min  gs  a  cs  gc  og  ps  pm  yc  rc  sv  bonus
+    [0,    0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0],  # unused
+    [1,    6,  3,  4, -1, -2,  5, -2, -1, -3,  1,  1],  # GK
+    [1,    6,  3,  4, -1, -2,  0, -2, -1, -3,  0,  1],  # DEF
+    [1,    5,  3,  1,  0, -2,  0, -2, -1, -3,  0,  1],  # MID
+    [1,    4,  3,  0,  0, -2,  0, -2, -1, -3,  0,  1],  # FWD
+], dtype=np.int64)
+
+GAMEWEEK_FIELDS = ["round", "opponent_team", "was_home", "team_h_score", "team_a_score", "total_points"]
+
+# Vnos je (zgodovina, razčlenitev): razčlenitev velja, dokler je zgodovina v player_history_cache ista
+breakdown_cache = LRUCache("player-breakdown", PLAYER_HISTORY_MAX_ENTRIES, 32 * 1024 * 1024, CACHE_TTL,
+                           sizeof=lambda entry: json_size(entry[1]))
+
+
+def score_rows(values, positions):
+    """
+    Per-stat points for many gameweek rows at once.
+
+    values is an (n, len(STATS)) array of raw stats, positions the element_type
+    of each row. Returns an (n, len(STATS)) integer array of points.
+    """
+    values = np.asarray(values, dtype=np.int64).reshape(-1, len(STATS))
+    units = values.copy()
+    minutes = values[:, STATS.index("minutes")]
+    units[:, STATS.index("minutes")] = (minutes > 0).astype(np.int64) + (minutes > 59)
+    for stat, divisor in STAT_DIVISORS.items():
+        col = STATS.index(stat)
+        units[:, col] = values[:, col] // divisor
+    return units * SCORING_TABLE[np.asarray(positions, dtype=np.int64)]
+
+
+def build_breakdowns(histories, positions):
+    """
+    Season breakdowns of several players in one vectorised pass.
+
+    histories is {player_id: element-summary history}, positions {player_id: element_type}.
+    Returns {player_id: {"position", "gameweeks": [...], "totals": {stat: points}}}.
+    """
+    player_ids = [pid for pid in histories if pid in positions]
+    rows = [(pid, gw) for pid in player_ids for gw in histories[pid]]
+    values = np.array([[gw.get(stat, 0) or 0 for stat in STATS] for _, gw in rows], dtype=np.int64)
+    points = score_rows(values, [positions[pid] for pid, _ in rows]) if rows else np.zeros((0, len(STATS)), dtype=np.int64)
+
+    breakdowns = {pid: {"position": positions[pid], "gameweeks": [], "totals": dict.fromkeys(STATS, 0)}
+                  for pid in player_ids}
+    values, points = values.tolist(), points.tolist()
+    for (pid, gw), row_values, row_points in zip(rows, values, points):
+        entry = {field: gw.get(field) for field in GAMEWEEK_FIELDS}
+        entry["stats"] = {stat: {"value": v, "points": p} for stat, v, p in zip(STATS, row_values, row_points)}
+        breakdowns[pid]["gameweeks"].append(entry)
+        totals = breakdowns[pid]["totals"]
+        for stat, p in zip(STATS, row_points):
+            totals[stat] += p
+    return breakdowns
+
+
+def _cached_breakdown(player_id, history):
+    entry = breakdown_cache.get(player_id)
+    return entry[1] if entry is not None and entry[0] is history else None
+
+
+def get_player_breakdown(player_id, position, fresh=False):
+    """
+    Season breakdown of one player (None when the player has no history).
+
+    The breakdown is rebuilt whenever the cached history is refetched, so it is
+    never older than the history. fresh=True refetches the history first (live
+    gameweek). Upstream failures are raised.
+    """
+    history = load_player_history(player_id, fresh=fresh)
+    if not history:
+        return None
+    breakdown = _cached_breakdown(player_id, history)
+    if breakdown is None:
+        breakdown = build_breakdowns({player_id: history}, {player_id: position})[player_id]
+        breakdown_cache.set(player_id, (history, breakdown))
+    return breakdown
+
+
+def get_player_breakdowns(positions):
+    """Season breakdowns of several players; histories are fetched concurrently and changed ones scored together."""
+    histories = {pid: history for pid, history in get_player_histories(list(positions)).items() if history}
+    breakdowns = {pid: _cached_breakdown(pid, history) for pid, history in histories.items()}
+    changed = {pid: histories[pid] for pid, breakdown in breakdowns.items() if breakdown is None}
+    if changed:
+        for pid, breakdown in build_breakdowns(changed, positions).items():
+            breakdown_cache.set(pid, (changed[pid], breakdown))
+            breakdowns[pid] = breakdown
+    return breakdowns
@@ -0,0 +1,323 @@
+import sys
+import threading
+import time
+from bisect import bisect_left, insort
+
+from .config import TEAM_INDEX_REFRESH_SECONDS
+from .team_index import normalize_name, team_index
+
+MIN_TRIGRAM_OVERLAP = 0.6  # share of the query's trigrams a name must contain
+CONFIDENT_SCORE = 1.0  # every query word is a word prefix; trigram-only matches go to the microservice
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _deep_size(value, seen=None):
+    """Rough memory size in bytes of nested dicts, lists, sets and tuples."""
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_deep_size(k, seen) + _deep_size(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_deep_size(v, seen) for v in value)
+    return size
+
+
+class SearchIndex:
+    """
+    In-process name search with accent folding.
+
+    Names are normalised with normalize_name. Every word is kept in a sorted
+    list so a query word matches by prefix with a bisect; trigram postings
+    catch typos and infix matches for queries of three or more characters.
+    Results are ranked exact name > name prefix > word prefixes > trigram overlap.
+    """
+
+    def __init__(self):
+        self._records = {}  # key -> (record, normalised name)
+        self._words = []  # sorted (word, key)
+        self._grams = {}  # trigram -> set(keys)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, key):
+        return key in self._records
+
+    def add(self, key, name, record):
+        normalized = normalize_name(name)
+        if not normalized:
+            return
+        with self._lock:
+            if key in self._records:
+                self._remove(key)
+            self._records[key] = (record, normalized)
+            for word in set(normalized.split()):
+                insort(self._words, (word, key))
+            for gram in trigrams(normalized):
+                self._grams.setdefault(gram, set()).add(key)
+
+    def _remove(self, key):
+        _, normalized = self._records.pop(key)
+        for word in set(normalized.split()):
+            i = bisect_left(self._words, (word, key))
+            if i < len(self._words) and self._words[i] == (word, key):
+                del self._words[i]
+        for gram in trigrams(normalized):
+            self._grams.get(gram, set()).discard(key)
+
+    def _prefix_keys(self, prefix):
+        keys = set()
+        i = bisect_left(self._words, (prefix,))
+        while i < len(self._words) and self._words[i][0].startswith(prefix):
+            keys.add(self._words[i][1])
+            i += 1
+        return keys
+
+    def search(self, query, limit=20, where=None, min_score=0.0):
+        """Records matching the query with at least `min_score`, best first; `where(record)` filters them."""
+        q = normalize_name(query)
+        if not q:
+            return []
+        scores = {}
+        with self._lock:
+            matched = None
+            for word in q.split():
+                keys = self._prefix_keys(word)
+                matched = keys if matched is None else matched & keys
+            for key in matched or ():
+                name = self._records[key][1]
+                scores[key] = 3.0 if name == q else 2.0 if name.startswith(q) else 1.0
+
+            query_grams = trigrams(q)
+            if query_grams:
+                overlap = {}
+                for gram in query_grams:
+                    for key in self._grams.get(gram, ()):
+                        overlap[key] = overlap.get(key, 0) + 1
+                for key, shared in overlap.items():
+                    ratio = shared / len(query_grams)
+                    if key not in scores and ratio >= MIN_TRIGRAM_OVERLAP:
+                        scores[key] = ratio * 0.99
+
+            ranked = sorted(scores, key=lambda k: (-scores[k], len(self._records[k][1]), self._records[k][1]))
+            results = []
+            for key in ranked:
+                if scores[key] < min_score:
+                    break
+                record = self._records[key][0]
+                if where is None or where(record):
+                    results.append(record)
+                    if len(results) == limit:
+                        break
+        return results
+
+    def nbytes(self):
+        with self._lock:
+            return _deep_size(self._records) + _deep_size(self._words) + _deep_size(self._grams)
+
+
+def _player_key(player):
+    return player.get("id") or player.get("player_id")
+
+
+def _player_name(player):
+    return player.get("name") or " ".join(filter(None, [player.get("first_name"), player.get("last_name")]))
+
+
+def _player_team(player):
+    team = player.get("team")
+    return player.get("team_id") if not isinstance(team, dict) else team.get("id")
+
+
+def player_from_squad(player, team_id):
+    """A /team/<id>/squad entry in the shape of a /search/players result."""
+    record = {"id": _player_key(player), "name": _player_name(player), "team_id": team_id}
+    for field in ("position", "nationality", "dateOfBirth", "shirtNumber"):
+        if player.get(field) is not None:
+            record[field] = player[field]
+    return record
+
+
+def resolve_team(name, teams):
+    """
+    The service team record for a parquet team name: the one whose name or
+    shortName is the same name, otherwise the only one whose name contains
+    every word of it. None when that is ambiguous or there is no such team.
+    """
+    wanted = normalize_name(name)
+    teams = [team for team in teams or [] if isinstance(team, dict) and team.get("id") is not None and team.get("name")]
+    for team in teams:
+        if wanted in (normalize_name(team["name"]), normalize_name(team.get("shortName") or "")):
+            return team
+    words = set(wanted.split())
+    containing = [team for team in teams if words <= set(normalize_name(team["name"]).split())]
+    return containing[0] if len(containing) == 1 else None
+
+
+class NameSearch:
+    """
+    In-memory team and player search in front of the search microservice.
+
+    Teams: every name in bronze/teams.parquet (read through team_index, so
+    there is no second poller) is resolved once to the microservice's own team
+    record by searching for it (see resolve_team), so local answers carry the service's
+    schema and ids. A daemon thread re-checks team_index every
+    `refresh_seconds`, resolves new names and rebuilds the index. Players are
+    learned from squad responses (mapped to the search schema) and from search
+    responses. A confident local match (every query word is a word prefix of a
+    name) is answered from memory; a miss or a fuzzy-only match goes to the
+    microservice, whose answer is returned as is and learned. When the
+    microservice fails, fuzzy local matches are served instead of the error.
+    """
+
+    def __init__(self, search_teams_remote, refresh_seconds=TEAM_INDEX_REFRESH_SECONDS, teams_source=team_index):
+        self.search_teams_remote = search_teams_remote
+        self.refresh_seconds = refresh_seconds
+        self.teams_source = teams_source
+        self.teams = SearchIndex()
+        self.players = SearchIndex()
+        self._resolved = {}  # parquet name -> service team record (None = the service does not know it)
+        self._learned_teams = {}  # service id -> team record returned by a search
+        self._searched_players = set()  # keys learned from search responses (their schema wins over squads)
+        self._lock = threading.Lock()
+        self._thread = None
+        self.etag = None
+        self.built_at = None
+        self.build_ms = None
+        self.hits = 0
+        self.misses = 0
+        self.fallbacks = 0
+
+    def refresh(self):
+        """Resolve parquet team names the index does not know yet and rebuild it. Returns True when rebuilt."""
+        self.teams_source.ensure_loaded()
+        etag = self.teams_source.etag
+        if etag != self.etag:
+            # Nova različica parquet datoteke: imena, ki jih mikroservis ni poznal, poskusimo znova
+            self._resolved = {name: team for name, team in self._resolved.items() if team is not None}
+        pending = [name for name in self.teams_source.names() if name not in self._resolved]
+        if self.built_at is not None and etag == self.etag and not pending:
+            return False
+
+        started = time.perf_counter()
+        for name in pending:
+            data = self.search_teams_remote(name)
+            if "error" in data:
+                break  # mikroservis ne odgovarja, preostale poskusimo ob naslednji osvežitvi
+            self._resolved[name] = resolve_team(name, data.get("teams"))
+
+        teams = SearchIndex()
+        current = set(self.teams_source.names())
+        for name, team in list(self._resolved.items()):
+            if team is not None and name in current:
+                teams.add(str(team["id"]), team["name"], team)
+        with self._lock:
+            learned = list(self._learned_teams.values())
+        for team in learned:
+            teams.add(str(team["id"]), team["name"], team)
+        self.teams = teams
+        self.etag = etag
+        self.built_at = time.time()
+        self.build_ms = round((time.perf_counter() - started) * 1000, 1)
+        print(f"Search index built with {len(teams)} teams in {self.build_ms} ms")
+        return True
+
+    def _refresh_loop(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error refreshing search index: {e}")
+            time.sleep(self.refresh_seconds)
+
+    def start(self):
+        """Start the background build on first use; searches go to the microservice until it is ready."""
+        if self._thread is not None or not self.refresh_seconds:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._refresh_loop, name="search-index-refresh", daemon=True)
+                self._thread.start()
+
+    def learn_teams(self, teams):
+        for team in teams or []:
+            if isinstance(team, dict) and team.get("id") is not None and team.get("name"):
+                with self._lock:
+                    self._learned_teams[str(team["id"])] = team
+                self.teams.add(str(team["id"]), team["name"], team)
+
+    def learn_players(self, players):
+        for player in players or []:
+            if isinstance(player, dict) and _player_key(player) is not None and _player_name(player):
+                key = str(_player_key(player))
+                self._searched_players.add(key)
+                self.players.add(key, _player_name(player), player)
+
+    def learn_squad(self, team_id, squad):
+        for player in squad or []:
+            if isinstance(player, dict) and _player_key(player) is not None and _player_name(player):
+                key = str(_player_key(player))
+                if key not in self._searched_players:
+                    self.players.add(key, _player_name(player), player_from_squad(player, team_id))
+
+    def _answer(self, field, index, query, where, fetch, learn):
+        self.start()
+        local = index.search(query, where=where, min_score=CONFIDENT_SCORE)
+        if local:
+            self.hits += 1
+            return {field: local}
+        self.misses += 1
+        data = fetch()
+        if "error" in data:
+            fuzzy = index.search(query, where=where)
+            if fuzzy:
+                self.fallbacks += 1
+                return {field: fuzzy}
+            return data
+        learn(data.get(field))
+        return data
+
+    def search_teams(self, query, fetch):
+        """Teams for a query: confident local matches, otherwise `fetch()` (the microservice call)."""
+        return self._answer("teams", self.teams, query, None, fetch, self.learn_teams)
+
+    def search_players(self, query, fetch, team_id=None):
+        """Players for a query (optionally of one team): confident local matches, otherwise `fetch()`."""
+        where = None
+        if team_id:
+            where = lambda player: str(_player_team(player)) == str(team_id)
+        return self._answer("players", self.players, query, where, fetch, self.learn_players)
+
+    def clear(self):
+        self.teams = SearchIndex()
+        self.players = SearchIndex()
+        self._resolved = {}
+        with self._lock:
+            self._learned_teams = {}
+        self._searched_players = set()
+        self.etag = None
+        self.built_at = None
+        self.build_ms = None
+        self.hits = 0
+        self.misses = 0
+        self.fallbacks = 0
+
+    def stats(self):
+        return {
+            "teams": len(self.teams),
+            "players": len(self.players),
+            "unresolved_names": sum(team is None for team in self._resolved.values()),
+            "build_ms": self.build_ms,
+            "age": round(time.time() - self.built_at, 1) if self.built_at else None,
+            "bytes": self.teams.nbytes() + self.players.nbytes(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "fallbacks": self.fallbacks,
+        }
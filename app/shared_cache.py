@@ -0,0 +1,209 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+from .config import FPL_CACHE_URL
+from .upstream import fpl
+
+# TTL (sekunde) po vzorcu URL-ja, prvo ujemanje zmaga
+FPL_TTL_RULES = [
+    (re.compile(r"/bootstrap-static/$"), 60 * 10),
+    (re.compile(r"/fixtures/$"), 60 * 30),
+    (re.compile(r"/element-summary/\d+/$"), 60 * 180),
+    (re.compile(r"/event/\d+/live/$"), 60),
+    (re.compile(r"/entry/\d+/event/\d+/picks/$"), 60 * 5),
+    (re.compile(r"/entry/\d+/history/$"), 60 * 10),
+]
+DEFAULT_TTL = 60
+# Pretečene vnose hranimo še en dan, da jih lahko pogojno osvežimo (304)
+KEEP_EXPIRED = 60 * 60 * 24
+
+
+def ttl_for(url):
+    for pattern, ttl in FPL_TTL_RULES:
+        if pattern.search(url):
+            return ttl
+    return DEFAULT_TTL
+
+
+class SQLiteBackend:
+    """Cache entries in a local SQLite file shared by all worker processes on the host."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS http_cache ("
+            "key TEXT PRIMARY KEY, expires_at REAL, keep_until REAL, etag TEXT, last_modified TEXT, body BLOB)"
+        )
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._conn().execute(
+            "SELECT expires_at, etag, last_modified, body FROM http_cache WHERE key = ? AND keep_until > ?",
+            (key, time.time()),
+        ).fetchone()
+        if row is None:
+            return None
+        return {"expires_at": row[0], "etag": row[1], "last_modified": row[2], "body": row[3]}
+
+    def set(self, key, entry, keep_until):
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO http_cache VALUES (?, ?, ?, ?, ?, ?)",
+            (key, entry["expires_at"], keep_until, entry["etag"], entry["last_modified"], entry["body"]),
+        )
+        self._writes += 1
+        if self._writes % 500 == 0:
+            conn.execute("DELETE FROM http_cache WHERE keep_until < ?", (time.time(),))
+
+
+class RedisBackend:
+    """Cache entries in Redis (or any server speaking the Redis protocol)."""
+
+    def __init__(self, url):
+        import redis  # optional dependency, only needed for redis:// cache URLs
+
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        raw = self._client.get(f"fpl:{key}")
+        if raw is None:
+            return None
+        header, _, body = raw.partition(b"\n")
+        entry = json.loads(header)
+        entry["body"] = body
+        return entry
+
+    def set(self, key, entry, keep_until):
+        header = json.dumps({k: entry[k] for k in ("expires_at", "etag", "last_modified")}).encode()
+        ttl = max(1, int(keep_until - time.time()))
+        self._client.set(f"fpl:{key}", header + b"\n" + entry["body"], ex=ttl)
+
+
+def create_backend(url):
+    if not url:
+        return None
+    if url.startswith("sqlite:///"):
+        return SQLiteBackend(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported FPL_CACHE_URL: {url}")
+
+
+class CachedResponse:
+    """Minimal stand-in for requests.Response built from a cache entry."""
+
+    def __init__(self, body, headers=None):
+        self.status_code = 200
+        self.content = body
+        self.headers = headers or {}
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        pass
+
+
+class SharedHTTPCache:
+    """
+    GET cache shared between worker processes through a SQLite file or Redis.
+
+    Bodies are stored zlib-compressed. A fresh entry is served without contacting
+    the upstream; an expired one is revalidated with If-None-Match /
+    If-Modified-Since, and a 304 just extends its lifetime. Only 200 responses are
+    cached. With no backend configured every call goes straight to the FPL upstream client.
+    """
+
+    def __init__(self, url):
+        self.url = url
+        self._backend = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+    @property
+    def backend(self):
+        if self._backend is None and self.url:
+            with self._lock:
+                if self._backend is None:
+                    self._backend = create_backend(self.url)
+        return self._backend
+
+    def get(self, url, headers=None, timeout=None):
+        kwargs = {}
+        if headers:
+            kwargs["headers"] = headers
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+
+        backend = self.backend
+        if backend is None:
+            return fpl.get(url, **kwargs)
+
+        try:
+            entry = backend.get(url)
+        except Exception as e:
+            print(f"Shared cache read failed for {url}: {e}")
+            entry = None
+
+        now = time.time()
+        if entry is not None and entry["expires_at"] > now:
+            self.hits += 1
+            return CachedResponse(zlib.decompress(entry["body"]))
+
+        self.misses += 1
+        request_headers = dict(headers or {})
+        if entry is not None:
+            if entry["etag"]:
+                request_headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                request_headers["If-Modified-Since"] = entry["last_modified"]
+            kwargs["headers"] = request_headers
+        res = fpl.get(url, **kwargs)
+
+        ttl = ttl_for(url)
+        if res.status_code == 304 and entry is not None:
+            self.revalidated += 1
+            entry["expires_at"] = now + ttl
+            self._store(url, entry, now + ttl + KEEP_EXPIRED)
+            return CachedResponse(zlib.decompress(entry["body"]))
+        if res.status_code == 200:
+            self._store(url, {
+                "expires_at": now + ttl,
+                "etag": res.headers.get("ETag"),
+                "last_modified": res.headers.get("Last-Modified"),
+                "body": zlib.compress(res.content),
+            }, now + ttl + KEEP_EXPIRED)
+        return res
+
+    def _store(self, url, entry, keep_until):
+        try:
+            self.backend.set(url, entry, keep_until)
+        except Exception as e:
+            print(f"Shared cache write failed for {url}: {e}")
+
+    def stats(self):
+        return {"backend": type(self.backend).__name__ if self.backend else None,
+                "hits": self.hits, "misses": self.misses, "revalidated": self.revalidated}
+
+
+fpl_cache = SharedHTTPCache(FPL_CACHE_URL)
+
+
+def fpl_get(url, headers=None, timeout=None):
+    """GET a FPL proxy URL through the shared cache (straight to the upstream when it is disabled)."""
+    return fpl_cache.get(url, headers=headers, timeout=timeout)
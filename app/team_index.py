@@ -0,0 +1,92 @@
+import threading
+import time
+import unicodedata
+
+from .config import TEAM_INDEX_REFRESH_SECONDS
+from .datasets import load_parquet_with_etag
+
+TEAMS_BUCKET = "footlyiq-data"
+TEAMS_KEY = "bronze/teams.parquet"
+
+
+def normalize_name(name):
+    """Lowercase, strip diacritics and collapse whitespace ("Atlético  Madrid" -> "atletico madrid")."""
+    decomposed = unicodedata.normalize("NFKD", str(name))
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.casefold().split())
+
+
+class TeamIndex:
+    """
+    Resident name -> team records index built from bronze/teams.parquet.
+
+    The parquet is read once and kept as two dicts: one keyed by the exact name
+    and one keyed by the normalised name. A daemon thread re-checks the object
+    every `refresh_seconds` and rebuilds the index only when its ETag changes.
+    """
+
+    def __init__(self, bucket, key, refresh_seconds):
+        self.bucket = bucket
+        self.key = key
+        self.refresh_seconds = refresh_seconds
+        self.etag = None
+        self.built_at = None
+        self._exact = {}
+        self._normalized = {}
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._thread = None
+
+    def refresh(self):
+        """Reload the parquet if it changed. Returns True when the index was rebuilt."""
+        df, etag = load_parquet_with_etag(self.bucket, self.key)
+        if etag is not None and etag == self.etag:
+            return False
+
+        exact, normalized = {}, {}
+        for record in df[["team_id", "name", "country"]].to_dict(orient="records"):
+            exact.setdefault(record["name"], []).append(record)
+            normalized.setdefault(normalize_name(record["name"]), []).append(record)
+
+        # Zamenjamo oba slovarja naenkrat, da bralci nikoli ne vidijo pol zgrajenega indeksa
+        with self._lock:
+            self._exact, self._normalized = exact, normalized
+            self.etag = etag
+            self.built_at = time.time()
+        print(f"Team index built with {len(exact)} names")
+        return True
+
+    def _refresh_loop(self):
+        while True:
+            time.sleep(self.refresh_seconds)
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error refreshing team index: {e}")
+
+    def ensure_loaded(self):
+        """Build the index on first use and start the background refresh thread."""
+        if self.built_at is not None:
+            return
+        with self._load_lock:
+            if self.built_at is None:
+                self.refresh()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._refresh_loop, name="team-index-refresh", daemon=True)
+                self._thread.start()
+
+    def names(self):
+        """Every team name in the current index."""
+        with self._lock:
+            return list(self._exact)
+
+    def lookup(self, name):
+        """Return the list of team records for a name (exact match first, then normalised)."""
+        self.ensure_loaded()
+        records = self._exact.get(name)
+        if records is None:
+            records = self._normalized.get(normalize_name(name), [])
+        return records
+
+
+team_index = TeamIndex(TEAMS_BUCKET, TEAMS_KEY, TEAM_INDEX_REFRESH_SECONDS)
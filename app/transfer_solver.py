@@ -0,0 +1,164 @@
+import heapq
+import itertools
+import time
+
+import numpy as np
+
+MAX_TRANSFERS = 3
+MAX_PER_CLUB = 3
+DEFAULT_HORIZON = 3  # gameweeks of predicted points
+MAX_HORIZON = 8
+POOL_PER_POSITION = 40  # players per position (by form) scored for transfer in
+
+
+def optimal_transfers(table, squad_ids, points, bank, transfers=1, limit=5):
+    """
+    Best combinations of exactly `transfers` transfers for a squad.
+
+    `points` is aligned with the rows of `table` (a PlayerTable); rows with a
+    non-finite value are not considered for transfer in. A combination swaps
+    `transfers` squad players for the same number of players of the same
+    positions, stays within bank + selling value (now_cost) and keeps at most
+    MAX_PER_CLUB players per club. Combinations are ranked by points gained.
+
+    The search is exact branch-and-bound: out-sets are visited by their upper
+    bound and dropped as soon as they cannot beat the current top `limit`, and
+    in each slot candidates are tried in descending points order, so the loop
+    stops at the first one that cannot improve on the threshold.
+
+    Returns up to `limit` dicts with gain, out_rows, in_rows and bank_after
+    (in tenths, like now_cost), best first.
+    """
+    if not 1 <= transfers <= MAX_TRANSFERS:
+        raise ValueError(f"transfers must be between 1 and {MAX_TRANSFERS}")
+
+    points = np.asarray(points, dtype=float)
+    squad_rows = table.rows(squad_ids)
+    bank = int(round(bank * 10))  # v desetinkah, kot now_cost
+
+    eligible = np.isfinite(points)
+    eligible[squad_rows] = False
+
+    # Kandidati po pozicijah, urejeni po točkah (padajoče)
+    by_position = {}
+    for position in np.unique(table.position[squad_rows]).tolist():
+        rows = np.flatnonzero(eligible & (table.position == position))
+        rows = rows[np.lexsort((rows, -points[rows]))]
+        by_position[position] = list(zip(
+            points[rows].tolist(), table.now_cost[rows].tolist(), table.team[rows].tolist(), rows.tolist()
+        ))
+    best_points = {p: cands[0][0] if cands else -np.inf for p, cands in by_position.items()}
+    min_cost = {p: min(c[1] for c in cands) if cands else np.inf for p, cands in by_position.items()}
+
+    squad = [
+        (float(points[row]) if np.isfinite(points[row]) else 0.0, int(table.now_cost[row]), int(table.team[row]), int(table.position[row]), int(row))
+        for row in squad_rows.tolist()
+    ]
+    club_counts = {}
+    for _, _, team, _, _ in squad:
+        club_counts[team] = club_counts.get(team, 0) + 1
+
+    out_sets = []
+    for out in itertools.combinations(squad, transfers):
+        out_points = sum(o[0] for o in out)
+        slots = sorted(o[3] for o in out)
+        bound = sum(best_points[p] for p in slots) - out_points
+        out_sets.append((bound, out_points, slots, out))
+    out_sets.sort(key=lambda x: -x[0])
+
+    top = []  # min-heap (gain, order, result)
+    order = itertools.count()
+
+    def threshold():
+        return top[0][0] if len(top) == limit else -np.inf
+
+    for bound, out_points, slots, out in out_sets:
+        if bound <= threshold():
+            break  # urejeno po meji: nobena nadaljnja kombinacija ne more biti boljša
+
+        budget = bank + sum(o[1] for o in out)
+        counts = dict(club_counts)
+        for o in out:
+            counts[o[2]] -= 1
+        # meja in najnižja cena preostalih mest
+        rest_points = [0.0] * (transfers + 1)
+        rest_cost = [0] * (transfers + 1)
+        for i in range(transfers - 1, -1, -1):
+            rest_points[i] = rest_points[i + 1] + best_points[slots[i]]
+            rest_cost[i] = rest_cost[i + 1] + min_cost[slots[i]]
+        chosen = []
+
+        def search(i, start, gained, budget_left):
+            if i == transfers:
+                gain = gained - out_points
+                result = {"gain": gain, "out_rows": [o[4] for o in out], "in_rows": list(chosen),
+                          "bank_after": budget_left}
+                if len(top) < limit:
+                    heapq.heappush(top, (gain, next(order), result))
+                elif gain > top[0][0]:
+                    heapq.heapreplace(top, (gain, next(order), result))
+                return
+            cands = by_position[slots[i]]
+            # Ista pozicija kot prejšnje mesto: samo naprej po seznamu, brez podvojenih kombinacij
+            j = start if i > 0 and slots[i] == slots[i - 1] else 0
+            for j in range(j, len(cands)):
+                pts, cost, team, row = cands[j]
+                if gained + pts + rest_points[i + 1] - out_points <= threshold():
+                    break
+                if cost + rest_cost[i + 1] > budget_left or counts.get(team, 0) >= MAX_PER_CLUB:
+                    continue
+                counts[team] = counts.get(team, 0) + 1
+                chosen.append(row)
+                search(i + 1, j + 1, gained + pts, budget_left - cost)
+                chosen.pop()
+                counts[team] -= 1
+
+        search(0, 0, 0.0, budget)
+
+    return [result for _, _, result in sorted(top, key=lambda x: (-x[0], x[1]))]
+
+
+def synthetic_pool(players=700, seed=0):
+    """A random full-size pool: (elements, PlayerTable, points, valid 15-man squad ids)."""
+    from .player_table import PlayerTable
+
+    rng = np.random.default_rng(seed)
+    positions = np.repeat([1, 2, 3, 4], [players // 10, players * 3 // 10, players * 4 // 10, players // 5])
+    positions = np.concatenate([positions, np.full(players - len(positions), 3)])
+    elements = [{
+        "id": i + 1,
+        "team": int(rng.integers(1, 21)),
+        "element_type": int(positions[i]),
+        "now_cost": int(rng.integers(40, 140)),
+        "form": f"{rng.uniform(0, 10):.1f}",
+    } for i in range(players)]
+    table = PlayerTable(elements)
+    points = rng.gamma(2.0, 2.0, players) + table.now_cost / 20
+    # 2 GK, 5 DEF, 5 MID, 3 FWD, največ 3 na klub
+    squad, counts = [], {}
+    for position, needed in ((1, 2), (2, 5), (3, 5), (4, 3)):
+        for el in elements:
+            if needed and el["element_type"] == position and counts.get(el["team"], 0) < MAX_PER_CLUB:
+                squad.append(el["id"])
+                counts[el["team"]] = counts.get(el["team"], 0) + 1
+                needed -= 1
+    return elements, table, points, squad
+
+
+def benchmark(players=700, runs=5, seed=0):
+    """Time optimal_transfers on a synthetic full-size player pool (python -m app.transfer_solver)."""
+    _, table, points, squad = synthetic_pool(players, seed)
+    timings = {}
+    for transfers in range(1, MAX_TRANSFERS + 1):
+        samples = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            optimal_transfers(table, squad, points, bank=1.5, transfers=transfers)
+            samples.append(time.perf_counter() - started)
+        timings[transfers] = {"best_ms": round(min(samples) * 1000, 2), "median_ms": round(sorted(samples)[runs // 2] * 1000, 2)}
+    return timings
+
+
+if __name__ == "__main__":
+    for transfers, timing in benchmark().items():
+        print(f"transfers={transfers}: best {timing['best_ms']} ms, median {timing['median_ms']} ms")
@@ -0,0 +1,192 @@
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .cache import SingleFlight
+from .config import RESULTS_URL, MICROSERVICE_URL, FPL_PROXY_URL
+
+CONNECT_TIMEOUT = 3.05
+RETRY_STATUSES = {502, 503, 504}
+# Samo napake pri vzpostavitvi povezave; ReadTimeout bi podaljšal že tako dolg klic za večkratnik
+RETRY_EXCEPTIONS = (requests.exceptions.ConnectionError, requests.exceptions.ConnectTimeout)
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised without contacting the upstream while its circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failed requests. While open every
+    call fails fast; after `reset_timeout` seconds one trial request is let
+    through (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.time() - self.opened_at >= self.reset_timeout:
+                self.state = "half-open"
+                return True
+            return False  # open, or a trial request is already running
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half-open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.time()
+
+    def reset(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+
+
+class UpstreamClient:
+    """
+    GET client for one upstream service.
+
+    Keeps a keep-alive connection pool (one requests.Session), applies default
+    connect/read timeouts, retries connection errors, connect timeouts and 502/503/504
+    with exponential backoff, fails fast through a circuit breaker while the
+    upstream is down, and records latency and error counts. Errors are raised
+    as requests exceptions, so callers handle them as before. get_shared()
+    additionally collapses concurrent identical GETs into one request.
+    """
+
+    def __init__(self, name, base_url, read_timeout=30, retries=2, backoff=0.3, pool_size=20,
+                 failure_threshold=5, reset_timeout=30):
+        self.name = name
+        self.base_url = base_url
+        self.timeout = (CONNECT_TIMEOUT, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.requests = 0
+        self.errors = 0
+        self.retried = 0
+        self.short_circuited = 0
+        self.coalesced = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def _record(self, started, error):
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.requests += 1
+            self.errors += int(error)
+            self.latency_total += elapsed
+            self.latency_max = max(self.latency_max, elapsed)
+
+    def get(self, url, params=None, headers=None, timeout=None, stream=False):
+        if not self.breaker.allow():
+            with self._lock:
+                self.short_circuited += 1
+            raise CircuitOpenError(f"{self.name} service is unavailable")
+
+        kwargs = {"timeout": (CONNECT_TIMEOUT, timeout) if timeout is not None else self.timeout}
+        if params:
+            kwargs["params"] = params
+        if headers:
+            kwargs["headers"] = headers
+        if stream:
+            kwargs["stream"] = True
+
+        for attempt in range(self.retries + 1):
+            started = time.perf_counter()
+            last_attempt = attempt == self.retries
+            try:
+                response = self.session.get(url, **kwargs)
+            except RETRY_EXCEPTIONS:
+                self._record(started, error=True)
+                if last_attempt:
+                    self.breaker.record_failure()
+                    raise
+            except Exception:
+                # Read timeouts and broken responses are not retried, but every failure
+                # must reach the breaker or a half-open trial would never be resolved
+                self._record(started, error=True)
+                self.breaker.record_failure()
+                raise
+            else:
+                failed = response.status_code in RETRY_STATUSES
+                self._record(started, error=failed)
+                if not failed or last_attempt:
+                    if failed:
+                        self.breaker.record_failure()
+                    else:
+                        self.breaker.record_success()
+                    return response
+                response.close()
+            with self._lock:
+                self.retried += 1
+            time.sleep(self.backoff * 2 ** attempt)
+
+    def get_shared(self, url, params=None, timeout=None):
+        """
+        get() for idempotent calls: concurrent calls with the same URL and params
+        share one upstream request and its response (or exception).
+        """
+        key = (url, tuple(sorted((params or {}).items())))
+        leader = []
+
+        def fetch():
+            leader.append(True)
+            return self.get(url, params=params, timeout=timeout)
+
+        response = self._flight.do(key, fetch)
+        if not leader:
+            with self._lock:
+                self.coalesced += 1
+        return response
+
+    def stats(self):
+        with self._lock:
+            return {
+                "base_url": self.base_url,
+                "circuit": self.breaker.state,
+                "requests": self.requests,
+                "errors": self.errors,
+                "retried": self.retried,
+                "short_circuited": self.short_circuited,
+                "coalesced": self.coalesced,
+                "avg_latency_ms": round(self.latency_total / self.requests * 1000, 1) if self.requests else None,
+                "max_latency_ms": round(self.latency_max * 1000, 1),
+            }
+
+
+results = UpstreamClient("results", RESULTS_URL)
+betting = UpstreamClient("betting", MICROSERVICE_URL)
+fpl = UpstreamClient("fpl", FPL_PROXY_URL, read_timeout=20)
+
+UPSTREAMS = {client.name: client for client in (results, betting, fpl)}
+
+
+def upstream_stats():
+    return {name: client.stats() for name, client in UPSTREAMS.items()}
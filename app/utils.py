@@ -1,12 +1,29 @@
 import requests
-import time
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor, wait
 from .config import RESULTS_URL, FPL_PROXY_URL
+from .cache import RefreshingValue, LRUCache, NOT_MODIFIED
+from .shared_cache import fpl_get
+from .upstream import results, fpl
+from .matches_cache import MatchesCache
+from .search_index import NameSearch
 
-player_history_cache = {}
 CACHE_TTL = 60 * 180  # 3 hours
+PLAYER_HISTORY_MAX_ENTRIES = 2000
+PLAYER_HISTORY_MAX_BYTES = 64 * 1024 * 1024
+BOOTSTRAP_TTL = 60 * 10  # 10 minutes
+BOOTSTRAP_MAX_STALE = 60 * 60 * 24  # stale copy is served (while refreshing) for up to a day
+HISTORY_FETCH_WORKERS = 16
+HISTORY_FETCH_TIMEOUT = 10  # seconds per element-summary request
+PICKS_FETCH_WORKERS = 8
+PICKS_FETCH_TIMEOUT = 10
+FIXTURES_TTL = 60 * 30  # 30 minutes
+FIXTURES_MAX_STALE = 60 * 60 * 24
 
 EXPRESS_API_URL = RESULTS_URL
 
+player_history_cache = LRUCache("player-history", PLAYER_HISTORY_MAX_ENTRIES, PLAYER_HISTORY_MAX_BYTES, CACHE_TTL)
+
 def get_matches_from_api(date=None):
     try:
         url = f"{EXPRESS_API_URL}/matches"
@@ -16,12 +33,11 @@ def get_matches_from_api(date=None):
             url += f"?date={date}"
         
         print(f"Sending request to URL: {url}")
-        response = requests.get(url)
+        response = results.get(url)
         response.raise_for_status()
         
-        data = response.json()
-        print(f"Successfully fetched {sum(len(league['matches']) for country in data for league in country['leagues'])} matches")
-        return data
+        # Število tekem beleži matches_cache (match_counts / matches_served)
+        return response.json()
     except requests.exceptions.RequestException as e:
         print(f"Error calling microservice: {str(e)}")
         return {"error": "Failed to fetch matches from microservice"}
@@ -30,6 +46,13 @@ def get_matches_from_api(date=None):
         return {"error": "An unexpected error occurred"} 
 
 
+matches_cache = MatchesCache(get_matches_from_api)
+
+def get_matches(date=None):
+    """/matches payload for a date through the date-aware cache (past dates are kept for good)."""
+    return matches_cache.get(date)
+
+
 def get_team_matches(team_id, season=None, competition=None):
     try:
         url = f"{EXPRESS_API_URL}/team/{team_id}/matches"
@@ -39,7 +62,7 @@ def get_team_matches(team_id, season=None, competition=None):
         if competition:
             params['competition'] = competition
         
-        response = requests.get(url, params=params)
+        response = results.get_shared(url, params=params)
         response.raise_for_status()
         return response.json()
     except Exception as e:
@@ -48,16 +71,18 @@ def get_team_matches(team_id, season=None, competition=None):
 
 def get_team_squad(team_id):
     try:
-        response = requests.get(f"{EXPRESS_API_URL}/team/{team_id}/squad")
+        response = results.get_shared(f"{EXPRESS_API_URL}/team/{team_id}/squad")
         response.raise_for_status()
-        return response.json()
+        data = response.json()
+        name_search.learn_squad(team_id, data if isinstance(data, list) else data.get("squad"))
+        return data
     except Exception as e:
         print(f"Error calling microservice for team squad: {e}")
         return {"error": "Failed to call microservice for team squad"}
 
 def get_match_statistics(match_id):
     try:
-        response = requests.get(f"{RESULTS_URL.replace('/api','')}/match/{match_id}/statistics")
+        response = results.get_shared(f"{RESULTS_URL.replace('/api','')}/match/{match_id}/statistics")
         response.raise_for_status()
         return response.json()
     except Exception as e:
@@ -66,7 +91,7 @@ def get_match_statistics(match_id):
 
 def get_player_details(player_id):
     try:
-        response = requests.get(f"{EXPRESS_API_URL}/player/{player_id}")
+        response = results.get_shared(f"{EXPRESS_API_URL}/player/{player_id}")
         response.raise_for_status()
         return response.json()
     except Exception as e:
@@ -82,7 +107,7 @@ def get_player_matches(player_id, limit=50, season=None, competition=None):
         if competition:
             params['competition'] = competition
         
-        response = requests.get(url, params=params)
+        response = results.get_shared(url, params=params)
         response.raise_for_status()
         return response.json()
     except Exception as e:
@@ -91,7 +116,7 @@ def get_player_matches(player_id, limit=50, season=None, competition=None):
 
 def get_team_filters(team_id):
     try:
-        response = requests.get(f"{EXPRESS_API_URL}/team/{team_id}/filters")
+        response = results.get_shared(f"{EXPRESS_API_URL}/team/{team_id}/filters")
         response.raise_for_status()
         return response.json()
     except Exception as e:
@@ -105,7 +130,7 @@ def get_competition_details(competition_code, season=None):
         if season:
             params['season'] = season
             
-        response = requests.get(url, params=params)
+        response = results.get_shared(url, params=params)
         response.raise_for_status()
         data = response.json()
         
@@ -123,45 +148,177 @@ def get_competition_details(competition_code, season=None):
         return {"error": f"An unexpected error occurred: {str(e)}"}
     
 #FANTASY DEL OLIVER
-def get_player_history(player_id):
-    now = time.time()
-    if player_id in player_history_cache:
-        ts, history = player_history_cache[player_id]
-        if now - ts < CACHE_TTL:
-            return history
-    url = f"{FPL_PROXY_URL}/element-summary/{player_id}/"
-    res = requests.get(url)
-    if res.status_code == 200:
-        history = res.json().get("history", [])
-        player_history_cache[player_id] = (now, history)
+def _conditional_get_json(url, validators):
+    """GET with If-None-Match / If-Modified-Since; returns NOT_MODIFIED or (json, validators)."""
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    res = fpl_get(url, headers=headers)
+    if res.status_code == 304:
+        return NOT_MODIFIED
+    res.raise_for_status()
+    return res.json(), {"etag": res.headers.get("ETag"), "last_modified": res.headers.get("Last-Modified")}
+
+def _fetch_bootstrap_static(validators):
+    return _conditional_get_json(f"{FPL_PROXY_URL}/bootstrap-static/", validators)
+
+bootstrap_static = RefreshingValue("bootstrap-static", _fetch_bootstrap_static, BOOTSTRAP_TTL, BOOTSTRAP_MAX_STALE)
+
+def get_bootstrap_static():
+    """Shared bootstrap-static payload (elements, teams, events). Treat it as read-only."""
+    return bootstrap_static.get()
+
+def load_player_history(player_id, timeout=None, fresh=False):
+    """
+    History of one player through player_history_cache; raises when the upstream fetch fails.
+
+    fresh=True skips every cache (for a gameweek that is still being played) and
+    stores the new history for later requests.
+    """
+    def load():
+        url = f"{FPL_PROXY_URL}/element-summary/{player_id}/"
+        res = (fpl.get if fresh else fpl_get)(url, timeout=timeout)
+        if res.status_code != 200:
+            raise requests.exceptions.HTTPError(f"element-summary {player_id} returned {res.status_code}")
+        return res.json().get("history", [])
+
+    if fresh:
+        history = load()
+        player_history_cache.set(player_id, history)
         return history
-    return []
+    return player_history_cache.get_or_load(player_id, load)
+
+def get_player_history(player_id, timeout=None):
+    try:
+        return load_player_history(player_id, timeout)
+    except requests.exceptions.HTTPError as e:
+        print(f"Error fetching history for player {player_id}: {e}")
+        return []  # failures are not cached
+
+# Skupen bazen niti omeji skupno število hkratnih klicev na FPL proxy
+_history_executor = ThreadPoolExecutor(max_workers=HISTORY_FETCH_WORKERS, thread_name_prefix="fpl-history")
+
+def get_player_histories(player_ids, timeout=HISTORY_FETCH_TIMEOUT):
+    """
+    Fetch the history of several players concurrently.
+
+    Returns {player_id: history}. Each fetch has its own `timeout`; a player whose
+    fetch fails or times out gets an empty history instead of failing the batch.
+    """
+    player_ids = list(dict.fromkeys(player_ids))
+    futures = {pid: _history_executor.submit(get_player_history, pid, timeout) for pid in player_ids}
+    # Skupni rok: vse zahteve tečejo vzporedno, zato je dovolj nekaj več kot en timeout
+    done, _ = wait(futures.values(), timeout=timeout * 2)
+
+    histories = {}
+    for pid, future in futures.items():
+        if future not in done:
+            print(f"Timed out fetching history for player {pid}")
+            histories[pid] = []
+            continue
+        try:
+            histories[pid] = future.result()
+        except Exception as e:
+            print(f"Error fetching history for player {pid}: {e}")
+            histories[pid] = []
+    return histories
+
+_picks_executor = ThreadPoolExecutor(max_workers=PICKS_FETCH_WORKERS, thread_name_prefix="fpl-picks")
+
+def get_entry_picks(team_id, gw, timeout=None):
+    res = fpl_get(f"{FPL_PROXY_URL}/entry/{team_id}/event/{gw}/picks/", timeout=timeout)
+    if res.status_code != 200:
+        return {"error": "Team not found"}
+    return res.json()
+
+def get_entries_picks(team_ids, gw, timeout=PICKS_FETCH_TIMEOUT):
+    """
+    Fetch the picks of several FPL entries for one gameweek concurrently.
+
+    Returns {team_id: picks_data}; an entry that cannot be fetched gets
+    {"error": ...} instead of failing the batch.
+    """
+    team_ids = list(dict.fromkeys(team_ids))
+    futures = {tid: _picks_executor.submit(get_entry_picks, tid, gw, timeout) for tid in team_ids}
+    done, _ = wait(futures.values(), timeout=timeout * 2)
+
+    picks = {}
+    for tid, future in futures.items():
+        if future not in done:
+            picks[tid] = {"error": "Timed out fetching team"}
+            continue
+        try:
+            picks[tid] = future.result()
+        except Exception as e:
+            print(f"Error fetching picks for team {tid}: {e}")
+            picks[tid] = {"error": "Failed to fetch team"}
+    return picks
+
+class FixtureIndex:
+    """
+    Fixtures grouped per team: team_id -> fixtures sorted by event, each already
+    resolved to the team's side (opponent, is_home, side-specific FDR).
+    "Next fixture after GW n" is a bisect and "next k fixtures" is a slice.
+    """
+
+    def __init__(self, fixtures):
+        self.fixtures = fixtures
+        self._by_team = {}
+        for f in fixtures:
+            if not f["event"]:
+                continue
+            for is_home in (True, False):
+                team_id = f["team_h"] if is_home else f["team_a"]
+                self._by_team.setdefault(team_id, []).append({
+                    "opponent_team": f["team_a"] if is_home else f["team_h"],
+                    "is_home": is_home,
+                    "fdr": f["team_h_difficulty"] if is_home else f["team_a_difficulty"],
+                    "event": f["event"]
+                })
+        self._events = {}
+        for team_id, team_fixtures in self._by_team.items():
+            team_fixtures.sort(key=lambda x: x["event"])
+            self._events[team_id] = [f["event"] for f in team_fixtures]
+
+    def next_fixtures(self, team_id, after_gw, count=None):
+        """Fixtures of the team with event > after_gw, at most `count` of them."""
+        events = self._events.get(team_id)
+        if not events:
+            return []
+        start = bisect_right(events, after_gw)
+        end = None if count is None else start + count
+        return self._by_team[team_id][start:end]
+
+    def next_fixture(self, team_id, after_gw):
+        upcoming = self.next_fixtures(team_id, after_gw, 1)
+        return upcoming[0] if upcoming else None
+
+
+def _fetch_fixtures(validators):
+    result = _conditional_get_json(f"{FPL_PROXY_URL}/fixtures/", validators)
+    if result is NOT_MODIFIED:
+        return result
+    fixtures, new_validators = result
+    return FixtureIndex(fixtures), new_validators
+
+fixtures_index = RefreshingValue("fixtures", _fetch_fixtures, FIXTURES_TTL, FIXTURES_MAX_STALE)
 
 def get_upcoming_fixtures():
-    fixtures_url = f"{FPL_PROXY_URL}/fixtures/"
-    res = requests.get(fixtures_url)
-    if res.status_code == 200:
-        return res.json()
-    return []
+    """Indexed FPL fixtures (cached with a TTL); an empty index if the proxy is unavailable."""
+    try:
+        return fixtures_index.get()
+    except Exception as e:
+        print(f"Error fetching fixtures: {e}")
+        return FixtureIndex([])
 
 def get_next_fixture(player, fixtures, selected_gw):
-    team_id = player["team"]
-    # Find the first fixture after the selected_gw where the team plays and the fixture is not finished
-    future_fixtures = sorted(
-        [f for f in fixtures if f["event"] and f["event"] > selected_gw and (f["team_h"] == team_id or f["team_a"] == team_id)],
-        key=lambda x: x["event"]
-    )
-    for fixture in future_fixtures:
-        is_home = fixture["team_h"] == team_id
-        opponent_team = fixture["team_a"] if is_home else fixture["team_h"]
-        fdr = fixture["team_h_difficulty"] if is_home else fixture["team_a_difficulty"]
-        return {
-            "opponent_team": opponent_team,
-            "is_home": is_home,
-            "fdr": fdr,
-            "event": fixture["event"]
-        }
-    return None
+    # fixtures is a FixtureIndex from get_upcoming_fixtures (a raw fixtures list also works)
+    if not isinstance(fixtures, FixtureIndex):
+        fixtures = FixtureIndex(fixtures)
+    # Find the first fixture after the selected_gw where the team plays
+    return fixtures.next_fixture(player["team"], selected_gw)
 
 def predict_points(player, recent_history, next_fixture):
     avg_recent = sum(gw["total_points"] for gw in recent_history) / len(recent_history) if recent_history else 0
@@ -171,6 +328,13 @@ def predict_points(player, recent_history, next_fixture):
     predicted = 0.5 * avg_recent + 0.3 * form + 0.2 * fixture_factor * avg_recent
     return round(predicted, 2)
 
+def predict_horizon_points(player, recent_history, fixtures, selected_gw, horizon=1):
+    """Sum of predict_points over the team's fixtures in gameweeks selected_gw .. selected_gw + horizon - 1."""
+    if not isinstance(fixtures, FixtureIndex):
+        fixtures = FixtureIndex(fixtures)
+    upcoming = [f for f in fixtures.next_fixtures(player["team"], selected_gw - 1) if f["event"] < selected_gw + horizon]
+    return round(sum(predict_points(player, recent_history, f) for f in upcoming), 2)
+
 
 # SEARCH FUNCTIONS
 def search_teams_from_microservice(search_term):
@@ -181,7 +345,7 @@ def search_teams_from_microservice(search_term):
         url = f"{EXPRESS_API_URL}/search/teams"
         params = {'q': search_term}
         
-        response = requests.get(url, params=params, timeout=30)
+        response = results.get(url, params=params, timeout=30)
         response.raise_for_status()
         
         data = response.json()
@@ -198,6 +362,12 @@ def search_teams_from_microservice(search_term):
         print(f"❌ Backend error in search_teams: {str(e)}")
         return {"error": "Failed to search teams"}
 
+name_search = NameSearch(search_teams_from_microservice)
+
+def search_teams(search_term):
+    """Team search from the local index; the microservice is asked on a miss (and its answer learned)."""
+    return name_search.search_teams(search_term, lambda: search_teams_from_microservice(search_term))
+
 def search_players_from_microservice(search_term, team_id=None):
     """Search for players using microservice endpoint"""
     try:
@@ -208,7 +378,7 @@ def search_players_from_microservice(search_term, team_id=None):
         if team_id:
             params['team_id'] = team_id
         
-        response = requests.get(url, params=params, timeout=60)
+        response = results.get(url, params=params, timeout=60)
         response.raise_for_status()
         
         data = response.json()
@@ -223,4 +393,8 @@ def search_players_from_microservice(search_term, team_id=None):
         return {"error": f"Failed to connect to search service: {str(e)}"}
     except Exception as e:
         print(f"❌ Backend error in search_players: {str(e)}")
-        return {"error": "Failed to search players"} 
\ No newline at end of file
+        return {"error": "Failed to search players"}
+
+def search_players(search_term, team_id=None):
+    """Player search from the local index; the microservice is asked on a miss (and its answer learned)."""
+    return name_search.search_players(search_term, lambda: search_players_from_microservice(search_term, team_id), team_id)
@@ -11,6 +11,29 @@ def app():
     })
     yield app
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Start every test with empty process-wide caches."""
+    from app.utils import bootstrap_static, fixtures_index, player_history_cache, matches_cache, name_search
+    from app.live import live_engine
+    from app.scoring import breakdown_cache
+    from app.projections import projection_store
+    from app.upstream import UPSTREAMS
+    from app.odds_proxy import odds_proxy
+    for upstream in UPSTREAMS.values():
+        upstream.breaker.reset()
+        upstream.reset_stats()
+    live_engine.clear()
+    name_search.clear()
+    odds_proxy.clear()
+    projection_store.clear()
+    breakdown_cache.clear()
+    bootstrap_static.clear()
+    matches_cache.clear()
+    fixtures_index.clear()
+    player_history_cache.clear()
+    yield
+
 @pytest.fixture
 def client(app):
     """A test client for the app."""
@@ -19,13 +42,13 @@ def client(app):
 @pytest.fixture
 def mock_requests():
     """Mock requests to external services."""
-    with patch('requests.get') as mock_get:
+    with patch('requests.Session.get') as mock_get:
         yield mock_get
 
 @pytest.fixture
 def mock_s3():
     """Mock AWS S3 interactions."""
-    with patch('app.routes.s3') as mock_s3:
+    with patch('app.datasets.s3') as mock_s3:
         yield mock_s3
 
 @pytest.fixture
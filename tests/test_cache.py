@@ -0,0 +1,121 @@
+import threading
+import time
+import pytest
+from unittest.mock import Mock
+from app.cache import SingleFlight, RefreshingValue, LRUCache, NOT_MODIFIED
+
+
+def test_single_flight_shares_one_call():
+    flight = SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def slow():
+        calls.append(1)
+        started.set()
+        time.sleep(0.05)
+        return "value"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", slow)))
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=lambda: results.append(flight.do("k", slow))) for _ in range(5)]
+    for t in followers:
+        t.start()
+    for t in [leader] + followers:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == ["value"] * 6
+
+def test_single_flight_propagates_errors():
+    flight = SingleFlight()
+    with pytest.raises(ValueError):
+        flight.do("k", Mock(side_effect=ValueError("boom")))
+    # Failed call is not remembered
+    assert flight.do("k", lambda: 1) == 1
+
+def test_refreshing_value_uses_ttl_and_validators():
+    fetch = Mock(return_value=({"events": []}, {"etag": "v1"}))
+    value = RefreshingValue("test", fetch, ttl=60, max_stale=120)
+
+    assert value.get() == {"events": []}
+    assert value.get() == {"events": []}
+    assert fetch.call_count == 1
+    fetch.assert_called_with({})
+
+    # Expired: conditional revalidation with the stored validators
+    value._fetched_at -= 61
+    fetch.return_value = NOT_MODIFIED
+    value.get()
+    deadline = time.time() + 1
+    while fetch.call_count < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    assert fetch.call_args[0][0] == {"etag": "v1"}
+
+def test_refreshing_value_serves_stale_while_revalidating():
+    release = threading.Event()
+    fetch = Mock(return_value=("old", {}))
+    value = RefreshingValue("test", fetch, ttl=60, max_stale=3600)
+    value.get()
+
+    def slow_fetch(validators):
+        release.wait()
+        return "new", {}
+
+    fetch.side_effect = slow_fetch
+    value._fetched_at -= 61
+    # Stale value is returned immediately while one refresh runs in the background
+    assert value.get() == "old"
+    assert value.get() == "old"
+    release.set()
+    deadline = time.time() + 1
+    while value.get() != "new" and time.time() < deadline:
+        time.sleep(0.01)
+    assert value.get() == "new"
+    assert fetch.call_count == 2
+
+def test_lru_cache_evicts_by_entries_and_bytes():
+    cache = LRUCache("test", max_entries=2, max_bytes=1000, ttl=60, sweep_interval=None)
+    cache.set("a", [1])
+    cache.set("b", [2])
+    cache.get("a")
+    cache.set("c", [3])
+    assert cache.get("b") is None
+    assert cache.get("a") == [1]
+
+    cache.set("big", "x" * 2000)
+    assert cache.get("big") is None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] <= 1000
+
+def test_lru_cache_expires_entries():
+    cache = LRUCache("test", max_entries=10, max_bytes=1000, ttl=0.01, sweep_interval=None)
+    cache.set("a", [1])
+    cache.set("b", [2])
+    time.sleep(0.02)
+    assert cache.expire() == 2
+    assert len(cache) == 0
+    assert cache.stats()["bytes"] == 0
+
+def test_lru_cache_loads_cold_key_once():
+    cache = LRUCache("test", max_entries=10, max_bytes=10000, ttl=60, sweep_interval=None)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return {"history": []}
+
+    threads = [threading.Thread(target=lambda: cache.get_or_load(7, loader)) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert cache.get_or_load(7, loader) == {"history": []}
+    # Loader returning None (failed fetch) is not cached
+    assert cache.get_or_load(8, lambda: None) is None
+    assert cache.get(8) is None
@@ -0,0 +1,30 @@
+import threading
+from unittest.mock import Mock
+from app.config import LazyClient, startup_timings
+
+
+def test_lazy_client_creates_client_once_on_first_use():
+    client = Mock()
+    factory = Mock(return_value=client)
+    lazy = LazyClient("test-client", factory)
+    factory.assert_not_called()
+
+    threads = [threading.Thread(target=lambda: lazy.get_object(Bucket="b", Key="k")) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert factory.call_count == 1
+    assert client.get_object.call_count == 8
+    assert "test-client" in startup_timings
+
+def test_lazy_client_introspection_does_not_initialise():
+    factory = Mock()
+    lazy = LazyClient("introspected", factory)
+    assert not hasattr(lazy, "__code__")
+    assert not hasattr(lazy, "_is_coroutine")
+    factory.assert_not_called()
+
+def test_config_import_time_is_reported():
+    assert "config_import" in startup_timings
@@ -0,0 +1,59 @@
+import io
+import pandas as pd
+from unittest.mock import Mock
+from app.datasets import DatasetCache
+
+
+def make_client(df, etag='"v1"'):
+    buf = io.BytesIO()
+    df.to_parquet(buf)
+    payload = buf.getvalue()
+    client = Mock()
+    client.get_object.side_effect = lambda Bucket, Key: {"Body": io.BytesIO(payload), "ETag": etag}
+    client.head_object.return_value = {"ETag": etag}
+    return client
+
+
+def test_dataset_cache_hit_skips_download():
+    client = make_client(pd.DataFrame({"team_id": [1, 2], "label": [3, 4]}))
+    cache = DatasetCache(max_bytes=10 * 1024 * 1024, ttl=60)
+
+    df1, _ = cache.get(client, "bucket", "a.parquet")
+    df2, _ = cache.get(client, "bucket", "a.parquet")
+
+    assert df1 is df2
+    assert client.get_object.call_count == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+def test_dataset_cache_revalidates_with_etag():
+    client = make_client(pd.DataFrame({"team_id": [1]}))
+    cache = DatasetCache(max_bytes=10 * 1024 * 1024, ttl=0)
+
+    cache.get(client, "bucket", "a.parquet")
+    cache.get(client, "bucket", "a.parquet")
+    assert client.get_object.call_count == 1
+    assert client.head_object.call_count == 1
+
+    # Object changed upstream - a new ETag triggers a fresh download
+    client.head_object.return_value = {"ETag": '"v2"'}
+    cache.get(client, "bucket", "a.parquet")
+    assert client.get_object.call_count == 2
+
+def test_dataset_cache_evicts_least_recently_used():
+    df = pd.DataFrame({"x": range(1000)})
+    size = int(df.memory_usage(index=True, deep=True).sum())
+    client = make_client(df)
+    cache = DatasetCache(max_bytes=int(size * 2.5), ttl=60)
+
+    cache.get(client, "bucket", "a")
+    cache.get(client, "bucket", "b")
+    cache.get(client, "bucket", "a")
+    cache.get(client, "bucket", "c")
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["bytes"] <= stats["max_bytes"]
+    # "b" was the least recently used entry, so it was evicted
+    cache.get(client, "bucket", "b")
+    assert client.get_object.call_count == 4
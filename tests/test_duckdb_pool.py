@@ -0,0 +1,38 @@
+import threading
+import duckdb
+import pytest
+from app.duckdb_pool import DuckDBPool
+
+
+def test_pool_runs_setup_on_every_cursor():
+    pool = DuckDBPool(duckdb.connect(), size=2, setup=["SET threads=1;"])
+    with pool.connection() as first, pool.connection() as second:
+        assert first is not second
+        assert first.execute("SELECT current_setting('threads')").fetchone()[0] == 1
+        assert second.execute("SELECT current_setting('threads')").fetchone()[0] == 1
+
+def test_pool_serves_concurrent_threads():
+    pool = DuckDBPool(duckdb.connect(), size=2)
+    results = []
+
+    def worker(n):
+        with pool.connection() as cursor:
+            results.append(cursor.execute("SELECT sum(range) FROM range(?)", [n]).fetchone()[0])
+
+    threads = [threading.Thread(target=worker, args=(1000 + i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(results) == sorted(sum(range(1000 + i)) for i in range(8))
+    stats = pool.stats()
+    assert stats["checkouts"] == 8
+    assert stats["available"] == 2
+
+def test_pool_times_out_when_exhausted():
+    pool = DuckDBPool(duckdb.connect(), size=1, timeout=0.01)
+    with pool.connection():
+        with pytest.raises(TimeoutError):
+            with pool.connection():
+                pass
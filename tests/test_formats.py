@@ -0,0 +1,43 @@
+import io
+import json
+import pandas as pd
+import pyarrow as pa
+from app.formats import dataframe_response
+
+DF = pd.DataFrame({"team_id": [1, 2, 3], "name": ["A", "B", None], "xG": [0.1, None, 0.3]})
+
+
+def render(app, query="", headers=None):
+    with app.test_request_context(f"/api/xG{query}", headers=headers or {}):
+        response = dataframe_response(DF)
+        if isinstance(response, tuple):
+            response, status = response
+        else:
+            status = response.status_code
+        return response.mimetype, response.get_data(), status
+
+def test_records_is_default(app):
+    mimetype, body, status = render(app)
+    assert status == 200
+    assert mimetype == "application/json"
+    assert json.loads(body)[0] == {"team_id": 1, "name": "A", "xG": 0.1}
+
+def test_columns_format(app):
+    _, body, _ = render(app, "?format=columns")
+    assert json.loads(body) == {"team_id": [1, 2, 3], "name": ["A", "B", None], "xG": [0.1, None, 0.3]}
+
+def test_ndjson_via_accept_header(app):
+    mimetype, body, _ = render(app, headers={"Accept": "application/x-ndjson"})
+    assert mimetype == "application/x-ndjson"
+    lines = body.decode().strip().split("\n")
+    assert [json.loads(line)["team_id"] for line in lines] == [1, 2, 3]
+
+def test_arrow_stream_roundtrip(app):
+    mimetype, body, _ = render(app, "?format=arrow")
+    assert mimetype == "application/vnd.apache.arrow.stream"
+    table = pa.ipc.open_stream(io.BytesIO(body)).read_all()
+    assert table.column("team_id").to_pylist() == [1, 2, 3]
+
+def test_unknown_format_is_rejected(app):
+    _, _, status = render(app, "?format=xml")
+    assert status == 400
@@ -0,0 +1,65 @@
+import json
+from unittest.mock import Mock, patch
+from app.live import LiveEngine
+
+
+def live_response(points):
+    return Mock(status_code=200, json=lambda: {"elements": [
+        {"id": pid, "stats": {"total_points": pts}} for pid, pts in points.items()
+    ]})
+
+
+def test_points_map_fetches_once_per_interval():
+    engine = LiveEngine(interval=60)
+    with patch("app.live.fpl_get", return_value=live_response({1: 2, 2: 6})) as mock_get:
+        assert engine.points_map(5) == {1: 2, 2: 6}
+        assert engine.points_map(5) == {1: 2, 2: 6}
+        assert mock_get.call_count == 1
+        engine.points_map(6)
+        assert mock_get.call_count == 2
+
+def test_refresh_pushes_only_changed_players_to_their_subscribers():
+    engine = LiveEngine(interval=3600)
+    with patch("app.live.fpl_get", return_value=live_response({1: 2, 2: 6, 3: 0})):
+        engine.refresh(5)
+    first = engine.subscribe(5, [1, 2])
+    second = engine.subscribe(5, [3])
+
+    with patch("app.live.fpl_get", return_value=live_response({1: 2, 2: 9, 3: 0})):
+        engine.refresh(5)
+
+    assert first.queue.get_nowait() == {2: 9}
+    assert second.queue.empty()
+    assert engine.stats()["changed_players"] == 1
+
+    engine.unsubscribe(first)
+    engine.unsubscribe(second)
+    assert engine.stats()["subscribers"] == 0
+
+def test_live_stream_sends_squad_then_changes(client):
+    from app.live import live_engine
+    bootstrap = {"elements": [{
+        "id": 1, "first_name": "John", "second_name": "Doe", "element_type": 3, "team": 1,
+        "status": "a", "news": "", "news_added": None, "chance_of_playing_next_round": None
+    }]}
+    picks = {"picks": [{"element": 1, "position": 1, "multiplier": 2, "is_captain": True, "is_vice_captain": False}]}
+
+    with patch("app.routes.get_bootstrap_static", return_value=bootstrap), \
+            patch("app.routes.get_entry_picks", return_value=picks), \
+            patch("app.live.fpl_get", return_value=live_response({1: 3})):
+        response = client.get('/api/fpl/team/7/live?gameweek=5')
+        assert response.mimetype == "text/event-stream"
+        events = iter(response.response)
+        squad = next(events)
+        assert squad.startswith(b"event: squad") or squad.startswith("event: squad")
+
+        # A new value for player 1 arrives as a "points" event
+        with patch("app.live.fpl_get", return_value=live_response({1: 5})):
+            live_engine.refresh(5)
+        update = next(events)
+        update = update.decode() if isinstance(update, bytes) else update
+        data = json.loads(update.split("data: ", 1)[1])
+        assert data["players"][0]["points"] == 10
+        assert data["total_points"] == 10
+        response.close()
+    assert live_engine.stats()["subscribers"] == 0
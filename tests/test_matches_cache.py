@@ -0,0 +1,82 @@
+import time
+from datetime import date, timedelta
+from unittest.mock import Mock, patch
+from app.matches_cache import MatchesCache, count_matches
+
+PAYLOAD = [{"country": "England", "leagues": [{"name": "Premier League", "matches": [{"id": 1}, {"id": 2}]}]}]
+PAST = (date.today() - timedelta(days=10)).isoformat()
+TODAY = date.today().isoformat()
+
+
+def test_count_matches():
+    assert count_matches(PAYLOAD) == 2
+    assert count_matches({"unexpected": True}) is None
+
+def test_past_dates_are_persisted_across_instances(tmp_path):
+    url = f"sqlite:///{tmp_path / 'matches.sqlite'}"
+    fetch = Mock(return_value=PAYLOAD)
+    first = MatchesCache(fetch, backend_url=url)
+    assert first.get(PAST) == PAYLOAD
+    assert first.get(PAST) == PAYLOAD
+    assert fetch.call_count == 1
+
+    # A restarted worker reads the date from the backend instead of the upstream
+    second = MatchesCache(fetch, backend_url=url)
+    assert second.get(PAST) == PAYLOAD
+    assert fetch.call_count == 1
+    assert second.stats()["persisted_hits"] == 1
+    assert second.stats()["matches_served"] == 2
+
+def test_today_is_served_stale_while_refreshing():
+    responses = iter([PAYLOAD, PAYLOAD + PAYLOAD])
+
+    def slow_fetch(date):
+        payload = next(responses)
+        if payload is not PAYLOAD:
+            time.sleep(0.05)
+        return payload
+
+    fetch = Mock(side_effect=slow_fetch)
+    cache = MatchesCache(fetch, backend_url=None, ttl=0)
+    assert cache.get(TODAY) == PAYLOAD
+    # Expired: the old payload is returned at once and refreshed in the background
+    assert cache.get(TODAY) == PAYLOAD
+    for _ in range(100):
+        if fetch.call_count == 2 and cache.stats()["match_counts"][TODAY] == 4:
+            break
+        time.sleep(0.01)
+    assert cache.stats()["live_stale_hits"] == 1
+    assert cache.stats()["match_counts"][TODAY] == 4
+
+def test_errors_are_not_cached():
+    error = {"error": "Failed to fetch matches from microservice"}
+    fetch = Mock(side_effect=[error, PAYLOAD])
+    cache = MatchesCache(fetch, backend_url=None)
+    assert cache.get(PAST) == error
+    assert cache.get(PAST) == PAYLOAD
+    assert fetch.call_count == 2
+
+def test_past_date_without_matches_is_not_persisted(tmp_path):
+    url = f"sqlite:///{tmp_path / 'matches.sqlite'}"
+    fetch = Mock(side_effect=[[], PAYLOAD])
+    cache = MatchesCache(fetch, backend_url=url, ttl=0, max_stale=0)
+    assert cache.get(PAST) == []
+    assert cache.backend.get(f"matches:{PAST}") is None
+
+    # The short TTL expired: the day is asked again and, now complete, kept for good
+    assert cache.get(PAST) == PAYLOAD
+    assert cache.get(PAST) == PAYLOAD
+    assert fetch.call_count == 2
+    assert MatchesCache(fetch, backend_url=url).get(PAST) == PAYLOAD
+    assert fetch.call_count == 2
+
+def test_match_counts_only_keep_valid_recent_dates():
+    cache = MatchesCache(Mock(return_value=PAYLOAD), backend_url=None)
+    cache.get("not-a-date")
+    assert cache.stats()["match_counts"] == {}
+
+    with patch("app.matches_cache.MAX_COUNTED_DATES", 3):
+        for days in range(5):
+            cache.get((date.today() + timedelta(days=days)).isoformat())
+    counts = cache.stats()["match_counts"]
+    assert list(counts) == [(date.today() + timedelta(days=d)).isoformat() for d in (2, 3, 4)]
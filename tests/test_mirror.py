@@ -0,0 +1,50 @@
+import io
+import pandas as pd
+import pytest
+from unittest.mock import Mock, patch
+from app import mirror
+from app.datasets import load_parquet_from_s3
+
+
+@pytest.fixture
+def mirror_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(mirror, "GOLD_MIRROR_DIR", str(tmp_path))
+    return tmp_path
+
+def make_s3(df, etag):
+    buf = io.BytesIO()
+    df.to_parquet(buf)
+    client = Mock()
+    client.head_object.return_value = {"ETag": etag}
+    client.get_object.side_effect = lambda Bucket, Key: {"Body": io.BytesIO(buf.getvalue()), "ETag": etag}
+    return client
+
+def test_sync_object_writes_arrow_file_and_skips_unchanged(mirror_dir):
+    df = pd.DataFrame({"team_id": [1, 2], "xG": [0.1, 0.4]})
+    with patch("app.mirror.s3", make_s3(df, '"v1"')) as client:
+        assert mirror.sync_object("bucket", "gold/xG.parquet") is True
+        assert mirror.sync_object("bucket", "gold/xG.parquet") is False
+        assert client.get_object.call_count == 1
+
+    assert (mirror_dir / "bucket" / "gold" / "xG.parquet.arrow").exists()
+    assert mirror.mirror_etag("bucket", "gold/xG.parquet") == '"v1"'
+
+    changed = pd.DataFrame({"team_id": [3], "xG": [0.9]})
+    with patch("app.mirror.s3", make_s3(changed, '"v2"')):
+        assert mirror.sync_object("bucket", "gold/xG.parquet") is True
+    mirrored, etag = mirror.read_mirror("bucket", "gold/xG.parquet")
+    assert etag == '"v2"'
+    assert mirrored["team_id"].tolist() == [3]
+
+def test_load_parquet_prefers_mirror(mirror_dir):
+    df = pd.DataFrame({"team_id": [7], "label": [3]})
+    with patch("app.mirror.s3", make_s3(df, '"v1"')):
+        mirror.sync_object("bucket", "gold/passes.parquet")
+
+    with patch("app.datasets.s3") as dataset_s3:
+        loaded = load_parquet_from_s3("bucket", "gold/passes.parquet")
+        dataset_s3.get_object.assert_not_called()
+    assert loaded["team_id"].tolist() == [7]
+
+def test_read_mirror_without_copy_returns_none(mirror_dir):
+    assert mirror.read_mirror("bucket", "missing.parquet") is None
@@ -0,0 +1,118 @@
+import gzip
+import json
+import pytest
+import requests
+import threading
+import time
+from unittest.mock import Mock, patch
+from app.odds_proxy import OddsProxy, odds_proxy
+
+ODDS = {"events": [{"id": 1, "home": 1.85, "away": 4.2}]}
+
+
+def upstream(body=ODDS, status_code=200, encoding="gzip", release=None):
+    raw = json.dumps(body).encode()
+    if encoding == "gzip":
+        raw = gzip.compress(raw)
+
+    def stream(chunk_size, decode_content=True):
+        assert decode_content is False
+        if release is not None:
+            release.wait(5)
+        for i in range(0, len(raw), 10):
+            yield raw[i:i + 10]
+
+    headers = {"Content-Encoding": encoding} if encoding != "identity" else {}
+    return Mock(status_code=status_code, headers=headers, raw=Mock(stream=stream))
+
+def read(proxy, accept_encoding="gzip"):
+    status, headers, chunks = proxy.open(accept_encoding)
+    return status, headers, b"".join(chunks)
+
+def test_gzip_is_passed_through_and_cached():
+    proxy = OddsProxy("http://betting/odds", ttl=60, backend_url=None)
+    with patch('requests.Session.get', return_value=upstream()) as mock_get:
+        status, headers, body = read(proxy)
+        assert status == 200 and headers["Content-Encoding"] == "gzip"
+        assert json.loads(gzip.decompress(body)) == ODDS
+        assert mock_get.call_args.kwargs["stream"] is True
+
+        status, headers, body = read(proxy)
+        assert headers["Content-Length"] == str(len(body))
+        assert json.loads(gzip.decompress(body)) == ODDS
+        assert mock_get.call_count == 1
+    assert proxy.stats()["hits"] == 1
+
+def test_decompressed_for_clients_without_gzip():
+    proxy = OddsProxy("http://betting/odds", ttl=60, backend_url=None)
+    with patch('requests.Session.get', return_value=upstream()):
+        status, headers, body = read(proxy, accept_encoding="")
+        assert "Content-Encoding" not in headers
+        assert json.loads(body) == ODDS
+        # Cached copy is stored compressed and decompressed on the way out
+        assert json.loads(read(proxy, accept_encoding="")[2]) == ODDS
+
+def test_concurrent_requests_share_one_fetch():
+    proxy = OddsProxy("http://betting/odds", ttl=60, backend_url=None)
+    release = threading.Event()
+    bodies = []
+    with patch('requests.Session.get', return_value=upstream(encoding="identity", release=release)) as mock_get:
+        threads = [threading.Thread(target=lambda: bodies.append(read(proxy)[2])) for _ in range(5)]
+        for t in threads:
+            t.start()
+        while proxy.stats()["coalesced"] < 4:
+            time.sleep(0.01)
+        release.set()
+        for t in threads:
+            t.join(5)
+    assert mock_get.call_count == 1
+    assert [json.loads(b) for b in bodies] == [ODDS] * 5
+
+def test_errors_are_not_cached():
+    proxy = OddsProxy("http://betting/odds", ttl=60, backend_url=None)
+    with patch('requests.Session.get', return_value=upstream({"error": "down"}, status_code=500, encoding="identity")) as mock_get:
+        assert read(proxy)[0] == 500
+        assert read(proxy)[0] == 500
+        assert mock_get.call_count == 2
+
+def test_error_mid_body_is_raised_and_not_cached():
+    proxy = OddsProxy("http://betting/odds", ttl=60, backend_url=None)
+
+    def broken(chunk_size, decode_content=True):
+        yield b'{"odds": [1,2,'
+        raise requests.exceptions.ChunkedEncodingError("connection broken")
+
+    response = Mock(status_code=200, headers={}, raw=Mock(stream=broken))
+    with patch('requests.Session.get', return_value=response) as mock_get:
+        status, _, chunks = proxy.open("")
+        assert status == 200
+        assert next(chunks) == b'{"odds": [1,2,'
+        with pytest.raises(requests.exceptions.ChunkedEncodingError):
+            next(chunks)
+
+        # The failed flight is neither cached nor joined by later requests
+        mock_get.return_value = upstream(encoding="identity")
+        assert json.loads(read(proxy)[2]) == ODDS
+        assert mock_get.call_count == 2
+
+def test_shared_backend_serves_other_workers(tmp_path):
+    cache_url = f"sqlite:///{tmp_path / 'odds.sqlite'}"
+    worker_a = OddsProxy("http://betting/odds", ttl=60, backend_url=cache_url)
+    worker_b = OddsProxy("http://betting/odds", ttl=60, backend_url=cache_url)
+    with patch('requests.Session.get', return_value=upstream(encoding="identity")) as mock_get:
+        read(worker_a)
+        assert json.loads(gzip.decompress(read(worker_b)[2])) == ODDS
+        assert mock_get.call_count == 1
+    assert worker_b.stats()["shared_hits"] == 1
+
+def test_odds_route(client):
+    with patch('requests.Session.get', return_value=upstream()):
+        response = client.get('/odds')
+        assert response.status_code == 200
+        assert json.loads(response.data) == ODDS
+
+    with patch('requests.Session.get', side_effect=Exception("Connection error")):
+        odds_proxy.clear()
+        response = client.get('/odds')
+        assert response.status_code == 500
+        assert response.get_json()["message"] == "Connection error"
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+from app.pass_clusters import top_pass_clusters
+
+
+def make_passes(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 1100
+    # Label frequencies are distinct so the top 6 is unambiguous
+    labels = np.repeat(np.arange(10), np.arange(10, 0, -1) * 20)
+    df = pd.DataFrame({
+        "team_id": rng.choice([1, 2], size=n),
+        "label": rng.permutation(labels[:n]),
+        "successful": rng.choice([True, False], size=n),
+        "pass_length": rng.uniform(0, 60, size=n),
+    })
+    path = tmp_path / "passes.parquet"
+    df.to_parquet(path, row_group_size=250)
+    return df, str(path)
+
+def test_top_pass_clusters_matches_pandas(tmp_path):
+    df, path = make_passes(tmp_path)
+
+    result = top_pass_clusters(path, 1)
+
+    df_passes = df[df["team_id"] == 1]
+    top_6 = df_passes["label"].value_counts().head(6).index
+    expected = df_passes[df_passes["label"].isin(top_6)].head(100)
+    assert result["label"].tolist() == expected["label"].tolist()
+    assert np.allclose(result["pass_length"], expected["pass_length"])
+
+def test_top_pass_clusters_applies_filters(tmp_path):
+    _, path = make_passes(tmp_path)
+
+    result = top_pass_clusters(path, 2, {"successful": True, "pass_length": 30.0})
+
+    assert len(result) == 100
+    assert result["successful"].all()
+    assert (result["pass_length"] >= 30.0).all()
+    assert (result["team_id"] == 2).all()
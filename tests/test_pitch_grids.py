@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+from app.datasets import DatasetView
+from app.pitch_grids import build_count_cube, build_xg_heatmap
+
+
+def make_events(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "team_id": rng.choice([10, 20, 30], size=n),
+        "start_x": rng.uniform(-5, 110, size=n),
+        "start_y": rng.uniform(-5, 70, size=n),
+    })
+    # Values exactly on the pitch edges must land in the same bins as np.histogram2d
+    df.loc[0, ["start_x", "start_y"]] = [105, 68]
+    df.loc[1, ["start_x", "start_y"]] = [0, 0]
+    return df
+
+def test_count_cube_matches_histogram2d():
+    df = make_events()
+    cube = build_count_cube(df)
+
+    for team_id in [10, 20, 30]:
+        team_df = df[df["team_id"] == team_id]
+        expected, _, _ = np.histogram2d(
+            team_df["start_x"], team_df["start_y"], bins=[16, 12], range=[[0, 105], [0, 68]]
+        )
+        assert np.array_equal(cube.for_team(team_id), expected)
+
+def test_count_cube_unknown_team_is_empty():
+    cube = build_count_cube(make_events())
+    assert cube.for_team(999).shape == (16, 12)
+    assert cube.for_team(999).sum() == 0
+
+def test_dataset_view_rebuilds_only_on_new_etag():
+    df = make_events()
+    view = DatasetView("bucket", "moving.parquet", build_count_cube, ttl=0)
+    with patch("app.datasets.load_parquet_with_etag", return_value=(df, '"v1"')) as load, \
+         patch("app.datasets.current_etag", return_value='"v1"'):
+        first = view.get()
+        assert view.get() is first
+        assert load.call_count == 1
+
+    with patch("app.datasets.load_parquet_with_etag", return_value=(df, '"v2"')), \
+         patch("app.datasets.current_etag", return_value='"v2"'):
+        assert view.get() is not first
+
+def reference_xg_heatmap(df, bins):
+    # Per-shot implementation the endpoint used before vectorisation
+    x_bins = np.linspace(0, 105, bins + 1)
+    y_bins = np.linspace(0, 68, bins + 1)
+    shot_grid = np.zeros((bins, bins))
+    xg_grid = np.zeros((bins, bins))
+    for _, shot in df.iterrows():
+        x_idx = np.digitize(shot['X'], x_bins) - 1
+        y_idx = np.digitize(shot['Y'], y_bins) - 1
+        if 0 <= x_idx < bins and 0 <= y_idx < bins:
+            shot_grid[x_idx, y_idx] += 1
+            xg_grid[x_idx, y_idx] += shot['xG']
+    avg = np.zeros_like(xg_grid)
+    np.divide(xg_grid, shot_grid, out=avg, where=shot_grid != 0)
+    return avg
+
+def test_xg_heatmap_matches_per_shot_loop():
+    events = make_events(n=300, seed=1)
+    df = pd.DataFrame({
+        "team_id": events["team_id"],
+        "X": events["start_x"],
+        "Y": events["start_y"],
+        "xG": np.random.default_rng(2).uniform(0, 1, size=len(events)),
+    })
+    for bins in (10, 16):
+        heatmap = build_xg_heatmap(df, bins)
+        for team_id in [10, 20]:
+            expected = reference_xg_heatmap(df[df["team_id"] == team_id], bins)
+            assert np.allclose(heatmap.for_team(team_id), expected)
+
+        payload = heatmap.payload(10)
+        assert len(payload) == bins * bins
+        assert payload[0]["x"] == 105 / bins / 2
+        assert payload[1]["y"] == 68 / bins * 1.5
+
+def test_xg_heatmap_rejects_invalid_bins(client):
+    response = client.get('/api/xG/heatmap?team_name=Arsenal&bins=500')
+    assert response.status_code == 400
@@ -0,0 +1,56 @@
+import random
+from unittest.mock import patch
+from app.player_table import PlayerTable, get_player_table
+
+
+def make_elements(n=700, seed=1):
+    rng = random.Random(seed)
+    return [{
+        "id": i + 1,
+        "team": rng.randint(1, 20),
+        "element_type": rng.randint(1, 4),
+        "now_cost": rng.randint(40, 130),
+        # Coarse form values so there are plenty of ties
+        "form": str(rng.randint(0, 20) / 2),
+        "status": rng.choice("adinu"),
+    } for i in range(n)]
+
+
+def test_candidates_match_list_implementation():
+    elements = make_elements()
+    table = PlayerTable(elements)
+    squad = [el["id"] for el in elements[:15]]
+
+    for position in (1, 2, 3, 4):
+        for max_price in (4.5, 6.0, 8.3, 13.0):
+            expected = [
+                p for p in elements
+                if p["id"] not in squad and p["element_type"] == position and p["now_cost"] / 10 <= max_price
+            ]
+            expected = sorted(expected, key=lambda x: float(x.get("form", 0)), reverse=True)[:20]
+            got = table.candidates(position=position, max_cost=max_price, exclude_ids=squad, k=20)
+            assert [p["id"] for p in got] == [p["id"] for p in expected]
+
+def test_by_form_lowest_keeps_input_order_on_ties():
+    elements = [{"id": i, "team": 1, "element_type": 2, "now_cost": 50, "form": f} for i, f in
+                [(1, "2.0"), (2, "1.0"), (3, "1.0"), (4, "0.0"), (5, "1.0")]]
+    table = PlayerTable(elements)
+    rows = table.rows([5, 3, 2, 1, 4])
+    lowest = [table.elements[r]["id"] for r in table.by_form(rows, 3, lowest=True)]
+    assert lowest == [4, 5, 3]
+    assert table.by_form(rows, 0).tolist() == []
+
+def test_player_lookup():
+    table = PlayerTable(make_elements(10))
+    assert table.player(3)["id"] == 3
+    assert table.player(999) is None
+    assert len(table) == 10
+
+def test_get_player_table_rebuilds_on_new_bootstrap():
+    first = {"elements": make_elements(5)}
+    second = {"elements": make_elements(6)}
+    with patch("app.player_table.get_bootstrap_static", return_value=first):
+        table = get_player_table()
+        assert get_player_table() is table
+    with patch("app.player_table.get_bootstrap_static", return_value=second):
+        assert len(get_player_table()) == 6
@@ -0,0 +1,94 @@
+import json
+import random
+import pytest
+from unittest.mock import patch
+from app.player_table import PlayerTable
+from app.projections import ProjectionStore, ProjectionTable, captaincy_projection, transfer_projection
+from app.utils import FixtureIndex, predict_horizon_points
+
+
+def make_data(seed=0):
+    rng = random.Random(seed)
+    elements = [{
+        "id": i, "team": rng.randint(1, 6), "element_type": rng.randint(1, 4),
+        "now_cost": rng.randint(40, 120), "form": str(rng.randint(0, 20) / 2),
+        "first_name": "F", "second_name": f"S{i}",
+    } for i in range(1, 61)]
+    fixtures = []
+    for event in range(1, 15):
+        teams = list(range(1, 7))
+        rng.shuffle(teams)
+        if event == 9:
+            teams = teams[:4]  # blank gameweek for two teams
+        for home, away in zip(teams[::2], teams[1::2]):
+            fixtures.append({"event": event, "team_h": home, "team_a": away,
+                             "team_h_difficulty": rng.randint(2, 5), "team_a_difficulty": rng.randint(2, 5)})
+    fixtures.append({"event": 11, "team_h": 1, "team_a": 2, "team_h_difficulty": 3, "team_a_difficulty": 4})  # double
+    histories = {}
+    for el in elements:
+        rounds = sorted(rng.sample(range(1, 10), rng.randint(0, 9)))
+        histories[el["id"]] = [{"round": r, "total_points": rng.randint(-1, 15)} for r in rounds]
+    return elements, FixtureIndex(fixtures), histories
+
+
+def test_projection_table_matches_per_request_computation():
+    elements, fixtures, histories = make_data()
+    players = PlayerTable(elements)
+    for base_gw in (8, 10):
+        table = ProjectionTable(players, fixtures, histories, base_gw, horizon=4)
+        for el in elements:
+            assert table.captaincy(el["id"]) == captaincy_projection(el, histories[el["id"]], fixtures, base_gw)
+            assert table.transfer(el["id"]) == transfer_projection(el, histories[el["id"]], fixtures, base_gw)
+            recent = [gw for gw in histories[el["id"]] if gw["round"] < base_gw][-3:]
+            expected = predict_horizon_points(el, recent, fixtures, base_gw, 4)
+            assert abs(table.horizon_points(4)[players.row[el["id"]]] - expected) < 0.05
+
+def test_projection_query_filters_and_sorts():
+    elements, fixtures, histories = make_data(1)
+    table = ProjectionTable(PlayerTable(elements), fixtures, histories, 8)
+    rows = table.query(sort="now_cost", descending=False, position=3, max_cost=9.0, limit=5)
+    costs = [elements[row]["now_cost"] for row in rows]
+    assert costs == sorted(costs) and all(c <= 90 for c in costs)
+    assert all(elements[row]["element_type"] == 3 for row in rows)
+    assert len(rows) <= 5
+
+def test_failed_history_keeps_previous_table():
+    elements, fixtures, histories = make_data(3)
+    bootstrap = {"elements": elements, "events": [{"id": 7, "is_current": True}]}
+    store = ProjectionStore(refresh_seconds=0)
+
+    def history(pid, timeout=None):
+        if pid in failing:
+            raise ConnectionError("reset")
+        return histories[pid]
+
+    failing = set()
+    with patch("app.projections.get_bootstrap_static", return_value=bootstrap), \
+            patch("app.player_table.get_bootstrap_static", return_value=bootstrap), \
+            patch("app.projections.get_upcoming_fixtures", return_value=fixtures), \
+            patch("app.projections.load_player_history", side_effect=history):
+        table = store.refresh()
+        assert store.get() is table and len(table) == 60
+
+        failing.add(5)
+        with pytest.raises(RuntimeError):
+            store.refresh()
+        assert store.get() is table
+
+def test_projections_route(client):
+    elements, fixtures, histories = make_data(2)
+    table = ProjectionTable(PlayerTable(elements), fixtures, histories, 8)
+    bootstrap = {"teams": [{"id": t, "name": f"Team {t}"} for t in range(1, 7)]}
+    with patch("app.routes.projection_store") as store, \
+            patch("app.routes.get_bootstrap_static", return_value=bootstrap):
+        store.get_or_build.return_value = table
+        response = client.get('/api/fpl/projections?sort=horizon_points&horizon=2&limit=3')
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data["base_gameweek"] == 8
+        points = [p["horizon_points"] for p in data["players"]]
+        assert len(points) == 3 and points == sorted(points, reverse=True)
+        assert all(len(p["gameweek_points"]) == 2 for p in data["players"])
+
+        assert client.get('/api/fpl/projections?sort=name').status_code == 400
+        assert client.get('/api/fpl/projections?horizon=20').status_code == 400
@@ -113,4 +113,59 @@ def test_get_fpl_team(client, mock_requests):
     data = json.loads(response.data)
     assert "starting_players" in data
     assert "bench_players" in data
-    assert "total_points" in data 
\ No newline at end of file
+    assert "total_points" in data
+
+def test_current_gameweek_uses_cached_bootstrap(client, mock_requests):
+    mock_requests.return_value = Mock(
+        status_code=200,
+        headers={},
+        json=lambda: {"events": [{"id": 1, "is_current": False, "is_next": False},
+                                 {"id": 2, "is_current": True, "is_next": False}]}
+    )
+
+    for _ in range(3):
+        response = client.get('/api/fpl/current-gameweek')
+        assert response.status_code == 200
+        assert json.loads(response.data) == {"current_gameweek": 2}
+    assert mock_requests.call_count == 1
+
+def test_transfers_optimal_mode_validates_params(client, mock_requests):
+    response = client.get('/api/fpl/transfers/1?mode=optimal&transfers=4')
+    assert response.status_code == 400
+    response = client.get('/api/fpl/transfers/1?mode=best')
+    assert response.status_code == 400
+    assert mock_requests.call_count == 0
+
+def test_get_fpl_teams_batch(client, mock_requests):
+    calls = []
+
+    def mock_responses(url, **kwargs):
+        calls.append(url)
+        if "bootstrap-static" in url:
+            return Mock(status_code=200, headers={}, json=lambda: {"elements": [{
+                "id": 1, "first_name": "John", "second_name": "Doe", "element_type": 1, "team": 1,
+                "status": "a", "news": "", "news_added": None, "chance_of_playing_next_round": 100
+            }]})
+        if "/live/" in url:
+            return Mock(status_code=200, json=lambda: {"elements": [{"id": 1, "stats": {"total_points": 6}}]})
+        if "/entry/2/" in url:
+            return Mock(status_code=404)
+        return Mock(status_code=200, json=lambda: {"picks": [{
+            "element": 1, "position": 1, "multiplier": 2, "is_captain": True, "is_vice_captain": False
+        }]})
+
+    mock_requests.side_effect = mock_responses
+
+    response = client.get('/api/fpl/teams?ids=1,2,3,1&gameweek=5')
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert [team["team_id"] for team in data["teams"]] == [1, 2, 3]
+    assert data["teams"][0]["total_points"] == 12
+    assert data["teams"][1] == {"team_id": 2, "error": "Team not found"}
+    # bootstrap and live are fetched once for the whole batch
+    assert sum("/live/" in url for url in calls) == 1
+    assert sum("bootstrap-static" in url for url in calls) == 1
+
+def test_get_fpl_teams_validates_ids(client, mock_requests):
+    assert client.get('/api/fpl/teams?ids=1,x&gameweek=5').status_code == 400
+    assert client.get('/api/fpl/teams?ids=1').status_code == 400
@@ -0,0 +1,117 @@
+import json
+import numpy as np
+from unittest.mock import Mock, patch
+from app.scoring import STATS, score_rows, build_breakdowns
+
+
+def reference_points(gw, position):
+    """The per-position rules as they were hand-written in get_fpl_player_details."""
+    goals = {1: 6, 2: 6, 3: 5, 4: 4}[position]
+    clean_sheets = {1: 4, 2: 4, 3: 1, 4: 0}[position]
+    return {
+        "minutes": 2 if gw["minutes"] > 59 else 1 if gw["minutes"] > 0 else 0,
+        "goals_scored": gw["goals_scored"] * goals,
+        "assists": gw["assists"] * 3,
+        "clean_sheets": gw["clean_sheets"] * clean_sheets,
+        "goals_conceded": -1 * (gw["goals_conceded"] // 2) if position in (1, 2) else 0,
+        "own_goals": -2 * gw["own_goals"],
+        "penalties_saved": gw["penalties_saved"] * 5 if position == 1 else 0,
+        "penalties_missed": -2 * gw["penalties_missed"],
+        "yellow_cards": -1 * gw["yellow_cards"],
+        "red_cards": -3 * gw["red_cards"],
+        "saves": gw["saves"] // 3 if position == 1 else 0,
+        "bonus": gw["bonus"],
+    }
+
+
+def random_gameweeks(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [{
+        "round": i + 1, "minutes": int(rng.choice([0, 12, 59, 60, 90])), "goals_scored": int(rng.integers(0, 3)),
+        "assists": int(rng.integers(0, 3)), "clean_sheets": int(rng.integers(0, 2)),
+        "goals_conceded": int(rng.integers(0, 6)), "own_goals": int(rng.integers(0, 2)),
+        "penalties_saved": int(rng.integers(0, 2)), "penalties_missed": int(rng.integers(0, 2)),
+        "yellow_cards": int(rng.integers(0, 2)), "red_cards": int(rng.integers(0, 2)),
+        "saves": int(rng.integers(0, 9)), "bonus": int(rng.integers(0, 4)),
+        "opponent_team": 2, "was_home": True, "team_h_score": 1, "team_a_score": 0, "total_points": 5,
+    } for i in range(n)]
+
+
+def test_score_rows_matches_reference_rules():
+    gameweeks = random_gameweeks(200)
+    positions = [gw["round"] % 4 + 1 for gw in gameweeks]
+    points = score_rows([[gw[stat] for stat in STATS] for gw in gameweeks], positions)
+    for gw, position, row in zip(gameweeks, positions, points.tolist()):
+        assert dict(zip(STATS, row)) == reference_points(gw, position)
+
+def test_build_breakdowns_for_several_players():
+    histories = {10: random_gameweeks(3, seed=1), 11: random_gameweeks(2, seed=2)}
+    breakdowns = build_breakdowns(histories, {10: 1, 11: 4})
+    assert len(breakdowns[10]["gameweeks"]) == 3
+    assert len(breakdowns[11]["gameweeks"]) == 2
+    first = breakdowns[11]["gameweeks"][0]
+    assert first["stats"]["goals_scored"]["points"] == histories[11][0]["goals_scored"] * 4
+    assert breakdowns[10]["totals"]["saves"] == sum(gw["saves"] // 3 for gw in histories[10])
+
+def test_season_breakdown_and_player_details_share_cache(client):
+    bootstrap = {
+        "elements": [{"id": 7, "team": 1, "element_type": 3, "now_cost": 50, "form": "1.0"}],
+        "teams": [{"id": 1, "short_name": "ARS"}, {"id": 2, "short_name": "CHE"}],
+    }
+    history = random_gameweeks(5)
+    fpl_get = Mock(return_value=Mock(status_code=200, json=lambda: {"history": history}))
+
+    with patch("app.routes.get_bootstrap_static", return_value=bootstrap), \
+            patch("app.player_table.get_bootstrap_static", return_value=bootstrap), \
+            patch("app.utils.fpl_get", fpl_get):
+        response = client.get('/api/fpl/season-breakdown?ids=7,999&from_gw=2&to_gw=3')
+        assert response.status_code == 200
+        players = json.loads(response.data)["players"]
+        assert [gw["round"] for gw in players[0]["gameweeks"]] == [2, 3]
+        assert players[1] == {"player_id": 999, "error": "Player not found"}
+
+        for gameweek in (1, 4):
+            response = client.get(f'/api/fpl/player-details/7?gameweek={gameweek}')
+            assert response.status_code == 200
+            data = json.loads(response.data)
+            assert data["fixture"] == "ARS 1–0 CHE"
+            assert data["stats"][-1] == {"label": "Total Points", "value": "", "points": 5}
+        assert fpl_get.call_count == 1
+
+def test_player_details_refetches_live_gameweek_and_reports_upstream_errors(client):
+    bootstrap = {
+        "elements": [{"id": 7, "team": 1, "element_type": 3, "now_cost": 50, "form": "1.0"}],
+        "teams": [{"id": 1, "short_name": "ARS"}, {"id": 2, "short_name": "CHE"}],
+        "events": [{"id": 4, "is_current": False, "finished": True},
+                   {"id": 5, "is_current": True, "finished": False}],
+    }
+    history = random_gameweeks(5)
+    ok = Mock(status_code=200, json=lambda: {"history": history})
+
+    with patch("app.routes.get_bootstrap_static", return_value=bootstrap), \
+            patch("app.player_table.get_bootstrap_static", return_value=bootstrap), \
+            patch("app.utils.fpl_get", return_value=ok) as cached_get, \
+            patch("requests.Session.get", return_value=ok) as live_get:
+        assert client.get('/api/fpl/player-details/7?gameweek=4').status_code == 200
+        assert client.get('/api/fpl/player-details/7?gameweek=4').status_code == 200
+        assert cached_get.call_count == 1 and live_get.call_count == 0
+
+        # The gameweek being played skips the caches every time
+        for _ in range(2):
+            assert client.get('/api/fpl/player-details/7?gameweek=5').status_code == 200
+        assert live_get.call_count == 2
+
+        live_get.return_value = Mock(status_code=404)
+        response = client.get('/api/fpl/player-details/7?gameweek=5')
+        assert response.status_code == 500
+
+def test_breakdown_follows_refetched_history():
+    from app.scoring import get_player_breakdown
+    from app.utils import player_history_cache
+    first, second = random_gameweeks(2, seed=1), random_gameweeks(3, seed=2)
+    with patch("app.utils.fpl_get", side_effect=[
+            Mock(status_code=200, json=lambda: {"history": first}),
+            Mock(status_code=200, json=lambda: {"history": second})]):
+        assert len(get_player_breakdown(7, 3)["gameweeks"]) == 2
+        player_history_cache.clear()
+        assert len(get_player_breakdown(7, 3)["gameweeks"]) == 3
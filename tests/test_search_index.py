@@ -0,0 +1,148 @@
+import time
+from unittest.mock import Mock, patch
+from app.search_index import SearchIndex, NameSearch, player_from_squad, resolve_team
+
+
+def build_index():
+    index = SearchIndex()
+    for key, name in enumerate(["Atlético Madrid", "Arsenal", "Real Madrid", "Madrid CFF"]):
+        index.add(key, name, {"id": key, "name": name})
+    return index
+
+def names(results):
+    return [r["name"] for r in results]
+
+class FakeTeamIndex:
+    """Stands in for team_index: the parquet names and their ETag."""
+
+    def __init__(self, names, etag='"v1"'):
+        self._names = names
+        self.etag = etag
+
+    def ensure_loaded(self):
+        pass
+
+    def names(self):
+        return list(self._names)
+
+SERVICE_TEAMS = {
+    "atletico madrid": {"id": 78, "name": "Club Atlético de Madrid", "shortName": "Atleti"},
+    "arsenal": {"id": 57, "name": "Arsenal", "shortName": "Arsenal"},
+    "real madrid": {"id": 86, "name": "Real Madrid", "shortName": "Real"},
+}
+
+def service_search(query):
+    return {"teams": [team for name, team in SERVICE_TEAMS.items() if query.lower() in name]}
+
+def test_accent_folding_and_ranking():
+    index = build_index()
+    assert names(index.search("atletico madrid")) == ["Atlético Madrid"]
+    # Name prefix ranks before a word prefix, shorter names first
+    assert names(index.search("madrid")) == ["Madrid CFF", "Real Madrid", "Atlético Madrid"]
+
+def test_word_prefixes_typos_and_min_score():
+    index = build_index()
+    assert names(index.search("re mad")) == ["Real Madrid"]
+    assert names(index.search("arsenl")) == ["Arsenal"]
+    assert index.search("arsenl", min_score=1.0) == []
+    assert index.search("xyz") == []
+
+def test_readding_a_key_replaces_the_name():
+    index = build_index()
+    index.add(1, "Arsenal FC", {"id": 1, "name": "Arsenal FC"})
+    assert len(index) == 4
+    assert names(index.search("arsenal")) == ["Arsenal FC"]
+
+def test_where_filter_and_limit():
+    index = build_index()
+    assert names(index.search("madrid", limit=1)) == ["Madrid CFF"]
+    assert names(index.search("madrid", where=lambda r: r["id"] == 0)) == ["Atlético Madrid"]
+
+def test_resolve_team_needs_an_unambiguous_match():
+    madrid = [SERVICE_TEAMS["atletico madrid"], SERVICE_TEAMS["real madrid"]]
+    assert resolve_team("Atletico Madrid", madrid)["id"] == 78
+    assert resolve_team("Atleti", madrid)["id"] == 78  # shortName
+    assert resolve_team("Madrid", madrid) is None
+
+def test_teams_are_resolved_to_service_records():
+    remote = Mock(side_effect=service_search)
+    search = NameSearch(remote, refresh_seconds=0, teams_source=FakeTeamIndex(["Arsenal", "Real Madrid", "Olimpija"]))
+    assert search.refresh() is True
+    assert remote.call_count == 3
+    assert search.stats()["teams"] == 2 and search.stats()["unresolved_names"] == 1
+    assert search.stats()["build_ms"] is not None
+
+    fetch = Mock()
+    assert search.search_teams("real", fetch) == {"teams": [SERVICE_TEAMS["real madrid"]]}
+    fetch.assert_not_called()
+
+    # Nothing changed: no rebuild and no new service calls
+    assert search.refresh() is False
+    assert remote.call_count == 3
+
+def test_rebuild_picks_up_new_parquet_names():
+    source = FakeTeamIndex(["Arsenal"])
+    search = NameSearch(Mock(side_effect=service_search), refresh_seconds=0, teams_source=source)
+    search.refresh()
+    source._names, source.etag = ["Arsenal", "Atletico Madrid"], '"v2"'
+    assert search.refresh() is True
+    assert search.search_teams("atletico", Mock())["teams"][0]["id"] == 78
+
+def test_background_thread_builds_the_index():
+    search = NameSearch(Mock(side_effect=service_search), refresh_seconds=3600, teams_source=FakeTeamIndex(["Arsenal"]))
+    # The first search starts the build in the background
+    fetch = Mock(return_value={"teams": []})
+    search.search_teams("arsenal", fetch)
+    for _ in range(100):
+        if search.built_at is not None:
+            break
+        time.sleep(0.01)
+    assert search.stats()["teams"] == 1 and search.stats()["build_ms"] is not None
+    fetch.reset_mock()
+    assert search.search_teams("arsenal", fetch) == {"teams": [SERVICE_TEAMS["arsenal"]]}
+    fetch.assert_not_called()
+
+def test_miss_goes_to_the_service_and_is_learned():
+    search = NameSearch(Mock(), refresh_seconds=0, teams_source=FakeTeamIndex([]))
+    celje = {"id": 5, "name": "Celje"}
+    fetch = Mock(return_value={"teams": [celje], "count": 1})
+    assert search.search_teams("celje", fetch) == {"teams": [celje], "count": 1}
+    assert search.search_teams("celje", fetch) == {"teams": [celje]}
+    assert fetch.call_count == 1
+
+    # A fuzzy-only match is not trusted, but it is served when the service fails
+    error = {"error": "Search request timed out"}
+    assert search.search_teams("celj3", Mock(return_value=error)) == {"teams": [celje]}
+    assert search.search_teams("olimpija", Mock(return_value=error)) == error
+    assert search.stats()["fallbacks"] == 1
+
+def test_squad_players_are_mapped_to_the_search_schema():
+    search = NameSearch(Mock(), refresh_seconds=0, teams_source=FakeTeamIndex([]))
+    search.learn_squad(42, [{"player_id": 7, "name": "Bukayo Saka", "position": "Offence"}])
+    expected = {"id": 7, "name": "Bukayo Saka", "team_id": 42, "position": "Offence"}
+    assert player_from_squad({"player_id": 7, "name": "Bukayo Saka", "position": "Offence"}, 42) == expected
+    assert search.search_players("saka", Mock(), team_id="42") == {"players": [expected]}
+
+    fetch = Mock(return_value={"players": []})
+    assert search.search_players("saka", fetch, team_id=13) == {"players": []}
+    assert fetch.call_count == 1
+
+def test_warm_search_routes_do_not_call_the_microservice(client, mock_requests):
+    from app.utils import get_team_squad, name_search
+    with patch.object(name_search, "start"):
+        mock_requests.return_value = Mock(status_code=200, json=lambda: [{"player_id": 7, "name": "Bukayo Saka"}])
+        get_team_squad(42)
+        mock_requests.reset_mock()
+
+        response = client.get('/api/search/players?q=bukayo&team_id=42')
+        assert response.get_json() == {"players": [{"id": 7, "name": "Bukayo Saka", "team_id": 42}]}
+        assert mock_requests.call_count == 0
+
+        # Only the miss reaches the microservice
+        mock_requests.return_value = Mock(status_code=200, json=lambda: {"teams": [{"id": 5, "name": "Celje"}]})
+        assert client.get('/api/search/teams?q=celje').get_json() == {"teams": [{"id": 5, "name": "Celje"}]}
+        assert client.get('/api/search/teams?q=celje').get_json() == {"teams": [{"id": 5, "name": "Celje"}]}
+        assert mock_requests.call_count == 1
+
+    stats = client.get('/api/search/stats').get_json()
+    assert stats["hits"] == 2 and stats["misses"] == 1
@@ -0,0 +1,57 @@
+import json
+from unittest.mock import Mock, patch
+from app.upstream import fpl
+from app.shared_cache import SharedHTTPCache, ttl_for
+
+URL = "http://proxy/api/fpl/bootstrap-static/"
+
+
+def upstream(status_code=200, body=None, etag='"v1"'):
+    content = json.dumps(body or {}).encode()
+    return Mock(status_code=status_code, content=content, headers={"ETag": etag},
+                json=lambda: json.loads(content))
+
+def test_ttl_rules_by_url_pattern():
+    assert ttl_for(URL) == 600
+    assert ttl_for("http://proxy/api/fpl/event/12/live/") == 60
+    assert ttl_for("http://proxy/api/fpl/element-summary/5/") == 60 * 180
+    assert ttl_for("http://proxy/api/fpl/unknown/") == 60
+
+def test_sqlite_cache_is_shared_between_instances(tmp_path):
+    cache_url = f"sqlite:///{tmp_path / 'fpl.sqlite'}"
+    worker_a = SharedHTTPCache(cache_url)
+    worker_b = SharedHTTPCache(cache_url)
+
+    with patch('requests.Session.get', return_value=upstream(body={"events": [1]})) as mock_get:
+        assert worker_a.get(URL).json() == {"events": [1]}
+        # Second worker is served from the shared file without an upstream call
+        assert worker_b.get(URL).json() == {"events": [1]}
+        assert mock_get.call_count == 1
+
+def test_expired_entry_is_revalidated(tmp_path):
+    cache = SharedHTTPCache(f"sqlite:///{tmp_path / 'fpl.sqlite'}")
+    with patch('requests.Session.get', return_value=upstream(body={"events": [1]})):
+        cache.get(URL)
+
+    entry = cache.backend.get(URL)
+    entry["expires_at"] = 0
+    cache.backend.set(URL, entry, keep_until=entry["expires_at"] + 10 ** 10)
+
+    with patch('requests.Session.get', return_value=upstream(status_code=304)) as mock_get:
+        assert cache.get(URL).json() == {"events": [1]}
+        assert mock_get.call_args.kwargs["headers"]["If-None-Match"] == '"v1"'
+    assert cache.stats()["revalidated"] == 1
+
+def test_errors_are_not_cached(tmp_path):
+    cache = SharedHTTPCache(f"sqlite:///{tmp_path / 'fpl.sqlite'}")
+    with patch('requests.Session.get', return_value=upstream(status_code=404)) as mock_get:
+        assert cache.get(URL).status_code == 404
+        assert cache.get(URL).status_code == 404
+        assert mock_get.call_count == 2
+
+def test_disabled_cache_passes_through():
+    cache = SharedHTTPCache(None)
+    with patch('requests.Session.get', return_value=upstream()) as mock_get:
+        cache.get(URL)
+        # Straight to the FPL upstream client with its default timeouts
+        mock_get.assert_called_once_with(URL, timeout=fpl.timeout)
@@ -0,0 +1,42 @@
+import pandas as pd
+from unittest.mock import patch
+from app.team_index import TeamIndex, normalize_name
+
+TEAMS = pd.DataFrame({
+    "team_id": [1, 2],
+    "name": ["Atlético Madrid", "Arsenal"],
+    "country": ["Spain", "England"],
+})
+
+
+def test_normalize_name():
+    assert normalize_name("  Atlético   MADRID ") == "atletico madrid"
+
+def test_team_index_exact_and_normalized_lookup():
+    index = TeamIndex("bucket", "teams.parquet", refresh_seconds=3600)
+    with patch("app.team_index.load_parquet_with_etag", return_value=(TEAMS, '"v1"')):
+        assert index.lookup("Arsenal")[0]["team_id"] == 2
+        assert index.lookup("atletico madrid")[0]["team_id"] == 1
+        assert index.lookup("Unknown FC") == []
+
+def test_team_index_rebuilds_only_when_etag_changes():
+    index = TeamIndex("bucket", "teams.parquet", refresh_seconds=3600)
+    with patch("app.team_index.load_parquet_with_etag", return_value=(TEAMS, '"v1"')):
+        assert index.refresh() is True
+        assert index.refresh() is False
+
+    renamed = TEAMS.assign(name=["Atletico de Madrid", "Arsenal"])
+    with patch("app.team_index.load_parquet_with_etag", return_value=(renamed, '"v2"')):
+        assert index.refresh() is True
+        assert index.lookup("Atletico de Madrid")[0]["team_id"] == 1
+
+def test_get_team_id_route(client):
+    with patch("app.routes.team_index") as mock_index:
+        mock_index.lookup.return_value = [{"team_id": 2, "name": "Arsenal", "country": "England"}]
+        response = client.get('/api/get_team_id?team_name=Arsenal')
+        assert response.status_code == 200
+        assert response.get_json()[0]["team_id"] == 2
+
+        mock_index.lookup.return_value = []
+        response = client.get('/api/get_team_id?team_name=Nobody')
+        assert response.status_code == 404
@@ -0,0 +1,103 @@
+import itertools
+import os
+import numpy as np
+import pytest
+from app.player_table import PlayerTable
+from app.transfer_solver import optimal_transfers, benchmark, synthetic_pool, MAX_PER_CLUB
+
+
+def make_pool(n=40, seed=0):
+    rng = np.random.default_rng(seed)
+    elements = [{
+        "id": i + 1,
+        "team": int(rng.integers(1, 6)),
+        "element_type": int(rng.integers(1, 5)),
+        "now_cost": int(rng.integers(40, 90)),
+        "form": "1.0",
+    } for i in range(n)]
+    points = np.round(rng.uniform(0, 10, n), 1)
+    return elements, PlayerTable(elements), points
+
+
+def brute_force(elements, points, squad, bank, transfers):
+    """Reference: every combination of out and in players."""
+    squad_set = set(squad)
+    by_id = {el["id"]: (i, el) for i, el in enumerate(elements)}
+    outside = [el for el in elements if el["id"] not in squad_set]
+    best = []
+    for out in itertools.combinations(squad, transfers):
+        out_els = [by_id[pid][1] for pid in out]
+        for incoming in itertools.combinations(outside, transfers):
+            if sorted(e["element_type"] for e in incoming) != sorted(e["element_type"] for e in out_els):
+                continue
+            if sum(e["now_cost"] for e in incoming) > bank * 10 + sum(e["now_cost"] for e in out_els):
+                continue
+            new_squad = [by_id[pid][1] for pid in squad if pid not in out] + list(incoming)
+            clubs = [e["team"] for e in new_squad]
+            if max(clubs.count(c) for c in set(clubs)) > MAX_PER_CLUB:
+                continue
+            gain = sum(points[by_id[e["id"]][0]] for e in incoming) - sum(points[by_id[pid][0]] for pid in out)
+            best.append(round(gain, 6))
+    return sorted(best, reverse=True)
+
+
+def valid_squad(elements, seed):
+    rng = np.random.default_rng(seed)
+    while True:
+        squad = rng.choice([el["id"] for el in elements], 6, replace=False).tolist()
+        clubs = [elements[pid - 1]["team"] for pid in squad]
+        if max(clubs.count(c) for c in set(clubs)) <= MAX_PER_CLUB:
+            return squad
+
+
+@pytest.mark.parametrize("transfers", [1, 2, 3])
+def test_matches_brute_force(transfers):
+    for seed in range(3):
+        elements, table, points = make_pool(seed=seed)
+        squad = valid_squad(elements, seed)
+        expected = brute_force(elements, points, squad, 0.5, transfers)[:5]
+        results = optimal_transfers(table, squad, points, 0.5, transfers, limit=5)
+        assert [round(r["gain"], 6) for r in results] == expected
+
+def test_respects_club_limit():
+    elements = [
+        {"id": 1, "team": 1, "element_type": 3, "now_cost": 50, "form": "1"},
+        {"id": 2, "team": 1, "element_type": 3, "now_cost": 50, "form": "1"},
+        {"id": 3, "team": 1, "element_type": 3, "now_cost": 50, "form": "1"},
+        {"id": 4, "team": 2, "element_type": 3, "now_cost": 50, "form": "1"},
+        {"id": 5, "team": 1, "element_type": 3, "now_cost": 50, "form": "1"},  # best, but a 4th club-1 player
+        {"id": 6, "team": 3, "element_type": 3, "now_cost": 50, "form": "1"},
+    ]
+    table = PlayerTable(elements)
+    points = np.array([1, 1, 1, 0, 9, 5], dtype=float)
+    results = optimal_transfers(table, [1, 2, 3, 4], points, 0, 1)
+    # Rows 0-3 are the squad; row 4 is only allowed in for a club-1 player
+    assert results[0]["in_rows"] == [4] and results[0]["out_rows"] != [3]
+    assert all(not (r["out_rows"] == [3] and r["in_rows"] == [4]) for r in results)
+    assert optimal_transfers(table, [1, 2, 3, 4], points, 0, 1, limit=1)[0]["gain"] == 8
+
+@pytest.mark.parametrize("transfers", [1, 2, 3])
+def test_full_pool_results_are_valid(transfers):
+    elements, table, points, squad = synthetic_pool(players=700)
+    results = optimal_transfers(table, squad, points, 1.5, transfers)
+    assert results
+    gains = [r["gain"] for r in results]
+    assert gains == sorted(gains, reverse=True)
+    squad_rows = {table.row[pid] for pid in squad}
+    for r in results:
+        assert set(r["out_rows"]) <= squad_rows and not set(r["in_rows"]) & squad_rows
+        assert sorted(table.position[r["out_rows"]]) == sorted(table.position[r["in_rows"]])
+        assert r["bank_after"] == 15 + table.now_cost[r["out_rows"]].sum() - table.now_cost[r["in_rows"]].sum() >= 0
+        assert r["gain"] == pytest.approx(points[r["in_rows"]].sum() - points[r["out_rows"]].sum())
+        new_rows = (squad_rows - set(r["out_rows"])) | set(r["in_rows"])
+        clubs = table.team[sorted(new_rows)].tolist()
+        assert max(clubs.count(c) for c in set(clubs)) <= MAX_PER_CLUB
+
+    if transfers == 1:
+        expected = brute_force(elements, points, squad, 1.5, 1)[:len(results)]
+        assert [round(g, 6) for g in gains] == pytest.approx(expected)
+
+@pytest.mark.skipif(not os.getenv("RUN_BENCHMARKS"), reason="timing test, set RUN_BENCHMARKS=1 to run")
+def test_benchmark_full_pool_under_100ms():
+    timings = benchmark(players=700, runs=3)
+    assert all(t["best_ms"] < 100 for t in timings.values())
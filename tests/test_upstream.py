@@ -0,0 +1,140 @@
+import threading
+import time
+import pytest
+import requests
+from unittest.mock import Mock, patch
+from app.upstream import UpstreamClient, CircuitOpenError
+
+URL = "http://results/api/matches"
+
+
+def test_retries_connection_errors_with_backoff():
+    client = UpstreamClient("test", "http://results", retries=2, backoff=0)
+    ok = Mock(status_code=200)
+    with patch('requests.Session.get', side_effect=[requests.exceptions.ConnectionError("reset"), ok]) as mock_get:
+        assert client.get(URL, params={"date": "2025-01-01"}) is ok
+        assert mock_get.call_count == 2
+        assert mock_get.call_args.kwargs["params"] == {"date": "2025-01-01"}
+    stats = client.stats()
+    assert stats["requests"] == 2 and stats["errors"] == 1 and stats["retried"] == 1
+
+def test_retries_gateway_errors_but_not_client_errors():
+    client = UpstreamClient("test", "http://results", retries=2, backoff=0)
+    with patch('requests.Session.get', return_value=Mock(status_code=503)) as mock_get:
+        assert client.get(URL).status_code == 503
+        assert mock_get.call_count == 3
+    with patch('requests.Session.get', return_value=Mock(status_code=404)) as mock_get:
+        assert client.get(URL).status_code == 404
+        assert mock_get.call_count == 1
+
+def test_circuit_opens_and_fails_fast():
+    client = UpstreamClient("test", "http://results", retries=0, backoff=0, failure_threshold=2, reset_timeout=60)
+    with patch('requests.Session.get', side_effect=requests.exceptions.Timeout("slow")) as mock_get:
+        for _ in range(2):
+            with pytest.raises(requests.exceptions.Timeout):
+                client.get(URL)
+        # Open circuit: no upstream call, still a RequestException for existing handlers
+        with pytest.raises(requests.exceptions.RequestException):
+            client.get(URL)
+        assert mock_get.call_count == 2
+    assert client.stats()["circuit"] == "open"
+    assert client.stats()["short_circuited"] == 1
+
+    # After the reset timeout one trial request closes the circuit again
+    client.breaker.opened_at -= 60
+    with patch('requests.Session.get', return_value=Mock(status_code=200)):
+        client.get(URL)
+    assert client.stats()["circuit"] == "closed"
+
+def test_read_timeouts_are_not_retried():
+    client = UpstreamClient("test", "http://results", retries=2, backoff=0)
+    with patch('requests.Session.get', side_effect=requests.exceptions.ReadTimeout("slow")) as mock_get:
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            client.get(URL, timeout=60)
+        assert mock_get.call_count == 1
+    assert client.stats()["errors"] == 1
+
+def test_any_error_on_half_open_trial_reopens_the_circuit():
+    client = UpstreamClient("test", "http://results", retries=0, backoff=0, failure_threshold=1, reset_timeout=60)
+    with patch('requests.Session.get', side_effect=requests.exceptions.ConnectionError("reset")):
+        with pytest.raises(requests.exceptions.ConnectionError):
+            client.get(URL)
+
+    client.breaker.opened_at -= 60
+    with patch('requests.Session.get', side_effect=requests.exceptions.ChunkedEncodingError("broken")):
+        with pytest.raises(requests.exceptions.ChunkedEncodingError):
+            client.get(URL)
+    assert client.stats()["circuit"] == "open"
+
+    # The next trial is let through and a healthy response closes the circuit
+    client.breaker.opened_at -= 60
+    with patch('requests.Session.get', return_value=Mock(status_code=200)):
+        assert client.get(URL).status_code == 200
+    assert client.stats()["circuit"] == "closed"
+
+def test_uses_default_and_per_call_timeouts():
+    client = UpstreamClient("test", "http://results", read_timeout=12)
+    with patch('requests.Session.get', return_value=Mock(status_code=200)) as mock_get:
+        client.get(URL)
+        assert mock_get.call_args.kwargs["timeout"][1] == 12
+        client.get(URL, timeout=60)
+        assert mock_get.call_args.kwargs["timeout"][1] == 60
+
+def concurrent_calls(fn, n=5):
+    results, errors = [], []
+
+    def run():
+        try:
+            results.append(fn())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    return results, errors
+
+def slow_get(response=None, error=None):
+    def get(*args, **kwargs):
+        time.sleep(0.2)
+        if error is not None:
+            raise error
+        return response
+    return get
+
+def test_identical_concurrent_calls_share_one_request():
+    client = UpstreamClient("test", "http://results", retries=0)
+    ok = Mock(status_code=200)
+    with patch('requests.Session.get', side_effect=slow_get(ok)) as mock_get:
+        results, _ = concurrent_calls(lambda: client.get_shared(URL, params={"season": "2024"}))
+        assert results == [ok] * 5
+        assert mock_get.call_count == 1
+    assert client.stats()["coalesced"] == 4
+
+    # Different params are different calls, and nothing is kept afterwards
+    with patch('requests.Session.get', return_value=ok) as mock_get:
+        client.get_shared(URL, params={"season": "2024"})
+        client.get_shared(URL, params={"season": "2023"})
+        assert mock_get.call_count == 2
+
+def test_shared_call_errors_reach_every_caller():
+    client = UpstreamClient("test", "http://results", retries=0)
+    with patch('requests.Session.get', side_effect=slow_get(error=requests.exceptions.Timeout("slow"))) as mock_get:
+        results, errors = concurrent_calls(lambda: client.get_shared(URL))
+        assert results == [] and len(errors) == 5
+        assert all(isinstance(e, requests.exceptions.Timeout) for e in errors)
+        assert mock_get.call_count == 1
+
+def test_utils_coalesce_express_calls(mock_requests):
+    from app.utils import get_player_details
+    mock_requests.side_effect = slow_get(Mock(status_code=200, json=lambda: {"id": 9, "name": "Jan Oblak"}))
+    results, _ = concurrent_calls(lambda: get_player_details(9))
+    assert results == [{"id": 9, "name": "Jan Oblak"}] * 5
+    assert mock_requests.call_count == 1
+
+def test_upstream_stats_route(client):
+    response = client.get('/api/upstream-stats')
+    assert response.status_code == 200
+    assert set(response.get_json()) == {"results", "betting", "fpl"}
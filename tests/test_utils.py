@@ -12,14 +12,14 @@ def test_get_matches_from_api_success():
     mock_response.json.return_value = [{"id": 1, "home_team": "Team A", "away_team": "Team B"}]
     mock_response.raise_for_status.return_value = None
 
-    with patch('requests.get', return_value=mock_response):
+    with patch('requests.Session.get', return_value=mock_response):
         result = get_matches_from_api()
         assert isinstance(result, list)
         assert len(result) == 1
         assert result[0]["home_team"] == "Team A"
 
 def test_get_matches_from_api_error():
-    with patch('requests.get', side_effect=Exception("API Error")):
+    with patch('requests.Session.get', side_effect=Exception("API Error")):
         result = get_matches_from_api()
         assert isinstance(result, dict)
         assert "error" in result
@@ -32,14 +32,14 @@ def test_get_team_matches_success():
     ]
     mock_response.raise_for_status.return_value = None
 
-    with patch('requests.get', return_value=mock_response):
+    with patch('requests.Session.get', return_value=mock_response):
         result = get_team_matches(1)
         assert isinstance(result, list)
         assert len(result) == 1
         assert result[0]["match_id"] == 1
 
 def test_get_team_matches_error():
-    with patch('requests.get', side_effect=Exception("API Error")):
+    with patch('requests.Session.get', side_effect=Exception("API Error")):
         result = get_team_matches(1)
         assert isinstance(result, dict)
         assert "error" in result
@@ -52,14 +52,14 @@ def test_get_team_squad_success():
     ]
     mock_response.raise_for_status.return_value = None
 
-    with patch('requests.get', return_value=mock_response):
+    with patch('requests.Session.get', return_value=mock_response):
         result = get_team_squad(1)
         assert isinstance(result, list)
         assert len(result) == 1
         assert result[0]["player_id"] == 1
 
 def test_get_team_squad_error():
-    with patch('requests.get', side_effect=Exception("API Error")):
+    with patch('requests.Session.get', side_effect=Exception("API Error")):
         result = get_team_squad(1)
         assert isinstance(result, dict)
         assert "error" in result
@@ -70,15 +70,88 @@ def test_get_match_statistics_success():
     mock_response.json.return_value = {"possession": {"home": 60, "away": 40}}
     mock_response.raise_for_status.return_value = None
 
-    with patch('requests.get', return_value=mock_response):
+    with patch('requests.Session.get', return_value=mock_response):
         result = get_match_statistics(1)
         assert isinstance(result, dict)
         assert "possession" in result
         assert result["possession"]["home"] == 60
 
 def test_get_match_statistics_error():
-    with patch('requests.get', side_effect=Exception("API Error")):
+    with patch('requests.Session.get', side_effect=Exception("API Error")):
         result = get_match_statistics(1)
         assert isinstance(result, dict)
         assert "error" in result
-        assert "Neuspešen klic mikrostoritve za statistiko tekme" in result["error"] 
\ No newline at end of file
+        assert "Neuspešen klic mikrostoritve za statistiko tekme" in result["error"]
+
+FIXTURES = [
+    {"event": 3, "team_h": 1, "team_a": 2, "team_h_difficulty": 2, "team_a_difficulty": 4},
+    {"event": 1, "team_h": 2, "team_a": 1, "team_h_difficulty": 3, "team_a_difficulty": 5},
+    {"event": None, "team_h": 1, "team_a": 3, "team_h_difficulty": 2, "team_a_difficulty": 2},
+    {"event": 2, "team_h": 3, "team_a": 1, "team_h_difficulty": 4, "team_a_difficulty": 3},
+]
+
+def test_fixture_index_next_fixtures():
+    from app.utils import FixtureIndex, get_next_fixture
+    index = FixtureIndex(FIXTURES)
+
+    assert [f["event"] for f in index.next_fixtures(1, 0)] == [1, 2, 3]
+    assert index.next_fixtures(1, 1, 1) == [{"opponent_team": 3, "is_home": False, "fdr": 3, "event": 2}]
+    assert index.next_fixture(2, 3) is None
+    assert index.next_fixtures(99, 0) == []
+    # Raw fixture lists are still accepted
+    assert get_next_fixture({"team": 2}, FIXTURES, 1)["fdr"] == 4
+
+def test_get_upcoming_fixtures_is_cached():
+    from app.utils import get_upcoming_fixtures
+    mock_response = Mock(status_code=200, headers={}, json=lambda: FIXTURES)
+
+    with patch('requests.Session.get', return_value=mock_response) as mock_get:
+        first = get_upcoming_fixtures()
+        second = get_upcoming_fixtures()
+        assert first is second
+        assert mock_get.call_count == 1
+    assert first.next_fixture(3, 0)["is_home"] is True
+
+def test_get_player_histories_runs_concurrently_and_isolates_failures():
+    import threading
+    import time
+    from app.utils import get_player_histories
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def fake_get(url, timeout=None):
+        with lock:
+            active.append(url)
+            peak.append(len(active))
+        time.sleep(0.05)
+        with lock:
+            active.remove(url)
+        if "/3/" in url:
+            raise Exception("proxy down")
+        player_id = int(url.rstrip("/").split("/")[-1])
+        return Mock(status_code=200, json=lambda: {"history": [{"round": 1, "total_points": player_id}]})
+
+    with patch('requests.Session.get', side_effect=fake_get):
+        histories = get_player_histories([1, 2, 3, 4, 2])
+
+    assert set(histories) == {1, 2, 3, 4}
+    assert histories[1][0]["total_points"] == 1
+    assert histories[3] == []
+    assert max(peak) > 1
+
+def test_predict_horizon_points_sums_fixtures_in_window():
+    from app.utils import FixtureIndex, predict_points, predict_horizon_points
+    fixtures = [
+        {"event": 5, "team_h": 1, "team_a": 2, "team_h_difficulty": 2, "team_a_difficulty": 4},
+        {"event": 6, "team_h": 3, "team_a": 1, "team_h_difficulty": 3, "team_a_difficulty": 3},
+        {"event": 6, "team_h": 1, "team_a": 4, "team_h_difficulty": 2, "team_a_difficulty": 4},
+        {"event": 8, "team_h": 1, "team_a": 5, "team_h_difficulty": 2, "team_a_difficulty": 4},
+    ]
+    player = {"team": 1, "form": "4.0"}
+    history = [{"total_points": 6}]
+    index = FixtureIndex(fixtures)
+    # GW 5 and a double GW 6 fall inside a 2-week horizon, GW 8 does not
+    expected = sum(predict_points(player, history, f) for f in index.next_fixtures(1, 4, 3))
+    assert predict_horizon_points(player, history, index, 5, horizon=2) == round(expected, 2)
+    assert predict_horizon_points(player, history, index, 9, horizon=2) == 0